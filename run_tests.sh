@@ -4,22 +4,24 @@ export PYTHONPATH="src/edeposit/amqp:$PYTHONPATH"
 export TEST_PATH="tests"
 
 function show_help {
-    echo -e "Usage: $0 [-h] [-a] [-i] [-u]"
+    echo -e "Usage: $0 [-h] [-a] [-i] [-u] [-b]"
     echo
     echo -e "\t-h"
     echo -e "\t\tShow this help."
     echo -e "\t-a"
-    echo -e "\t\tRun all tests."
+    echo -e "\t\tRun all tests (except benchmarks)."
     echo -e "\t-i"
     echo -e "\t\tRun integration test (requires sudo)."
     echo -e "\t-u"
     echo -e "\t\tRun unittest."
+    echo -e "\t-b"
+    echo -e "\t\tRun benchmarks."
     echo
     exit;
 }
 
 function run_all_tests {
-    py.test $TEST_PATH;
+    py.test "$TEST_PATH/unit" "$TEST_PATH/integration";
     exit
 }
 
@@ -33,7 +35,12 @@ function run_unit_tests {
     exit
 }
 
-while getopts "haiu" optname; do
+function run_benchmarks {
+    py.test -s "$TEST_PATH/benchmarks";
+    exit
+}
+
+while getopts "haiub" optname; do
     case "$optname" in
         "a")
             run_all_tests;
@@ -44,6 +51,9 @@ while getopts "haiu" optname; do
         "u")
             run_unit_tests;
         ;;
+        "b")
+            run_benchmarks;
+        ;;
         "h")
             show_help;
         ;;
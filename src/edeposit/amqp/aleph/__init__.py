@@ -52,6 +52,37 @@ Note:
     :py:func:`len()` to :attr:`.SearchResult.records` - it doesn't put that
     much load to Aleph. Also Aleph is restricted to 150 requests per second.
 
+Many ISBNs
+----------
+If you want to know, how many records are there for each ISBN from a long
+list, use :class:`.ISBNCountManyRequest`, which asks Aleph just by few
+requests and returns :class:`.ISBNCountManyResult`.
+
+Batch requests
+--------------
+Many requests can be sent in one message wrapped in :class:`.BatchRequest`::
+
+    request = BatchRequest([
+        CountRequest(ISBNQuery("80-251-0225-4")),
+        SearchRequest(ISBNQuery("978-80-87899-15-1")),
+    ])
+
+and you will get back :class:`.BatchResult` with results in the same order.
+Requests, which failed, are represented by :class:`.ErrorResult`.
+
+Streaming
+---------
+Search requests are answered by one :class:`.SearchResult` containing all
+records. If you want to process the records as soon as they are downloaded,
+set the `stream` flag::
+
+    request = SearchRequest(AuthorQuery("Raymond"), whole_set=True,
+                            stream=True)
+
+Records are then sent thru `send_back` callback of :func:`reactToAMQPMessage`
+in :class:`.SearchResultChunk` structures, each followed by
+:class:`.SearchProgress` and the response is just :class:`.SearchSummary`.
+
 Direct queries
 --------------
 As I said, this module provides only direct access to Aleph, AMQP communication
@@ -63,6 +94,10 @@ wrapper, or query :mod:`aleph <aleph.aleph>` submodule directly.
 :func:`reactToAMQPMessage` is preferred, because in that case, you don't have
 to deal with Aleph lowlevel API, which can be little bit annoying.
 
+Daemons processing many requests can use :class:`aleph.harness.Harness`,
+which warms up the caches once and forks workers calling
+:func:`reactToAMQPMessage`.
+
 Diagrams
 --------
 Here is ASCII flow diagram for you::
@@ -108,17 +143,45 @@ API
 """
 # Imports =====================================================================
 from collections import namedtuple
-
-import isbn_validator
+from collections import OrderedDict
 
 import aleph
+import cache
 import export
+import convert
+import metrics
 import settings
 import doc_number
+import singleflight
+from parallel import parallelMap
 from datastructures import *
 
 
 # Queries =====================================================================
+def _cachedResult(key, ttl, fn, soft_ttl=None):
+    """
+    Get result stored under `key` in :mod:`aleph.cache`, or compute it by
+    `fn`. Identical computations running at the same time are coalesced by
+    :mod:`aleph.singleflight`.
+
+    See :meth:`.LRUCache.cached` for description of the arguments.
+
+    Computations started after some invalidation of the cache don't wait for
+    the ones started before it, so they don't get the invalidated answer.
+    """
+    result_cache = cache.getCache()
+
+    return result_cache.cached(
+        key,
+        ttl,
+        lambda: singleflight.getGroup().do(
+            (key, result_cache.generation),
+            fn
+        ),
+        soft_ttl=soft_ttl
+    )
+
+
 class _QueryTemplate(object):
     """
     This class is here to just save some effort by using common ancestor with
@@ -126,22 +189,143 @@ class _QueryTemplate(object):
 
     You probably shouldn't use it.
     """
-    def getSearchResult(self):
-        records = []
-        for xml in self._getXML():
-            records.append(
-                AlephRecord(
-                    base=self.base,
-                    library=settings.DEFAULT_LIBRARY,
-                    docNumber=doc_number.getDocNumber(xml),
-                    xml=xml
-                )
+    def _toRecord(self, xml):
+        record_class = AlephRecord
+        if settings.ALEPH_LAZY_RECORDS:
+            record_class = LazyAlephRecord
+
+        return record_class.from_xml(
+            base=self.base,
+            library=settings.DEFAULT_LIBRARY,
+            xml=xml
+        )
+
+    def _toRecords(self, xmls):
+        """
+        Convert all `xmls` to records, in the pool of processes if
+        :attr:`settings.ALEPH_CONVERT_WORKERS` is set.
+        """
+        if settings.ALEPH_LAZY_RECORDS:
+            return [self._toRecord(xml) for xml in xmls]
+
+        return convert.convertRecords(
+            xmls,
+            base=self.base,
+            library=settings.DEFAULT_LIBRARY
+        )
+
+    def _cacheKey(self, kind):
+        """
+        Returns:
+            tuple: Key of the result of `kind` in :mod:`aleph.cache`, made \
+                   from the type of the query and its normalized values.
+        """
+        return (kind, self.__class__.__name__) + tuple(
+            cache.normalize(value) for value in self
+        )
+
+    def _getSet(self):
+        """
+        Returns:
+            dict: Result of :func:`aleph.searchInAleph` for this query. It \
+                  is remembered for :attr:`settings.ALEPH_CACHE_SET_TTL` \
+                  seconds, so the following count, search or pages reuse \
+                  the same set in Aleph.
+        """
+        return dict(
+            _cachedResult(
+                self._cacheKey("set"),
+                settings.ALEPH_CACHE_SET_TTL,
+                self._search
             )
+        )
+
+    def _getXML(self):
+        return aleph.downloadRecords(self._getSet())
 
-        return SearchResult(records)
+    def _getCount(self):
+        return self._getSet()["no_entries"]
+
+    def getDocumentIDs(self):
+        """
+        Returns:
+            list: :class:`aleph.DocumentID` of all records matching the query.
+        """
+        return aleph.getDocumentIDs(self._getSet())
+
+    def getSearchResult(self):
+        return _cachedResult(
+            self._cacheKey("search"),
+            settings.ALEPH_CACHE_SEARCH_TTL,
+            lambda: SearchResult(self._toRecords(self._getXML())),
+            soft_ttl=settings.ALEPH_CACHE_SEARCH_SOFT_TTL
+        )
+
+    def iterRecords(self, page_size=aleph.RECORD_BATCH_SIZE):
+        """
+        Iterate over all records matching the query, not just the first
+        :attr:`aleph.MAX_RECORDS`.
+
+        Args:
+            page_size (int, default aleph.RECORD_BATCH_SIZE): How many records
+                      are downloaded by one request.
+
+        Yields:
+            obj: :class:`.AlephRecord` as soon as its page is downloaded.
+        """
+        pages = aleph.iterRecordPages(self._getSet(), page_size=page_size)
+
+        for page in pages:
+            for record in self._toRecords(page):
+                yield record
+
+    def streamSearchResult(self, send_back, whole_set=False,
+                           page_size=aleph.RECORD_BATCH_SIZE):
+        """
+        Send records matching the query thru `send_back` as the pages are
+        downloaded.
+
+        Args:
+            send_back (fn reference): Called with :class:`.SearchResultChunk`
+                      for each page, followed by :class:`.SearchProgress`.
+            whole_set (bool, default False): Send all records, not just first
+                      :attr:`aleph.MAX_RECORDS`.
+            page_size (int, default aleph.RECORD_BATCH_SIZE): How many records
+                      are downloaded by one request.
+
+        Returns:
+            obj: :class:`.SearchSummary`.
+        """
+        search_result = self._getSet()
+
+        to_doc = None
+        total = search_result.get("no_records", 0)
+        if not whole_set:
+            to_doc = aleph.MAX_RECORDS
+            total = min(total, to_doc)
+
+        pages = aleph.iterRecordPages(
+            search_result,
+            page_size=page_size,
+            to_doc=to_doc
+        )
+
+        fetched = 0
+        for page in pages:
+            records = self._toRecords(page)
+            fetched += len(records)
+
+            send_back(SearchResultChunk(records))
+            send_back(SearchProgress(fetched, total))
+
+        return SearchSummary(fetched, search_result.get("no_entries", 0))
 
     def getCountResult(self):
-        return CountResult(self._getCount())
+        return _cachedResult(
+            self._cacheKey("count"),
+            settings.ALEPH_CACHE_COUNT_TTL,
+            lambda: CountResult(self._getCount())
+        )
 
 
 class GenericQuery(namedtuple("GenericQuery", ['base',
@@ -168,23 +352,13 @@ class GenericQuery(namedtuple("GenericQuery", ['base',
     This is used mainly if you want to search by your own parameters and don't
     want to use prepared wrappers (:class:`AuthorQuery`/:class:`ISBNQuery`/..).
     """
-    def _getXML(self):
-        return aleph.downloadRecords(
-            aleph.searchInAleph(
-                self.base,
-                self.phrase,
-                self.considerSimilar,
-                self.field,
-            )
-        )
-
-    def _getCount(self):
+    def _search(self):
         return aleph.searchInAleph(
             self.base,
             self.phrase,
             self.considerSimilar,
             self.field
-        )["no_entries"]
+        )
 
 
 class DocumentQuery(namedtuple("DocumentQuery", ["doc_id", "library"])):
@@ -210,10 +384,31 @@ class DocumentQuery(namedtuple("DocumentQuery", ["doc_id", "library"])):
         Raises:
             aleph.DocumentNotFoundException: When document is not found.
         """
-        xml = aleph.downloadMARCOAI(self.doc_id, self.library)
+        return _cachedResult(
+            ("document", self.library, str(self.doc_id)),
+            settings.ALEPH_CACHE_DOCUMENT_TTL,
+            self._download,
+            soft_ttl=settings.ALEPH_CACHE_DOCUMENT_SOFT_TTL
+        )
+
+    def _download(self):
+        # document is computed when the cached one is stale or expired, so
+        # the persistent copy is used only if it is not stale too
+        xml = aleph.downloadMARCOAI(
+            self.doc_id,
+            self.library,
+            max_age=min(
+                settings.ALEPH_CACHE_DOCUMENT_SOFT_TTL,
+                settings.ALEPH_CACHE_DOCUMENT_TTL
+            )
+        )
+
+        record_class = AlephRecord
+        if settings.ALEPH_LAZY_RECORDS:
+            record_class = LazyAlephRecord
 
         return SearchResult([
-            AlephRecord(
+            record_class(
                 None,
                 self.library,
                 self.doc_id,
@@ -221,6 +416,35 @@ class DocumentQuery(namedtuple("DocumentQuery", ["doc_id", "library"])):
             )
         ])
 
+    def iterRecords(self, page_size=None):
+        """
+        Yields:
+            obj: :class:`.AlephRecord` with given `doc_id`.
+
+        Raises:
+            aleph.DocumentNotFoundException: When document is not found.
+        """
+        for record in self.getSearchResult().records:
+            yield record
+
+    def streamSearchResult(self, send_back, whole_set=False, page_size=None):
+        """
+        Send the document thru `send_back` in one :class:`.SearchResultChunk`,
+        followed by :class:`.SearchProgress`.
+
+        Returns:
+            obj: :class:`.SearchSummary`.
+
+        Raises:
+            aleph.DocumentNotFoundException: When document is not found.
+        """
+        records = self.getSearchResult().records
+
+        send_back(SearchResultChunk(records))
+        send_back(SearchProgress(len(records), len(records)))
+
+        return SearchSummary(len(records), len(records))
+
     def getCountResult(self):
         """
         Returns:
@@ -250,11 +474,8 @@ class ISBNQuery(namedtuple("ISBNQuery", ["ISBN", "base"]), _QueryTemplate):
     def __new__(self, ISBN, base=settings.ALEPH_DEFAULT_BASE):
         return super(ISBNQuery, self).__new__(self, ISBN, base)
 
-    def _getXML(self):
-        return aleph.getISBNsXML(self.ISBN, base=self.base)
-
-    def _getCount(self):
-        return aleph.getISBNCount(self.ISBN, base=self.base)
+    def _search(self):
+        return aleph.searchInAleph(self.base, self.ISBN, False, "sbn")
 
 
 class AuthorQuery(namedtuple("AuthorQuery", ["author", "base"]),
@@ -270,11 +491,8 @@ class AuthorQuery(namedtuple("AuthorQuery", ["author", "base"]),
     def __new__(self, author, base=settings.ALEPH_DEFAULT_BASE):
         return super(AuthorQuery, self).__new__(self, author, base)
 
-    def _getXML(self):
-        return aleph.getAuthorsBooksXML(self.author, base=self.base)
-
-    def _getCount(self):
-        return aleph.getAuthorsBooksCount(self.author, base=self.base)
+    def _search(self):
+        return aleph.searchInAleph(self.base, self.author, False, "wau")
 
 
 class PublisherQuery(namedtuple("PublisherQuery", ["publisher", "base"]),
@@ -290,11 +508,8 @@ class PublisherQuery(namedtuple("PublisherQuery", ["publisher", "base"]),
     def __new__(self, publisher, base=settings.ALEPH_DEFAULT_BASE):
         return super(PublisherQuery, self).__new__(self, publisher, base)
 
-    def _getXML(self):
-        return aleph.getPublishersBooksXML(self.publisher, base=self.base)
-
-    def _getCount(self):
-        return aleph.getPublishersBooksCount(self.publisher, base=self.base)
+    def _search(self):
+        return aleph.searchInAleph(self.base, self.publisher, False, "wpb")
 
 
 class TitleQuery(_QueryTemplate,
@@ -310,11 +525,8 @@ class TitleQuery(_QueryTemplate,
     def __new__(self, title, base=settings.ALEPH_DEFAULT_BASE):
         return super(TitleQuery, self).__new__(self, title, base)
 
-    def _getXML(self):
-        return aleph.getBooksTitleXML(self.title, base=self.base)
-
-    def _getCount(self):
-        return aleph.getBooksTitleCount(self.title, base=self.base)
+    def _search(self):
+        return aleph.searchInAleph(self.base, self.title, False, "wtl")
 
 
 class ICZQuery(_QueryTemplate, namedtuple("ICZQuery", ["icz", "base"])):
@@ -329,11 +541,8 @@ class ICZQuery(_QueryTemplate, namedtuple("ICZQuery", ["icz", "base"])):
     def __new__(self, icz, base=settings.ALEPH_DEFAULT_BASE):
         return super(ICZQuery, self).__new__(self, icz, base)
 
-    def _getXML(self):
-        return aleph.getICZBooksXML(self.icz, base=self.base)
-
-    def _getCount(self):
-        return aleph.getICZBooksCount(self.icz, base=self.base)
+    def _search(self):
+        return aleph.searchInAleph(self.base, self.icz, False, "icz")
 
 
 # Variables ===================================================================
@@ -346,12 +555,15 @@ QUERY_TYPES = [
     DocumentQuery,
     ICZQuery,
 ]
+_QUERY_NAMES = set(query.__name__ for query in QUERY_TYPES)
 
 REQUEST_TYPES = [
     SearchRequest,
     CountRequest,
     ExportRequest,
     ISBNValidationRequest,
+    ISBNCountManyRequest,
+    BatchRequest,
 ]
 
 
@@ -388,6 +600,151 @@ def _iiOfAny(instance, classes):
 
 
 # Functions ===================================================================
+def _checkQuery(req):
+    """
+    Raises:
+        ValueError: If the query of `req` is not one of :attr:`QUERY_TYPES`.
+    """
+    if type(req.query).__name__ not in _QUERY_NAMES:
+        raise ValueError(
+            "Unknown type of request: '" + str(type(req)) + "' or query: '" +
+            str(type(req.query)) + "'!"
+        )
+
+
+def _reactToCount(req, send_back):
+    _checkQuery(req)
+
+    return req.query.getCountResult()
+
+
+def _reactToSearch(req, send_back):
+    _checkQuery(req)
+
+    # requests serialized by older versions don't have these properties
+    whole_set = getattr(req, "whole_set", False)
+
+    if getattr(req, "stream", False):
+        return req.query.streamSearchResult(send_back, whole_set)
+
+    if whole_set:
+        return SearchResult(list(req.query.iterRecords()))
+
+    return req.query.getSearchResult()
+
+
+def _reactToISBNValidation(req, send_back):
+    import isbn_validator
+
+    ISBN = req.ISBN
+
+    if _iiOfAny(ISBN, ISBNQuery):
+        ISBN = ISBN.ISBN
+
+    return ISBNValidationResult(isbn_validator.is_valid_isbn(ISBN))
+
+
+def _reactToISBNCountMany(req, send_back):
+    return ISBNCountManyResult(
+        aleph.getISBNCountMany(req.ISBNs, base=req.base)
+    )
+
+
+def _exportedISBNs(req):
+    """
+    Returns:
+        list: ISBNs of the publications exported by `req` (also by the \
+              :class:`.ExportRequest` objects in :class:`.BatchRequest`).
+    """
+    if _iiOfAny(req, BatchRequest):
+        return sum((_exportedISBNs(request) for request in req.requests), [])
+
+    if not _iiOfAny(req, ExportRequest):
+        return []
+
+    ISBNs = req.epublication.ISBN
+    if not isinstance(ISBNs, (list, tuple)):
+        ISBNs = [ISBNs]
+
+    return list(ISBNs)
+
+
+def _reactToExport(req, send_back):
+    export.exportEPublication(req.epublication)
+
+    # cached answers for the exported ISBNs are not valid anymore
+    for ISBN in _exportedISBNs(req):
+        cache.invalidateISBN(ISBN)
+
+    return ExportResult(req.epublication.ISBN)
+
+
+def _reactToBatch(req, send_back):
+    """
+    Process requests from :class:`.BatchRequest` in parallel, identical
+    requests only once.
+
+    Returns:
+        obj: :class:`.BatchResult`.
+    """
+    def react(request):
+        if _iiOfAny(request, BatchRequest):
+            raise ValueError("BatchRequest can't be nested!")
+
+        return reactToAMQPMessage(request, send_back)
+
+    keys = [repr(request) for request in req.requests]
+    unique = OrderedDict(zip(keys, req.requests))
+
+    results = parallelMap(
+        react,
+        unique.values(),
+        workers=settings.ALEPH_BATCH_WORKERS,
+        catch=Exception
+    )
+    results = dict(zip(unique.keys(), results))
+
+    def toResult(result):
+        if isinstance(result, Exception):
+            return ErrorResult(result.__class__.__name__, str(result))
+
+        return result
+
+    return BatchResult([toResult(results[key]) for key in keys])
+
+
+#: Handlers of the requests, indexed by the name of the request class, so
+#: the requests deserialized in other modules are also recognized. See
+#: :func:`register_handler`.
+_HANDLERS = {
+    CountRequest.__name__: _reactToCount,
+    SearchRequest.__name__: _reactToSearch,
+    ISBNValidationRequest.__name__: _reactToISBNValidation,
+    ISBNCountManyRequest.__name__: _reactToISBNCountMany,
+    ExportRequest.__name__: _reactToExport,
+    BatchRequest.__name__: _reactToBatch,
+}
+
+
+def register_handler(request_class, handler):
+    """
+    Make :func:`reactToAMQPMessage` to process requests of `request_class`
+    by `handler`.
+
+    Requests are matched by the name of their class (see :func:`_iiOfAny`).
+    Handler of already known request is replaced.
+
+    Args:
+        request_class (class): Class of the request.
+        handler (fn reference): Function taking `req` and `send_back`
+                (see :func:`reactToAMQPMessage`) and returning Result class.
+    """
+    _HANDLERS[request_class.__name__] = handler
+
+    if request_class not in REQUEST_TYPES:
+        REQUEST_TYPES.append(request_class)
+
+
 def reactToAMQPMessage(req, send_back):
     """
     React to given (AMQP) message.
@@ -401,8 +758,12 @@ def reactToAMQPMessage(req, send_back):
         >>> request = aleph.SearchRequest(
         ...     aleph.ISBNQuery("80-251-0225-4")
         ... )
-        >>> request
-        SearchRequest(query=ISBNQuery(ISBN='80-251-0225-4', base='nkc'))
+        >>> request  # formated by hand for purposes of example
+        SearchRequest(
+            query=ISBNQuery(ISBN='80-251-0225-4', base='nkc'),
+            whole_set=False,
+            stream=False
+        )
 
         >>> response = aleph.reactToAMQPMessage(request, None)
 
@@ -452,7 +813,10 @@ def reactToAMQPMessage(req, send_back):
         send_back (fn reference): Reference to function for responding. This is
                   useful for progress monitoring for example. Function takes
                   one parameter, which may be response structure/namedtuple, or
-                  string or whatever would be normally returned.
+                  string or whatever would be normally returned. It is used
+                  for :class:`.SearchResultChunk` and :class:`.SearchProgress`
+                  structures, when :class:`.SearchRequest` with `stream` flag
+                  is received.
 
     Returns:
         Result class: Result of search in Aleph. \
@@ -461,30 +825,17 @@ def reactToAMQPMessage(req, send_back):
     Raises:
         ValueError: If bad type of `req` structure is given.
     """
-    if not _iiOfAny(req, REQUEST_TYPES):
+    handler = _HANDLERS.get(type(req).__name__)
+
+    if handler is None:
         raise ValueError(
             "Unknown type of request: '" + str(type(req)) + "'!"
         )
 
-    if _iiOfAny(req, CountRequest) and _iiOfAny(req.query, QUERY_TYPES):
-        return req.query.getCountResult()
-
-    elif _iiOfAny(req, SearchRequest) and _iiOfAny(req.query, QUERY_TYPES):
-        return req.query.getSearchResult()
-
-    elif _iiOfAny(req, ISBNValidationRequest):
-        ISBN = req.ISBN
-
-        if _iiOfAny(ISBN, ISBNQuery):
-            ISBN = ISBN.ISBN
-
-        return ISBNValidationResult(isbn_validator.is_valid_isbn(ISBN))
-
-    elif _iiOfAny(req, ExportRequest):
-        export.exportEPublication(req.epublication)
-        return ExportResult(req.epublication.ISBN)
+    if metrics.isEnabled():
+        return metrics.measureRequest(
+            type(req).__name__,
+            lambda: handler(req, send_back)
+        )
 
-    raise ValueError(
-        "Unknown type of request: '" + str(type(req)) + "' or query: '" +
-        str(type(req.query)) + "'!"
-    )
+    return handler(req, send_back)
@@ -0,0 +1,150 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Non-blocking versions of the functions from :mod:`aleph.aleph` and of
+:func:`aleph.reactToAMQPMessage`.
+
+Each function returns immediately with
+:class:`multiprocessing.pool.AsyncResult` object and the request itself is
+processed by the pool of :attr:`aleph.settings.ALEPH_ASYNC_WORKERS` threads
+shared by the whole process. This allows to keep many requests in flight
+without creating thread for each of them.
+
+Parsing is done by the same code as in the blocking API, so the results are
+exactly the same. Identical queries processed at the same time share one
+request to Aleph (see :mod:`aleph.singleflight`).
+
+Example::
+
+    from aleph import aio
+
+    pending = [
+        aio.getISBNCount(isbn)
+        for isbn in ["80-251-0225-4", "978-80-87899-15-1"]
+    ]
+    counts = [result.get(timeout=60) for result in pending]
+
+Each function also takes optional `callback` keyword argument, which is
+called with the result, when the request is successfully finished.
+
+Note:
+    This package runs at python 2.7, where :mod:`asyncio` is not available,
+    so the results are `AsyncResult` objects instead of coroutines.
+"""
+# Imports =====================================================================
+import os
+import threading
+from multiprocessing.pool import ThreadPool
+
+import aleph
+import settings
+
+
+# Variables ===================================================================
+_POOL = None
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+
+
+# Functions & objects =========================================================
+def _getPool():
+    global _POOL
+    global _POOL_PID
+
+    # threads of the pool don't survive fork, child needs its own pool
+    if _POOL is None or _POOL_PID != os.getpid():
+        with _POOL_LOCK:
+            if _POOL is None or _POOL_PID != os.getpid():
+                _POOL = ThreadPool(settings.ALEPH_ASYNC_WORKERS)
+                _POOL_PID = os.getpid()
+
+    return _POOL
+
+
+def submit(fn, *args, **kwargs):
+    """
+    Run `fn` with `args` and `kwargs` in the shared pool of threads.
+
+    Args:
+        fn (fn reference): Blocking function.
+        callback (fn reference, optional): Called with the result, when the
+                 `fn` successfully finishes.
+
+    Returns:
+        obj: :class:`multiprocessing.pool.AsyncResult` instance.
+    """
+    callback = kwargs.pop("callback", None)
+
+    return _getPool().apply_async(fn, args, kwargs, callback)
+
+
+def _nonBlocking(fn):
+    """
+    Create non-blocking version of the `fn`.
+    """
+    def wrapper(*args, **kwargs):
+        return submit(fn, *args, **kwargs)
+
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = (
+        "Non-blocking version of :func:`%s.%s`.\n\n"
+        "Returns:\n"
+        "    obj: :class:`multiprocessing.pool.AsyncResult` instance.\n"
+    ) % (fn.__module__, fn.__name__)
+
+    return wrapper
+
+
+# Lowlevel API ================================================================
+searchInAleph = _nonBlocking(aleph.searchInAleph)
+downloadRecords = _nonBlocking(aleph.downloadRecords)
+getDocumentIDs = _nonBlocking(aleph.getDocumentIDs)
+downloadMARCXML = _nonBlocking(aleph.downloadMARCXML)
+downloadMARCOAI = _nonBlocking(aleph.downloadMARCOAI)
+getListOfBases = _nonBlocking(aleph.getListOfBases)
+
+
+# High level API ==============================================================
+getISBNsXML = _nonBlocking(aleph.getISBNsXML)
+getISSNsXML = _nonBlocking(aleph.getISSNsXML)
+getAuthorsBooksXML = _nonBlocking(aleph.getAuthorsBooksXML)
+getPublishersBooksXML = _nonBlocking(aleph.getPublishersBooksXML)
+getBooksTitleXML = _nonBlocking(aleph.getBooksTitleXML)
+getICZBooksXML = _nonBlocking(aleph.getICZBooksXML)
+
+getISBNsIDs = _nonBlocking(aleph.getISBNsIDs)
+getAuthorsBooksIDs = _nonBlocking(aleph.getAuthorsBooksIDs)
+getPublishersBooksIDs = _nonBlocking(aleph.getPublishersBooksIDs)
+getBooksTitleIDs = _nonBlocking(aleph.getBooksTitleIDs)
+getICZBooksIDs = _nonBlocking(aleph.getICZBooksIDs)
+
+getISBNCount = _nonBlocking(aleph.getISBNCount)
+getAuthorsBooksCount = _nonBlocking(aleph.getAuthorsBooksCount)
+getPublishersBooksCount = _nonBlocking(aleph.getPublishersBooksCount)
+getBooksTitleCount = _nonBlocking(aleph.getBooksTitleCount)
+getICZBooksCount = _nonBlocking(aleph.getICZBooksCount)
+getISBNCountMany = _nonBlocking(aleph.getISBNCountMany)
+
+
+# AMQP interface ==============================================================
+def reactToAMQPMessage(req, send_back, callback=None):
+    """
+    Non-blocking version of :func:`aleph.reactToAMQPMessage`.
+
+    Args:
+        req (Request class): Any of the Request class from
+            :class:`aleph.datastructures.requests`.
+        send_back (fn reference): See :func:`aleph.reactToAMQPMessage`.
+        callback (fn reference, optional): Called with the Result class, when
+                 the request is successfully processed.
+
+    Returns:
+        obj: :class:`multiprocessing.pool.AsyncResult` instance, which will \
+             hold the Result class.
+    """
+    from . import reactToAMQPMessage as _reactToAMQPMessage
+
+    return submit(_reactToAMQPMessage, req, send_back, callback=callback)
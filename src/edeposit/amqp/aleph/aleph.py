@@ -21,10 +21,14 @@ Lowlevel
 You can use this functions to access Aleph::
 
     searchInAleph(base, phrase, considerSimilar, field)
-    downloadRecords(search_result, [from_doc])
+    downloadRecords(search_result, [from_doc], [batch_size], [workers])
+    iterRecords(search_result, [from_doc], [page_size])
+    iterRecordPages(search_result, [from_doc], [page_size], [to_doc])
     getDocumentIDs(aleph_search_result, [number_of_docs])
     downloadMARCXML(doc_id, library)
     downloadMARCOAI(doc_id, base)
+    downloadMARCXMLMany(doc_ids, [library])
+    downloadMARCOAIMany(doc_ids, [base])
 
 Workflow
 ********
@@ -98,6 +102,9 @@ Note:
     Counting functions are by one request faster than just counting results
     from standard getters. It is preferred to use them to reduce load to Aleph.
 
+If you need to count records for many ISBNs, use :func:`getISBNCountMany`,
+which asks for many ISBNs by one request.
+
 Other noteworthy properties
 ===========================
 
@@ -106,14 +113,29 @@ returns list of strings.
 
 There is also defined exception tree - see :class:`AlephException` doc-string
 for details.
+
+Negative answers from Aleph (empty sets and missing documents) are remembered
+for :attr:`aleph.settings.ALEPH_NEGATIVE_CACHE_TTL` seconds. They can be
+forgotten sooner by :func:`invalidateEmptySet` and
+:func:`invalidateMissingDocument`.
+
+If :attr:`aleph.settings.ALEPH_METRICS` is set, latency, size and errors of
+all calls to X-Services are recorded by :mod:`aleph.metrics`.
 """
+import re
 from collections import namedtuple
 from string import Template
 from urllib import quote_plus
 
-import dhtmlparser
-from httpkie import Downloader
-
+import cache
+import metrics
+import parsers
+import transport
+import ratelimit
+import document_cache
+import response_parser
+from parallel import parallelMap
+from response_parser import tryConvertToInt as _tryConvertToInt
 from settings import *
 
 
@@ -128,6 +150,12 @@ RECORD_URL_TEMPLATE = "/X?op=present&set_number=$SET_NUM&set_entry=$RECORD_NUM"
 
 MAX_RECORDS = 30
 
+#: How many records are requested by one ``op=present`` request in
+#: :func:`downloadRecords`.
+RECORD_BATCH_SIZE = MAX_RECORDS
+
+_RECORD_RE = re.compile(r"<record(?:\s[^>]*)?>.*?</record>", re.DOTALL)
+
 
 VALID_ALEPH_FIELDS = [
     "wrd",
@@ -180,10 +208,30 @@ VALID_ALEPH_FIELDS = [
 - ``wpk``
 """
 
-dhtmlparser.NONPAIR_TAGS = []  # used for parsing XML - see documentation
-
 
 # Functions & objects =========================================================
+def _download(url):
+    """
+    Download `url` using transport shared by all functions in this module.
+
+    Request is delayed by the limiter from :mod:`aleph.ratelimit`, if there is
+    too much requests. See :mod:`aleph.transport` for details about transport.
+    Calls are recorded by :mod:`aleph.metrics`, if it is enabled.
+
+    Args:
+        url (str): Absolute URL.
+
+    Returns:
+        str: Body of the response.
+    """
+    ratelimit.getLimiter().acquire()
+
+    if metrics.isEnabled():
+        return metrics.measureCall(url, transport.getTransport().download)
+
+    return transport.getTransport().download(url)
+
+
 class AlephException(Exception):
     """
     Exception tree::
@@ -236,13 +284,24 @@ def getListOfBases():
     """
     This function is here mainly for purposes of unittest
 
+    List is downloaded once per :attr:`ALEPH_CACHE_BASES_TTL` seconds.
+
     Returns:
         list of str: Valid bases as they are used as URL parameters in links at
                      Aleph main page.
     """
-    downer = Downloader()
-    data = downer.download(ALEPH_URL + "/F/?func=file&file_name=base-list")
-    dom = dhtmlparser.parseString(data.lower())
+    return list(
+        cache.getCache().cached(
+            ("bases",),
+            ALEPH_CACHE_BASES_TTL,
+            _downloadListOfBases
+        )
+    )
+
+
+def _downloadListOfBases():
+    data = _download(ALEPH_URL + "/F/?func=file&file_name=base-list")
+    dom = parsers.parseString(data.lower())
 
     # from default aleph page filter links containing local_base in their href
     base_links = filter(
@@ -268,49 +327,91 @@ def getListOfBases():
     return list(set(bases))  # list(set()) is same as unique()
 
 
-def _tryConvertToInt(s):
-    """
-    Try convert value from `s` to int.
+def _listOf(value):
+    if isinstance(value, list):
+        return value
 
-    Returns:
-        int(s): If the value was successfully converted, or `s` when conversion
-                failed.
+    return [value]
+
+
+def _emptySetKey(base, phrase, considerSimilar, field):
+    return (
+        "empty set",
+        cache.normalize(base),
+        cache.normalize(field),
+        cache.normalize(phrase),
+        bool(considerSimilar),
+    )
+
+
+def _missingDocumentKey(kind, namespace, doc_id):
+    return (
+        "missing document",
+        kind,
+        namespace,
+        document_cache.docKey(doc_id),
+    )
+
+
+def _rememberMissing(key, fn):
+    """
+    Call `fn` and remember :class:`DocumentNotFoundException` raised by it
+    for :attr:`aleph.settings.ALEPH_NEGATIVE_CACHE_TTL` seconds, so the same
+    document is not asked again.
     """
+    message = cache.getCache().get(key)
+    if message is not None:
+        raise DocumentNotFoundException(message)
+
     try:
-        return int(s)
-    except ValueError:
-        return s
+        return fn()
+    except DocumentNotFoundException as e:
+        cache.getCache().set(key, str(e), ALEPH_NEGATIVE_CACHE_TTL)
+        raise
 
 
-def _alephResultToDict(dom):
+def invalidateEmptySet(base, phrase, considerSimilar, field):
     """
-    Convert part of non-nested XML to :py:class:`dict`.
+    Forget, that search for `phrase` in `field` returned empty set, so the
+    next :func:`searchInAleph` asks Aleph again.
 
-    Args:
-        dom (HTMLElement tree): pre-parsed XML (see dhtmlparser).
+    Arguments are the same as for :func:`searchInAleph`.
 
     Returns:
-        dict: with python data
+        bool: True if the empty set was remembered.
     """
-    result = {}
-    for i in dom.childs:
-        if not i.isOpeningTag():
-            continue
+    return cache.getCache().invalidate(
+        _emptySetKey(base, phrase, considerSimilar, field)
+    )
 
-        keyword = i.getTagName().strip()
-        value = _tryConvertToInt(i.getContent().strip())
 
-        # if there are multiple tags with same keyword, add values into
-        # array, instead of rewriting existing value at given keyword
-        if keyword in result:                  # if it is already there ..
-            if isinstance(result[keyword], list):  # and it is list ..
-                result[keyword].append(value)          # add it to list
-            else:                                  # or make it array
-                result[keyword] = [result[keyword], value]
-        else:                                  # if it is not in result, add it
-            result[keyword] = value
+def invalidateMissingDocument(doc_id, namespace):
+    """
+    Forget, that document `doc_id` was not found in `namespace` (library for
+    :func:`downloadMARCXML`, base for :func:`downloadMARCOAI`).
+
+    Returns:
+        bool: True if the missing document was remembered.
+    """
+    removed = [
+        cache.getCache().invalidate(
+            _missingDocumentKey(kind, namespace, doc_id)
+        )
+        for kind in [document_cache.MARC_XML, document_cache.MARC_OAI]
+    ]
 
-    return result
+    return any(removed)
+
+
+def _searchURL(base, phrase, considerSimilar, field):
+    param_url = Template(SEARCH_URL_TEMPLATE).substitute(
+        PHRASE=quote_plus(phrase),  # urlencode phrase
+        BASE=base,
+        FIELD=field,
+        SIMILAR="Y" if considerSimilar else "N"
+    )
+
+    return ALEPH_URL + param_url
 
 
 def searchInAleph(base, phrase, considerSimilar, field):
@@ -350,29 +451,28 @@ def searchInAleph(base, phrase, considerSimilar, field):
     Raises:
         AlephException: if Aleph doesn't return any information
         InvalidAlephFieldException: if specified field is not valid
-    """
-    downer = Downloader()
 
+    Note:
+        Empty sets are remembered for
+        :attr:`aleph.settings.ALEPH_NEGATIVE_CACHE_TTL` seconds, see
+        :func:`invalidateEmptySet`.
+    """
     if field.lower() not in VALID_ALEPH_FIELDS:
         raise InvalidAlephFieldException("Unknown field '" + field + "'!")
 
-    param_url = Template(SEARCH_URL_TEMPLATE).substitute(
-        PHRASE=quote_plus(phrase),  # urlencode phrase
-        BASE=base,
-        FIELD=field,
-        SIMILAR="Y" if considerSimilar else "N"
-    )
-    result = downer.download(ALEPH_URL + param_url)
+    # known empty sets are not asked again, see invalidateEmptySet()
+    empty_set_key = _emptySetKey(base, phrase, considerSimilar, field)
+    result = cache.getCache().get(empty_set_key)
+    if result is not None:
+        return dict(result)
 
-    dom = dhtmlparser.parseString(result)
+    result = _download(_searchURL(base, phrase, considerSimilar, field))
 
-    find = dom.find("find")  # find <find> element :)
+    # find <find> element and convert it into dictionary
+    find = response_parser.findElements(result, "find")
     if len(find) <= 0:
         raise AlephException("Aleph didn't returned any information.")
-    find = find[0]
-
-    # convert aleph result into dictionary
-    result = _alephResultToDict(find)
+    result = find[0].fields
 
     # add informations about base into result
     result["base"] = base
@@ -383,51 +483,201 @@ def searchInAleph(base, phrase, considerSimilar, field):
     # handle errors
     if result["error"] == "empty set":
         result["no_entries"] = 0  # empty set have 0 entries
+        cache.getCache().set(
+            empty_set_key,
+            dict(result),
+            ALEPH_NEGATIVE_CACHE_TTL
+        )
         return result
     else:
         raise AlephException(result["error"])
 
 
-def downloadRecords(search_result, from_doc=1):
+def _splitRecords(data):
+    """
+    Split response to ``op=present`` request with range of `set_entry` to
+    list of responses, as they would be returned for each record separately.
+
+    Args:
+        data (str): Response from Aleph.
+
+    Returns:
+        list: List of XML strings, one for each ``<record>`` in `data`.
+    """
+    records = list(_RECORD_RE.finditer(data))
+
+    if not records:
+        return []
+
+    header = data[:records[0].start()]
+    footer = data[records[-1].end():]
+
+    return [
+        header + record.group() + footer
+        for record in records
+    ]
+
+
+def _alignSetNumber(set_number):
+    """
+    Returns:
+        str: `set_number` aligned to 6 digits.
+    """
+    # set numbers should be probably aligned to some length
+    set_number = str(set_number)
+    if len(set_number) < 6:
+        set_number = (6 - len(set_number)) * "0" + set_number
+
+    return set_number
+
+
+def _downloadRecord(set_number, record_num):
+    return _download(
+        ALEPH_URL + Template(RECORD_URL_TEMPLATE).substitute(
+            SET_NUM=set_number,
+            RECORD_NUM=record_num,
+        )
+    )
+
+
+def _downloadRecordRange(set_number, first, last):
+    """
+    Download records `first` - `last` from set `set_number` using one request.
+
+    If Aleph doesn't return any ``<record>`` for the range, records are
+    downloaded one by one.
+
+    Returns:
+        list: List of XML strings with documents in MARC OAI.
+    """
+    if first == last:
+        return [_downloadRecord(set_number, first)]
+
+    records = _splitRecords(
+        _downloadRecord(set_number, "%09d-%09d" % (first, last))
+    )
+
+    if records:
+        return records
+
+    return [
+        _downloadRecord(set_number, record_num)
+        for record_num in range(first, last + 1)
+    ]
+
+
+def downloadRecords(search_result, from_doc=1,
+                    batch_size=RECORD_BATCH_SIZE, workers=1):
     """
     Download `MAX_RECORDS` documents from `search_result` starting from
     `from_doc`.
 
+    Records are downloaded in batches of `batch_size` records, by one
+    ``op=present`` request for each batch.
+
     Attr:
         search_result (dict): returned from :func:`searchInAleph`.
         from_doc (int, default 1): Start from document number `from_doc`.
+        batch_size (int, default RECORD_BATCH_SIZE): How many records are
+                   downloaded by one request. Use 1 to download each record
+                   by separate request.
+        workers (int, default 1): How many requests may run in parallel.
 
     Returns:
         list: List of XML strings with documents in MARC OAI.
     """
-    downer = Downloader()
-
     if "set_number" not in search_result:
         return []
 
-    # set numbers should be probably aligned to some length
-    set_number = str(search_result["set_number"])
-    if len(set_number) < 6:
-        set_number = (6 - len(set_number)) * "0" + set_number
+    set_number = _alignSetNumber(search_result["set_number"])
 
-    # download all no_records
-    records = []
-    for cnt in range(search_result["no_records"]):
-        doc_number = from_doc + cnt
+    last_doc = min(from_doc + MAX_RECORDS - 1, search_result["no_records"])
 
-        if cnt >= MAX_RECORDS or doc_number > search_result["no_records"]:
-            break
+    if batch_size <= 1:
+        records = parallelMap(
+            lambda record_num: _downloadRecord(set_number, record_num),
+            range(from_doc, last_doc + 1),
+            workers=workers
+        )
+    else:
+        batches = parallelMap(
+            lambda first: _downloadRecordRange(
+                set_number,
+                first,
+                min(first + batch_size - 1, last_doc)
+            ),
+            range(from_doc, last_doc + 1, batch_size),
+            workers=workers
+        )
+        records = sum(batches, [])
 
-        set_data = downer.download(
-            ALEPH_URL + Template(RECORD_URL_TEMPLATE).substitute(
-                SET_NUM=set_number,
-                RECORD_NUM=doc_number,
-            )
+    return records
+
+
+def iterRecordPages(search_result, from_doc=1, page_size=RECORD_BATCH_SIZE,
+                    to_doc=None):
+    """
+    Iterate over pages of documents from `search_result`, starting from
+    `from_doc`.
+
+    Each page is downloaded lazily by one ``op=present`` request, only when
+    it is needed.
+
+    Attr:
+        search_result (dict): returned from :func:`searchInAleph`.
+        from_doc (int, default 1): Start from document number `from_doc`.
+        page_size (int, default RECORD_BATCH_SIZE): How many records are
+                  downloaded by one request.
+        to_doc (int, default None): Stop at document number `to_doc`. Default
+               None for the end of the set.
+
+    Yields:
+        list: XML strings with documents in MARC OAI, up to `page_size` in
+              one list.
+    """
+    if "set_number" not in search_result:
+        return
+
+    set_number = _alignSetNumber(search_result["set_number"])
+    page_size = max(page_size, 1)
+
+    last_doc = search_result["no_records"]
+    if to_doc is not None:
+        last_doc = min(to_doc, last_doc)
+
+    for first in xrange(from_doc, last_doc + 1, page_size):
+        records = _downloadRecordRange(
+            set_number,
+            first,
+            min(first + page_size - 1, last_doc)
         )
 
-        records.append(set_data)
+        yield records
 
-    return records
+
+def iterRecords(search_result, from_doc=1, page_size=RECORD_BATCH_SIZE):
+    """
+    Iterate over all documents from `search_result` starting from `from_doc`.
+
+    Unlike :func:`downloadRecords`, this is not limited by `MAX_RECORDS`.
+    Records are downloaded lazily in pages of `page_size` records (see
+    :func:`iterRecordPages`) and yielded as soon as the page arrives, so only
+    one page is held in memory at a time.
+
+    Attr:
+        search_result (dict): returned from :func:`searchInAleph`.
+        from_doc (int, default 1): Start from document number `from_doc`.
+        page_size (int, default RECORD_BATCH_SIZE): How many records are
+                  downloaded by one request.
+
+    Yields:
+        str: XML strings with documents in MARC OAI.
+    """
+    pages = iterRecordPages(search_result, from_doc, page_size)
+
+    for page in pages:
+        for record in page:
+            yield record
 
 
 def getDocumentIDs(aleph_search_result, number_of_docs=-1):
@@ -450,22 +700,17 @@ def getDocumentIDs(aleph_search_result, number_of_docs=-1):
         Returned :class:`DocumentID` can be used as parameters to
         :func:`downloadMARCXML`.
     """
-    downer = Downloader()
-
     if "set_number" not in aleph_search_result:
         return []
 
-    # set numbers should be probably aligned to some length
-    set_number = str(aleph_search_result["set_number"])
-    if len(set_number) < 6:
-        set_number = (6 - len(set_number)) * "0" + set_number
+    set_number = _alignSetNumber(aleph_search_result["set_number"])
 
     # limit number of fetched documents, if -1, download all
     if number_of_docs <= 0:
         number_of_docs = aleph_search_result["no_entries"]
 
     # download data about given set
-    set_data = downer.download(
+    set_data = _download(
         ALEPH_URL + Template(SET_URL_TEMPLATE).substitute(
             SET_NUMBER=set_number,
             NUMBER_OF_DOCS=number_of_docs,
@@ -473,8 +718,7 @@ def getDocumentIDs(aleph_search_result, number_of_docs=-1):
     )
 
     # parse data
-    dom = dhtmlparser.parseString(set_data)
-    set_data = dom.find("ill-get-set")
+    set_data = response_parser.findElements(set_data, "ill-get-set")
 
     # there should be at least one <ill-get-set> field
     if len(set_data) <= 0:
@@ -482,7 +726,7 @@ def getDocumentIDs(aleph_search_result, number_of_docs=-1):
 
     ids = []
     for library in set_data:
-        documents = _alephResultToDict(library)
+        documents = library.fields
 
         if "error" in documents:
             raise AlephException("getDocumentIDs: " + documents["error"])
@@ -528,45 +772,55 @@ def downloadMARCXML(doc_id, library, base="nkc"):
     Raises:
         LibraryNotFoundException
         DocumentNotFoundException
+
+    Note:
+        Documents are read thru :mod:`aleph.document_cache`, if it is enabled.
+        Missing documents are remembered for
+        :attr:`aleph.settings.ALEPH_NEGATIVE_CACHE_TTL` seconds, see
+        :func:`invalidateMissingDocument`.
     """
-    downer = Downloader()
+    return _rememberMissing(
+        _missingDocumentKey(document_cache.MARC_XML, library, doc_id),
+        lambda: document_cache.cached(
+            document_cache.MARC_XML,
+            library,
+            doc_id,
+            lambda: _downloadMARCXML(doc_id, library)
+        )
+    )
 
-    data = downer.download(
+
+def _downloadMARCXML(doc_id, library):
+    data = _download(
         ALEPH_URL + Template(DOC_URL_TEMPLATE).substitute(
             DOC_ID=doc_id,
             LIBRARY=library
         )
     )
 
-    dom = dhtmlparser.parseString(data)
+    # check if there are any errors (by one pass thru the document)
+    elements = response_parser.findElementsMany(data, ["login", "ill-get-doc"])
 
-    # check if there are any errors
     # bad library error
-    error = dom.find("login")
-    if error:
-        error_msg = error[0].find("error")
-
-        if error_msg:
-            raise LibraryNotFoundException(
-                "Can't download document doc_id: '" + str(doc_id) + "' " +
-                "(probably bad library: '" + library + "')!\nMessage: " +
-                "\n".join(map(lambda x: x.getContent(), error_msg))
-            )
+    error = elements["login"]
+    if error and "error" in error[0].fields:
+        raise LibraryNotFoundException(
+            "Can't download document doc_id: '" + str(doc_id) + "' " +
+            "(probably bad library: '" + library + "')!\nMessage: " +
+            "\n".join(map(str, _listOf(error[0].fields["error"])))
+        )
 
     # another error - document not found
-    error = dom.find("ill-get-doc")
-    if error:
-        error_msg = error[0].find("error")
-
-        if error_msg:
-            raise DocumentNotFoundException(
-                "\n".join(map(lambda x: x.getContent(), error_msg))
-            )
+    error = elements["ill-get-doc"]
+    if error and "error" in error[0].fields:
+        raise DocumentNotFoundException(
+            "\n".join(map(str, _listOf(error[0].fields["error"])))
+        )
 
     return data  # MARCxml of document with given doc_id
 
 
-def downloadMARCOAI(doc_id, base):
+def downloadMARCOAI(doc_id, base, max_age=None):
     """
     Download MARC OAI document with given `doc_id` from given (logical) `base`.
 
@@ -580,6 +834,9 @@ def downloadMARCOAI(doc_id, base):
                               This seems to be duplicite with
                               :func:`searchInAleph` parameters, but it's just
                               something Aleph's X-Services wants, so ..
+        max_age (float, default None): Download the document from Aleph, if
+                it was stored in :mod:`aleph.document_cache` more than
+                `max_age` seconds ago.
 
     Returns:
         str: MARC XML Unicode string.
@@ -587,34 +844,119 @@ def downloadMARCOAI(doc_id, base):
     Raises:
         InvalidAlephBaseException
         DocumentNotFoundException
+
+    Note:
+        Documents are read thru :mod:`aleph.document_cache`, if it is enabled.
+        Missing documents are remembered for
+        :attr:`aleph.settings.ALEPH_NEGATIVE_CACHE_TTL` seconds, see
+        :func:`invalidateMissingDocument`.
     """
-    downer = Downloader()
+    return _rememberMissing(
+        _missingDocumentKey(document_cache.MARC_OAI, base, doc_id),
+        lambda: document_cache.cached(
+            document_cache.MARC_OAI,
+            base,
+            doc_id,
+            lambda: _downloadMARCOAI(doc_id, base),
+            max_age=max_age
+        )
+    )
 
-    data = downer.download(
+
+def _downloadMARCOAI(doc_id, base):
+    data = _download(
         ALEPH_URL + Template(OAI_DOC_URL_TEMPLATE).substitute(
             DOC_ID=doc_id,
             BASE=base
         )
     )
 
-    dom = dhtmlparser.parseString(data)
-
     # check for errors
-    error = dom.find("error")
+    error = response_parser.findElements(data, "error")
     if len(error) <= 0:  # no errors
         return data
 
-    if "Error reading document" in error[0].getContent():
+    if "Error reading document" in error[0].content:
         raise DocumentNotFoundException(
-            str(error[0].getContent())
+            str(error[0].content)
         )
     else:
         raise InvalidAlephBaseException(
-            error[0].getContent() + "\n" +
+            error[0].content + "\n" +
             "The base you are trying to access probably doesn't exist."
         )
 
 
+def downloadMARCXMLMany(doc_ids, library=DEFAULT_LIBRARY,
+                        workers=ALEPH_DOWNLOAD_WORKERS):
+    """
+    Download MARC XML documents for all `doc_ids` in parallel.
+
+    Args:
+        doc_ids (list): List of :class:`DocumentID` (see
+                :func:`getDocumentIDs`) or plain IDs.
+        library (str, default settings.DEFAULT_LIBRARY): Library used for
+                plain IDs. :class:`DocumentID` carries its own library.
+        workers (int, default settings.ALEPH_DOWNLOAD_WORKERS): How many
+                documents may be downloaded at the same time.
+
+    Returns:
+        list: MARC XML strings in the same order as `doc_ids`. Documents \
+              which were not found are represented by \
+              :class:`DocumentNotFoundException` instance.
+
+    Raises:
+        LibraryNotFoundException
+    """
+    def download(doc_id):
+        if isinstance(doc_id, DocumentID):
+            return downloadMARCXML(doc_id.id, doc_id.library, doc_id.base)
+
+        return downloadMARCXML(doc_id, library)
+
+    return parallelMap(
+        download,
+        doc_ids,
+        workers=workers,
+        catch=DocumentNotFoundException
+    )
+
+
+def downloadMARCOAIMany(doc_ids, base=ALEPH_DEFAULT_BASE,
+                        workers=ALEPH_DOWNLOAD_WORKERS):
+    """
+    Download MARC OAI documents for all `doc_ids` in parallel.
+
+    Args:
+        doc_ids (list): List of :class:`DocumentID` (see
+                :func:`getDocumentIDs`) or plain IDs.
+        base (str, default settings.ALEPH_DEFAULT_BASE): Base used for plain
+                IDs. :class:`DocumentID` carries its own base.
+        workers (int, default settings.ALEPH_DOWNLOAD_WORKERS): How many
+                documents may be downloaded at the same time.
+
+    Returns:
+        list: MARC OAI strings in the same order as `doc_ids`. Documents \
+              which were not found are represented by \
+              :class:`DocumentNotFoundException` instance.
+
+    Raises:
+        InvalidAlephBaseException
+    """
+    def download(doc_id):
+        if isinstance(doc_id, DocumentID):
+            return downloadMARCOAI(doc_id.id, doc_id.base)
+
+        return downloadMARCOAI(doc_id, base)
+
+    return parallelMap(
+        download,
+        doc_ids,
+        workers=workers,
+        catch=DocumentNotFoundException
+    )
+
+
 # High level API ==============================================================
 def getISBNsXML(isbn, base=ALEPH_DEFAULT_BASE):
     """
@@ -908,3 +1250,99 @@ def getICZBooksCount(icz, base=ALEPH_DEFAULT_BASE):
         int: Number of matching documents in Aleph.
     """
     return searchInAleph(base, icz, False, "icz")["no_entries"]
+
+
+# Bulk API ====================================================================
+def _orPhrase(field, phrases):
+    """
+    Join `phrases` to phrase for :func:`searchInAleph`, which matches any of
+    them (``A OR field=B OR field=C``).
+    """
+    return (" OR %s=" % field).join(phrases)
+
+
+def _groupPhrases(base, variants, field):
+    """
+    Split `variants` into groups, which can be asked by one ``op=find``
+    request with URL not longer than :attr:`settings.ALEPH_MAX_URL_LENGTH`.
+
+    Args:
+        variants (list): List of lists of phrases. Phrases from one list are
+                 never split into different groups.
+
+    Returns:
+        list: List of lists of phrases.
+    """
+    groups = []
+    group = []
+    for phrases in variants:
+        phrase_group = _orPhrase(field, group + phrases)
+        url = _searchURL(base, phrase_group, False, field)
+
+        if group and len(url) > ALEPH_MAX_URL_LENGTH:
+            groups.append(group)
+            group = []
+
+        group.extend(phrases)
+
+    if group:
+        groups.append(group)
+
+    return groups
+
+
+def _recordISBNs(xml):
+    """
+    Returns:
+        set: Keys (see :func:`aleph.cache.isbnKey`) of all ISBNs (valid and \
+             invalid) of the record `xml`.
+    """
+    record = parsers.getMARCXMLRecord()(xml)
+    isbns = record.get_ISBNs() + record.get_invalid_ISBNs()
+
+    return set(_bulkISBNKey(isbn) for isbn in isbns)
+
+
+def _bulkISBNKey(isbn):
+    return cache.isbnKey(isbn) or isbn.replace("-", "").strip().upper()
+
+
+def getISBNCountMany(isbns, base=ALEPH_DEFAULT_BASE):
+    """
+    Get number of records in Aleph for each ISBN from `isbns`.
+
+    ISBNs are not asked one by one. They are grouped into
+    ``sbn=A OR sbn=B ..`` queries, as long as the URL fits into
+    :attr:`settings.ALEPH_MAX_URL_LENGTH`. Records of each set are downloaded
+    once and mapped back to the ISBNs by their ``020`` fields, so all
+    variants of the ISBN (ISBN-10/13, with or without hyphens) are matched.
+
+    Args:
+        isbns (list): List of ISBN strings.
+        base (str, optional): base on which will be search performed. Default
+                    :attr:`aleph.settings.ALEPH_DEFAULT_BASE`.
+
+    Returns:
+        dict: ``{isbn: number_of_records}`` for each ISBN from `isbns`.
+    """
+    isbns = [isbn.strip() for isbn in isbns]
+
+    # variants of one ISBN are asked together, so the record is found (and
+    # counted) only once
+    variants = {}
+    for isbn in set(isbn for isbn in isbns if isbn):
+        variants.setdefault(_bulkISBNKey(isbn), []).append(isbn)
+
+    counts = dict((key, 0) for key in variants)
+    for group in _groupPhrases(base, variants.values(), "sbn"):
+        search_result = searchInAleph(base, _orPhrase("sbn", group), False,
+                                      "sbn")
+
+        for xml in iterRecords(search_result):
+            for key in _recordISBNs(xml) & set(counts):
+                counts[key] += 1
+
+    return dict(
+        (isbn, counts.get(_bulkISBNKey(isbn), 0) if isbn else 0)
+        for isbn in isbns
+    )
@@ -0,0 +1,413 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+In-memory cache of the query results.
+
+Queries from :mod:`aleph` (:class:`.ISBNQuery`, :class:`.DocumentQuery`, ..)
+store their results in the cache returned by :func:`getCache`, so the same
+questions asked repeatedly don't cost requests to Aleph.
+
+Cache is shared by all threads of the process. It is bounded by
+:attr:`aleph.settings.ALEPH_CACHE_SIZE` items, least recently used items are
+evicted first. Each item expires after its own TTL - see
+:attr:`aleph.settings.ALEPH_CACHE_COUNT_TTL`,
+:attr:`aleph.settings.ALEPH_CACHE_SEARCH_TTL` and
+:attr:`aleph.settings.ALEPH_CACHE_DOCUMENT_TTL`.
+
+Results of the searches and documents are refreshed in background, when they
+are older than :attr:`aleph.settings.ALEPH_CACHE_SEARCH_SOFT_TTL` and
+:attr:`aleph.settings.ALEPH_CACHE_DOCUMENT_SOFT_TTL`, so the callers get the
+(possibly stale) answer immediately even when Aleph is slow.
+
+When the publication is exported to Aleph, all items related to its ISBN are
+removed by :func:`invalidateISBN`.
+"""
+# Imports =====================================================================
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+
+import settings
+
+
+# Variables ===================================================================
+_CACHE = None
+_REFRESH_POOL = None
+_REFRESH_POOL_PID = None
+_CACHE_LOCK = threading.Lock()
+_MISSING = object()
+_ISBN_RE = re.compile(r"^[0-9Xx\- ]+$")
+_ISBN_TOKEN_RE = re.compile(r"[0-9Xx][0-9Xx\-]*")
+
+
+# Functions & objects =========================================================
+def _getRefreshPool():
+    """
+    Returns:
+        obj: :class:`multiprocessing.pool.ThreadPool` refreshing stale items.
+    """
+    global _REFRESH_POOL
+    global _REFRESH_POOL_PID
+
+    # threads of the pool don't survive fork, child needs its own pool
+    if _REFRESH_POOL is None or _REFRESH_POOL_PID != os.getpid():
+        with _CACHE_LOCK:
+            if _REFRESH_POOL is None or _REFRESH_POOL_PID != os.getpid():
+                from multiprocessing.pool import ThreadPool
+
+                _REFRESH_POOL = ThreadPool(
+                    settings.ALEPH_CACHE_REFRESH_WORKERS
+                )
+                _REFRESH_POOL_PID = os.getpid()
+
+    return _REFRESH_POOL
+
+
+def normalize(value):
+    """
+    Normalize `value` used in the cache key, so the same phrases written in a
+    slightly different way share the same item.
+
+    Returns:
+        obj: Lowercased `value` without redundant whitespace, if it is \
+             string, or `value` itself.
+    """
+    if isinstance(value, basestring):
+        return " ".join(value.split()).lower()
+
+    return value
+
+
+def isbnKey(value):
+    """
+    Convert `value` to the form shared by all variants of the same ISBN.
+
+    Args:
+        value (obj): ISBN-10 or ISBN-13, with or without hyphens.
+
+    Returns:
+        str: ISBN-13 without hyphens, or None if `value` is not valid ISBN.
+    """
+    if not isinstance(value, basestring) or not _ISBN_RE.match(value):
+        return None
+
+    import isbn_validator
+
+    isbn = value.replace("-", "").replace(" ", "").upper()
+
+    if isbn_validator.is_isbn10_valid(isbn):
+        isbn = "978" + isbn[:9]
+        return isbn + str(isbn_validator.get_isbn13_checksum(isbn))
+
+    if isbn_validator.is_isbn13_valid(isbn):
+        return isbn
+
+    return None
+
+
+class LRUCache(object):
+    """
+    Thread-safe cache with bounded size, which evicts least recently used
+    items and expires items after their TTL.
+
+    Items may also have soft TTL. Item older than its soft TTL is stale - it
+    is still returned by :meth:`cached`, but it is refreshed in background
+    thread. Only items older than their (hard) TTL are computed again
+    synchronously.
+
+    Values computed by :meth:`cached` are not stored, if any item was
+    invalidated during the computation, because the value may be computed
+    from the data, which were invalidated.
+
+    Args:
+        max_size (int): Maximal number of items. 0 or less disables the cache.
+
+    Attributes:
+        hits (int): Number of lookups, which found the item.
+        misses (int): Number of lookups, which didn't found valid item.
+        stale_hits (int): Number of hits, which returned stale item.
+        evictions (int): Number of items thrown away to make space.
+        expirations (int): Number of items thrown away because of their TTL.
+        refreshes (int): Number of background refreshes of stale items.
+        refresh_errors (int): Number of background refreshes, which failed.
+        generation (int): Number of invalidations (and clears) of the cache.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+
+        self._items = OrderedDict()  # key -> (expires, stale_at, value)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.generation = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def _lookup(self, key):
+        """
+        Returns:
+            tuple: ``(stale_at, value)`` of the valid item or None. Has to \
+                   be called with the lock held.
+        """
+        item = self._items.pop(key, None)
+
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires, stale_at, value = item
+        if expires <= time.time():
+            self.misses += 1
+            self.expirations += 1
+            return None
+
+        self._items[key] = item  # mark as most recently used
+        self.hits += 1
+
+        return stale_at, value
+
+    def get(self, key, default=None):
+        """
+        Returns:
+            obj: Value stored under `key` or `default`, if there is no such \
+                 item, or it is expired.
+        """
+        with self._lock:
+            item = self._lookup(key)
+
+        if item is None:
+            return default
+
+        return item[1]
+
+    def _store(self, key, value, ttl, soft_ttl):
+        now = time.time()
+
+        stale_at = now + ttl
+        if soft_ttl is not None and soft_ttl < ttl:
+            stale_at = now + soft_ttl
+
+        self._items.pop(key, None)
+        self._items[key] = (now + ttl, stale_at, value)
+
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key, value, ttl, soft_ttl=None):
+        """
+        Store `value` under `key` for `ttl` seconds. Item becomes stale after
+        `soft_ttl` seconds, if set.
+
+        Nothing is stored, if `ttl` is 0 or less, or the cache is disabled.
+        """
+        if ttl <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._store(key, value, ttl, soft_ttl)
+
+    def _refresh(self, key, ttl, soft_ttl, fn):
+        """
+        Compute new value of stale item by `fn` in background thread.
+
+        Each item is refreshed at most by one thread at a time. Item removed
+        (invalidated) during the refresh is not stored again.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return
+
+            self._refreshing.add(key)
+            self.refreshes += 1
+            generation = self.generation
+
+        def refresh():
+            try:
+                value = fn()
+            except Exception:
+                with self._lock:
+                    self.refresh_errors += 1
+                    self._refreshing.discard(key)
+                return
+
+            with self._lock:
+                if key in self._items and generation == self.generation:
+                    self._store(key, value, ttl, soft_ttl)
+
+                self._refreshing.discard(key)
+
+        _getRefreshPool().apply_async(refresh)
+
+    def cached(self, key, ttl, fn, soft_ttl=None):
+        """
+        Return value stored under `key`, or call `fn` and store its result
+        for `ttl` seconds.
+
+        Args:
+            key (hashable): Key of the item.
+            ttl (float): Time to live of the new item in seconds.
+            fn (fn reference): Function without arguments, which computes the
+               value. Exceptions raised by `fn` are not cached.
+            soft_ttl (float, default None): Item older than `soft_ttl` seconds
+                     is returned, but refreshed by `fn` in background.
+
+        Returns:
+            obj: Cached or computed value.
+        """
+        if ttl <= 0 or self.max_size <= 0:
+            return fn()
+
+        with self._lock:
+            item = self._lookup(key)
+            generation = self.generation
+
+            stale = item is not None and item[0] <= time.time()
+            if stale:
+                self.stale_hits += 1
+
+        if item is None:
+            value = fn()
+
+            # value computed before the invalidation is not stored
+            with self._lock:
+                if generation == self.generation:
+                    self._store(key, value, ttl, soft_ttl)
+
+            return value
+
+        if stale:
+            self._refresh(key, ttl, soft_ttl, fn)
+
+        return item[1]
+
+    def invalidate(self, key):
+        """
+        Remove item stored under `key`.
+
+        Returns:
+            bool: True if there was such item.
+        """
+        with self._lock:
+            self.generation += 1
+            return self._items.pop(key, None) is not None
+
+    def invalidateMatching(self, predicate):
+        """
+        Remove all items, for which ``predicate(key)`` returns True.
+
+        Returns:
+            int: Number of removed items.
+        """
+        with self._lock:
+            self.generation += 1
+            keys = [key for key in self._items if predicate(key)]
+
+            for key in keys:
+                del self._items[key]
+
+        return len(keys)
+
+    def clear(self):
+        """
+        Remove all items.
+        """
+        with self._lock:
+            self.generation += 1
+            self._items.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Size and hit/miss/eviction counters of the cache.
+        """
+        with self._lock:
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+            }
+
+
+def getCache():
+    """
+    Returns:
+        obj: :class:`LRUCache` shared by all queries. It is created from \
+             :mod:`aleph.settings` at first call, if not set by \
+             :func:`setCache`.
+    """
+    global _CACHE
+
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = LRUCache(settings.ALEPH_CACHE_SIZE)
+
+    return _CACHE
+
+
+def setCache(cache):
+    """
+    Replace shared cache by `cache`.
+
+    Args:
+        cache (obj): :class:`LRUCache` instance. ``None`` resets the cache to
+              the one defined by :mod:`aleph.settings`.
+
+    Returns:
+        obj: Previously used cache (or None).
+    """
+    global _CACHE
+
+    with _CACHE_LOCK:
+        old_cache, _CACHE = _CACHE, cache
+
+    return old_cache
+
+
+def invalidateISBN(isbn):
+    """
+    Remove all items from the shared cache, whose key contains `isbn` or any
+    of its variants (with or without hyphens, ISBN-10 or ISBN-13).
+
+    This is used after the publication with `isbn` is exported to Aleph, so
+    the cached answers are no longer valid.
+
+    Returns:
+        int: Number of removed items.
+    """
+    isbn = isbnKey(isbn)
+    if isbn is None:
+        return 0
+
+    def containsISBN(value):
+        if not isinstance(value, basestring):
+            return False
+
+        # phrases may contain more ISBNs (``A OR sbn=B``)
+        candidates = [value] + _ISBN_TOKEN_RE.findall(value)
+
+        return any(isbnKey(candidate) == isbn for candidate in candidates)
+
+    return getCache().invalidateMatching(
+        lambda key: any(containsISBN(value) for value in key)
+    )
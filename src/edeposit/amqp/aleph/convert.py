@@ -0,0 +1,163 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Conversion of MARC XML records to :class:`.AlephRecord` in the pool of
+processes.
+
+Parsing of the MARC XML to :class:`.EPublication` / :class:`.EPeriodical` and
+:class:`.SemanticInfo` is pure python CPU work, so it can't be sped up by
+threads. If :attr:`aleph.settings.ALEPH_CONVERT_WORKERS` is set,
+:func:`convertRecords` sends the raw XML to that many worker processes, in
+chunks of :attr:`aleph.settings.ALEPH_CONVERT_CHUNK_SIZE` records. Workers
+return just the `docNumber` and the parsed structures, which are joined with
+the XML back into :class:`.AlephRecord` in the calling process.
+
+Pool is created at first use and shared by all threads of the process. If
+the process forks, the child creates its own pool.
+
+Note:
+    Values from the MARC records are returned from the workers as plain
+    strings, so they lose ``i1``/``i2`` context of
+    :class:`marcxml_parser.MARCSubrecord` (it can't be pickled). They are
+    still equal to the values parsed in the current process.
+"""
+# Imports =====================================================================
+import os
+import threading
+
+import parsers
+import settings
+from doc_number import getDocNumber
+from datastructures import AlephRecord
+from datastructures.alephrecord import _convert
+
+
+# Variables ===================================================================
+_POOL = None
+_POOL_PID = None
+_POOL_LOCK = threading.Lock()
+
+
+# Functions & objects =========================================================
+def _compact(value):
+    """
+    Convert `value` to structure made only from the builtin types and
+    namedtuples, which can be cheaply pickled.
+    """
+    if isinstance(value, str):
+        return str.__str__(value)
+
+    if isinstance(value, unicode):
+        return unicode.__unicode__(value)
+
+    # tuple.__iter__(), so the LazyAlephRecord is not parsed
+    if isinstance(value, tuple) and hasattr(value, "_make"):
+        return value._make(_compact(item) for item in tuple.__iter__(value))
+
+    if isinstance(value, (list, tuple)):
+        return type(value)(_compact(item) for item in value)
+
+    if isinstance(value, dict):
+        return dict(
+            (_compact(key), _compact(item))
+            for key, item in value.iteritems()
+        )
+
+    return value
+
+
+def _convertXML(xml):
+    """
+    Parse `xml` in the worker process.
+
+    Returns:
+        tuple: ``(docNumber, parsed_info, semantic_info)``.
+    """
+    if not xml.strip():
+        return "-1", None, None
+
+    dom = parsers.parseString(str(xml))
+    parsed_info, semantic_info = _convert(parsers.getMARCXMLRecord()(dom))
+
+    return (
+        getDocNumber(dom),
+        _compact(parsed_info),
+        _compact(semantic_info),
+    )
+
+
+def _getPool():
+    global _POOL
+    global _POOL_PID
+
+    if _POOL is None or _POOL_PID != os.getpid():
+        with _POOL_LOCK:
+            if _POOL is None or _POOL_PID != os.getpid():
+                from multiprocessing import Pool
+
+                _POOL = Pool(settings.ALEPH_CONVERT_WORKERS)
+                _POOL_PID = os.getpid()
+
+    return _POOL
+
+
+def closePool():
+    """
+    Stop the worker processes. New pool is created at next use.
+    """
+    global _POOL
+
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+
+    if pool is not None and _POOL_PID == os.getpid():
+        pool.close()
+        pool.join()
+
+
+def convertRecords(xmls, base, library):
+    """
+    Convert MARC XML records returned by :func:`aleph.aleph.downloadRecords`
+    to :class:`.AlephRecord`.
+
+    Records are converted in the pool of
+    :attr:`aleph.settings.ALEPH_CONVERT_WORKERS` processes, or in the current
+    process, if it is set to 0 or there is just one record.
+
+    Args:
+        xmls (list): MARC XML strings.
+        base (str): Identity of base where the records are stored.
+        library (str): Library string.
+
+    Returns:
+        list: :class:`.AlephRecord` for each item in `xmls`, in the same order.
+    """
+    xmls = list(xmls)
+
+    if settings.ALEPH_CONVERT_WORKERS <= 0 or len(xmls) <= 1:
+        return [
+            AlephRecord.from_xml(base=base, library=library, xml=xml)
+            for xml in xmls
+        ]
+
+    converted = _getPool().map(
+        _convertXML,
+        xmls,
+        max(settings.ALEPH_CONVERT_CHUNK_SIZE, 1)
+    )
+
+    return [
+        AlephRecord(
+            base=base,
+            library=library,
+            docNumber=doc_number,
+            xml=xml,
+            parsed_info=parsed_info,
+            semantic_info=semantic_info,
+        )
+        for xml, (doc_number, parsed_info, semantic_info)
+        in zip(xmls, converted)
+    ]
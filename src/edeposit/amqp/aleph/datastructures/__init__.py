@@ -10,6 +10,7 @@ from requests import *
 from author import Author
 from format_enum import FormatEnum
 from alephrecord import AlephRecord
+from alephrecord import LazyAlephRecord
 from epublication import EPublication
 from semanticinfo import SemanticInfo
 
@@ -11,14 +11,44 @@ API
 # Imports =====================================================================
 from collections import namedtuple
 
-from marcxml_parser import MARCXMLRecord
-
 from epublication import EPublication
 from semanticinfo import SemanticInfo
 
 from eperiodical import EPeriodical
 from eperiodical_semantic_info import EPeriodicalSemanticInfo
 
+from ..parsers import parseString
+from ..parsers import getMARCXMLRecord
+from ..doc_number import getDocNumber
+
+
+# Functions ===================================================================
+def MARCXMLRecord(*args, **kwargs):
+    """
+    Create :class:`marcxml_parser.MARCXMLRecord`. Parser is imported at first
+    call.
+    """
+    return getMARCXMLRecord()(*args, **kwargs)
+
+
+def _convert(parsed):
+    """
+    Convert `parsed` record to parsed and semantic informations.
+
+    Args:
+        parsed (MARCXMLRecord): Parsed record.
+
+    Returns:
+        tuple: ``(parsed_info, semantic_info)``.
+    """
+    if parsed.is_continuing():
+        return (
+            EPeriodical.from_xml(parsed),
+            EPeriodicalSemanticInfo.from_xml(parsed),
+        )
+
+    return EPublication.from_xml(parsed), SemanticInfo.from_xml(parsed)
+
 
 # Structures ==================================================================
 class AlephRecord(namedtuple("AlephRecord", ['base',
@@ -50,26 +80,21 @@ class AlephRecord(namedtuple("AlephRecord", ['base',
 
     Note:
         :attr:`semantic_info` and :attr:`parsed` attributes are parsed
-        automatically from :attr:`xml` if not provided by user.
+        automatically from :attr:`xml` if not provided by user. When both are
+        provided (for example when the record is unpickled or deserialized),
+        they are trusted and :attr:`xml` is not parsed again.
     """
     def __new__(cls, base, library, docNumber, xml, parsed_info=None,
                 semantic_info=None):
-        if xml.strip():
+        if xml.strip() and not (parsed_info and semantic_info):
             parsed = xml
-            if not isinstance(parsed, MARCXMLRecord):  # caching
+            if not isinstance(parsed, getMARCXMLRecord()):  # caching
                 parsed = MARCXMLRecord(str(parsed))
 
-            if not semantic_info:
-                if parsed.is_continuing():
-                    semantic_info = EPeriodicalSemanticInfo.from_xml(parsed)
-                else:
-                    semantic_info = SemanticInfo.from_xml(parsed)
+            converted_info, converted_semantic_info = _convert(parsed)
 
-            if not parsed_info:
-                if parsed.is_continuing():
-                    parsed_info = EPeriodical.from_xml(parsed)
-                else:
-                    parsed_info = EPublication.from_xml(parsed)
+            parsed_info = parsed_info or converted_info
+            semantic_info = semantic_info or converted_semantic_info
 
         return super(AlephRecord, cls).__new__(
             cls,
@@ -80,3 +105,148 @@ class AlephRecord(namedtuple("AlephRecord", ['base',
             parsed_info=parsed_info,
             semantic_info=semantic_info,
         )
+
+    def __reduce__(self):
+        """
+        Pickle the record with all its fields, so it is not parsed again when
+        it is unpickled.
+        """
+        return (self.__class__, self.__getnewargs__())
+
+    @classmethod
+    def from_xml(cls, base, library, xml):
+        """
+        Create :class:`AlephRecord` from `xml` returned by
+        :func:`aleph.aleph.downloadRecords`.
+
+        `xml` is parsed only once - the same DOM is used to read the
+        `docNumber` and to build :attr:`parsed_info` and
+        :attr:`semantic_info`.
+
+        Args:
+            base (str): Identity of base where this record is stored.
+            library (str): Library string.
+            xml (str): MARC XML source returned from Aleph.
+
+        Returns:
+            obj: :class:`AlephRecord` instance.
+        """
+        if not xml.strip():
+            return cls(base, library, "-1", xml)
+
+        dom = parseString(str(xml))
+        parsed_info, semantic_info = _convert(MARCXMLRecord(dom))
+
+        return cls(
+            base=base,
+            library=library,
+            docNumber=getDocNumber(dom),
+            xml=xml,
+            parsed_info=parsed_info,
+            semantic_info=semantic_info,
+        )
+
+
+class LazyAlephRecord(AlephRecord):
+    """
+    Variant of :class:`AlephRecord`, which parses :attr:`xml` to
+    :attr:`parsed_info` and :attr:`semantic_info` only when they are accessed
+    for the first time. Result of parsing is memoized.
+
+    It can be used the same way as :class:`AlephRecord` (attributes, indexing,
+    unpacking, comparison), but consumers, which just count the records or
+    forward the :attr:`xml`, don't pay for parsing.
+
+    Attributes:
+        See :class:`AlephRecord`.
+    """
+    def __new__(cls, base, library, docNumber, xml, parsed_info=None,
+                semantic_info=None):
+        return tuple.__new__(
+            cls,
+            (base, library, docNumber, str(xml), parsed_info, semantic_info)
+        )
+
+    @classmethod
+    def from_xml(cls, base, library, xml):
+        """
+        Create :class:`LazyAlephRecord` from `xml` returned by
+        :func:`aleph.aleph.downloadRecords`.
+
+        Only the `docNumber` is read from the `xml`, rest is parsed at first
+        access.
+
+        Args:
+            base (str): Identity of base where this record is stored.
+            library (str): Library string.
+            xml (str): MARC XML source returned from Aleph.
+
+        Returns:
+            obj: :class:`LazyAlephRecord` instance.
+        """
+        return cls(base, library, getDocNumber(xml), xml)
+
+    def _parsed(self):
+        """
+        Returns:
+            tuple: ``(parsed_info, semantic_info)``, parsed at first call.
+        """
+        if "_parsed_fields" not in self.__dict__:
+            xml = tuple.__getitem__(self, 3)
+            parsed_info = tuple.__getitem__(self, 4)
+            semantic_info = tuple.__getitem__(self, 5)
+
+            if xml.strip() and not (parsed_info and semantic_info):
+                converted = _convert(MARCXMLRecord(xml))
+
+                parsed_info = parsed_info or converted[0]
+                semantic_info = semantic_info or converted[1]
+
+            self.__dict__["_parsed_fields"] = (parsed_info, semantic_info)
+
+        return self.__dict__["_parsed_fields"]
+
+    def __getnewargs__(self):
+        """
+        Don't parse the record just because it is pickled.
+        """
+        if "_parsed_fields" in self.__dict__:
+            return tuple(self)
+
+        return tuple.__getitem__(self, slice(0, 6))
+
+    @property
+    def parsed_info(self):
+        return self._parsed()[0]
+
+    @property
+    def semantic_info(self):
+        return self._parsed()[1]
+
+    def __iter__(self):
+        return iter(tuple.__getitem__(self, slice(0, 4)) + self._parsed())
+
+    def __getitem__(self, index):
+        # fields, which doesn't require parsing (also used by properties)
+        if isinstance(index, (int, long)) and 0 <= index < 4:
+            return tuple.__getitem__(self, index)
+
+        return tuple(self)[index]
+
+    def __getslice__(self, start, stop):
+        return tuple(self)[start:stop]
+
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return "LazyAlephRecord(%s)" % ", ".join(
+            "%s=%r" % (name, value)
+            for name, value in zip(self._fields, self)
+        )
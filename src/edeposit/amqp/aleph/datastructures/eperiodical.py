@@ -7,12 +7,11 @@
 # Imports =====================================================================
 from collections import namedtuple
 
-from marcxml_parser import MARCXMLRecord
-
 from .author import Author
 from .format_enum import FormatEnum
 
 from ..aleph import DocumentNotFoundException
+from ..parsers import getMARCXMLRecord
 
 
 # Structures ==================================================================
@@ -63,6 +62,8 @@ class EPeriodical(namedtuple("EPeriodical", ["url",
             structure: :class:`.EPublication` namedtuple with data about \
                        publication.
         """
+        MARCXMLRecord = getMARCXMLRecord()
+
         parsed = xml
         if not isinstance(xml, MARCXMLRecord):
             parsed = MARCXMLRecord(str(xml))
@@ -10,11 +10,10 @@ catalogization process of periodical publications.
 # Imports =====================================================================
 from collections import namedtuple
 
-from remove_hairs import remove_hairs
-from marcxml_parser import MARCXMLRecord
-
 from semanticinfo import _parse_summaryRecordSysNumber
 
+from ..parsers import getMARCXMLRecord
+
 
 # Structures ==================================================================
 class EPeriodicalSemanticInfo(namedtuple("EPeriodicalSemanticInfo", [
@@ -70,6 +69,8 @@ class EPeriodicalSemanticInfo(namedtuple("EPeriodicalSemanticInfo", [
         parsedSummaryRecordSysNumber = ""
         summaryRecordSysNumber = ""
 
+        MARCXMLRecord = getMARCXMLRecord()
+
         parsed = xml
         if not isinstance(xml, MARCXMLRecord):
             parsed = MARCXMLRecord(str(xml))
@@ -6,12 +6,11 @@
 # Imports =====================================================================
 from collections import namedtuple
 
-from marcxml_parser import MARCXMLRecord
-
 from .author import Author
 from .format_enum import FormatEnum
 
 from ..aleph import DocumentNotFoundException
+from ..parsers import getMARCXMLRecord
 
 
 # Functions ===================================================================
@@ -100,6 +99,8 @@ class EPublication(namedtuple("EPublication", ["ISBN",
             structure: :class:`.EPublication` namedtuple with data about \
                        publication.
         """
+        MARCXMLRecord = getMARCXMLRecord()
+
         parsed = xml
         if not isinstance(xml, MARCXMLRecord):
             parsed = MARCXMLRecord(str(xml))
@@ -11,6 +11,8 @@ All strucutures defined here are simple dataholders, based on `namedtuple`.
 """
 from collections import namedtuple
 
+from ..settings import ALEPH_DEFAULT_BASE
+
 
 class CountRequest(namedtuple("CountRequest", ["query"])):
     """
@@ -31,19 +33,35 @@ class CountRequest(namedtuple("CountRequest", ["query"])):
     pass
 
 
-class SearchRequest(namedtuple("SearchRequest", ['query'])):
+class SearchRequest(namedtuple("SearchRequest", ['query',
+                                                 'whole_set',
+                                                 'stream'])):
     """
     Perform search in Aleph with given `query`.
 
     Attributes:
         query (Query object): GenericQuery, ISBNQuery, .. (Any)Query structure
               defined in :class:`aleph` module.
+        whole_set (bool, default False): Return all records from the set,
+                  not just first :attr:`aleph.aleph.MAX_RECORDS`. Records are
+                  downloaded by pages.
+        stream (bool, default False): Send records thru `send_back` callback
+               of :func:`aleph.reactToAMQPMessage` in
+               :class:`.SearchResultChunk` structures as the pages arrive,
+               each followed by :class:`.SearchProgress`. Response is
+               :class:`.SearchSummary` in that case.
 
     See Also:
         :func:`aleph.reactToAMQPMessage` returns
         :class:`aleph.datastructures.results.SearchResult` as response.
     """
-    pass
+    def __new__(cls, query, whole_set=False, stream=False):
+        return super(SearchRequest, cls).__new__(
+            cls,
+            query,
+            whole_set,
+            stream
+        )
 
 
 class ISBNValidationRequest(namedtuple("ISBNValidationRequest", ['ISBN'])):
@@ -80,3 +98,42 @@ class ExportRequest(namedtuple("AlephExport", ['epublication'])):
         :class:`aleph.datastructures.results.ExportResult` as response.
     """
     pass
+
+
+class ISBNCountManyRequest(namedtuple("ISBNCountManyRequest", ['ISBNs',
+                                                               'base'])):
+    """
+    Get number of records in Aleph for each of the `ISBNs`.
+
+    ISBNs are asked by few large queries instead of one query for each ISBN,
+    see :func:`aleph.aleph.getISBNCountMany`.
+
+    Attributes:
+        ISBNs (list): List of ISBN strings.
+        base (str, default settings.ALEPH_DEFAULT_BASE): Base in Aleph.
+
+    See Also:
+        :func:`aleph.reactToAMQPMessage` returns
+        :class:`aleph.datastructures.results.ISBNCountManyResult` as response.
+    """
+    def __new__(cls, ISBNs, base=ALEPH_DEFAULT_BASE):
+        return super(ISBNCountManyRequest, cls).__new__(cls, ISBNs, base)
+
+
+class BatchRequest(namedtuple("BatchRequest", ['requests'])):
+    """
+    Process many requests at once.
+
+    Requests are processed in parallel by
+    :attr:`aleph.settings.ALEPH_BATCH_WORKERS` threads, identical requests
+    only once.
+
+    Attributes:
+        requests (list): :class:`CountRequest`, :class:`SearchRequest`, ..
+                 structures. :class:`BatchRequest` can't be nested.
+
+    See Also:
+        :func:`aleph.reactToAMQPMessage` returns
+        :class:`aleph.datastructures.results.BatchResult` as response.
+    """
+    pass
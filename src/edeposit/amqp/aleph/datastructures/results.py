@@ -36,6 +36,42 @@ class SearchResult(namedtuple("SearchResult", ['records'])):
     pass
 
 
+class SearchResultChunk(namedtuple("SearchResultChunk", ['records'])):
+    """
+    Part of the result sent thru `send_back` callback of
+    :func:`aleph.reactToAMQPMessage`, when :class:`.SearchRequest` with
+    `stream` flag is received.
+
+    Attributes:
+        records (list): Array of AlephRecord structures from one page.
+    """
+    pass
+
+
+class SearchProgress(namedtuple("SearchProgress", ['fetched', 'total'])):
+    """
+    Sent thru `send_back` callback after each :class:`SearchResultChunk`.
+
+    Attributes:
+        fetched (int): Number of records sent so far.
+        total (int): Number of records, which will be sent.
+    """
+    pass
+
+
+class SearchSummary(namedtuple("SearchSummary", ['num_of_records',
+                                                 'num_of_entries'])):
+    """
+    Returned as response to :class:`.SearchRequest` with `stream` flag, after
+    all :class:`SearchResultChunk` structures were sent.
+
+    Attributes:
+        num_of_records (int): Number of records sent in chunks.
+        num_of_entries (int): Number of records matching the query in Aleph.
+    """
+    pass
+
+
 class CountResult(namedtuple("CountResult", ['num_of_records'])):
     """
     This is returned back to client when he send :class:`.CountRequest`.
@@ -46,6 +82,16 @@ class CountResult(namedtuple("CountResult", ['num_of_records'])):
     pass
 
 
+class ISBNCountManyResult(namedtuple("ISBNCountManyResult", ['counts'])):
+    """
+    Response to :class:`.ISBNCountManyRequest`.
+
+    Attributes:
+        counts (dict): ``{ISBN: num_of_records}`` for each requested ISBN.
+    """
+    pass
+
+
 class ExportResult(namedtuple("ExportResult", ["ISBN"])):
     """
     Sent back as response to :class:`.ExportRequest`.
@@ -57,3 +103,27 @@ class ExportResult(namedtuple("ExportResult", ["ISBN"])):
         ISBN (str): ISBN of accepted publication.
     """
     pass
+
+
+class ErrorResult(namedtuple("ErrorResult", ["exception", "message"])):
+    """
+    Put into :class:`BatchResult` (or sent by :class:`aleph.harness.Harness`)
+    in place of the result of the request, which failed.
+
+    Attributes:
+        exception (str): Name of the exception class
+                  (``DocumentNotFoundException`` for example).
+        message (str): Message of the exception.
+    """
+    pass
+
+
+class BatchResult(namedtuple("BatchResult", ["results"])):
+    """
+    Response to :class:`.BatchRequest`.
+
+    Attributes:
+        results (list): Result structures in the same order as the requests.
+                Failed requests are represented by :class:`ErrorResult`.
+    """
+    pass
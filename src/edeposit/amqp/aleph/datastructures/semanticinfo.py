@@ -10,9 +10,7 @@ catalogization process.
 # Imports =====================================================================
 from collections import namedtuple
 
-
-from remove_hairs import remove_hairs
-from marcxml_parser import MARCXMLRecord
+from ..parsers import getMARCXMLRecord
 
 
 # Functions ===================================================================
@@ -21,6 +19,8 @@ def _parse_summaryRecordSysNumber(summaryRecordSysNumber):
     Try to parse vague, not likely machine-readable description and return
     first token, which contains enough numbers in it.
     """
+    from remove_hairs import remove_hairs
+
     def number_of_digits(token):
         digits = filter(lambda x: x.isdigit(), token)
         return len(digits)
@@ -115,6 +115,8 @@ class SemanticInfo(namedtuple("SemanticInfo", ["hasAcquisitionFields",
         isSummaryRecord = False
         contentOfFMT = ""
 
+        MARCXMLRecord = getMARCXMLRecord()
+
         parsed = xml
         if not isinstance(xml, MARCXMLRecord):
             parsed = MARCXMLRecord(str(xml))
@@ -4,7 +4,14 @@
 # Interpreter version: python 2.7
 #
 # Imports =====================================================================
-import dhtmlparser
+import re
+
+
+# Variables ===================================================================
+_DOC_NUMBER_RE = re.compile(
+    r"<doc_number(?:\s[^>]*)?>(.*?)</doc_number\s*>",
+    re.DOTALL | re.IGNORECASE
+)
 
 
 # Functions & objects =========================================================
@@ -13,16 +20,28 @@ def getDocNumber(xml):
     Parse <doc_number> tag from `xml`.
 
     Args:
-        xml (str): XML string returned from :func:`aleph.aleph.downloadRecords`
+        xml (str/HTMLElement): XML string returned from
+            :func:`aleph.aleph.downloadRecords`, or DOM already parsed by
+            :func:`dhtmlparser.parseString`.
 
     Returns:
         str: Doc ID as string or "-1" if not found.
+
+    Note:
+        String is not parsed to DOM, the tag is just found by regular
+        expression.
     """
-    dom = dhtmlparser.parseString(xml)
+    if not isinstance(xml, basestring):  # already parsed DOM
+        doc_number_tag = xml.find("doc_number")
+
+        if not doc_number_tag:
+            return "-1"
+
+        return doc_number_tag[0].getContent().strip()
 
-    doc_number_tag = dom.find("doc_number")
+    doc_number_tag = _DOC_NUMBER_RE.search(xml)
 
     if not doc_number_tag:
         return "-1"
 
-    return doc_number_tag[0].getContent().strip()
+    return doc_number_tag.group(1).strip()
@@ -0,0 +1,306 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Persistent cache of the MARC documents downloaded from Aleph.
+
+Documents are stored compressed in sqlite database at
+:attr:`aleph.settings.ALEPH_DOCUMENT_CACHE_PATH`. Database runs in WAL mode,
+so it can be shared by all worker processes of the daemon and it survives
+restarts. Documents expire after
+:attr:`aleph.settings.ALEPH_DOCUMENT_CACHE_TTL` seconds.
+
+:func:`aleph.aleph.downloadMARCXML` and :func:`aleph.aleph.downloadMARCOAI`
+read thru the cache. Records from the sets (:func:`aleph.aleph.downloadRecords`)
+are not cached, because they are addressed by the set, not by the document.
+
+Expired documents are removed from the database, when it is opened.
+"""
+# Imports =====================================================================
+import os
+import time
+import zlib
+import threading
+
+import settings
+
+
+# Variables ===================================================================
+#: Kind of the documents returned by :func:`aleph.aleph.downloadMARCXML`.
+MARC_XML = "marcxml"
+
+#: Kind of the documents returned by :func:`aleph.aleph.downloadMARCOAI`.
+MARC_OAI = "marcoai"
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    kind TEXT NOT NULL,
+    namespace TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    expires REAL NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (kind, namespace, doc_id)
+)
+"""
+
+
+# Functions & objects =========================================================
+def docKey(doc_id):
+    """
+    Returns:
+        str: `doc_id` without leading zeros, so ``000001234`` and ``1234`` \
+             share the same item.
+    """
+    return str(doc_id).strip().lstrip("0") or "0"
+
+
+class DocumentCache(object):
+    """
+    Cache of the documents in sqlite database, shared by threads and
+    processes.
+
+    Each thread (and each forked process) uses its own connection to the
+    database.
+
+    Args:
+        path (str): Path to the sqlite database. It is created if it doesn't
+             exist.
+        ttl (float): How long in seconds are the documents kept.
+
+    Attributes:
+        hits (int): Number of documents found in this process.
+        misses (int): Number of documents not found in this process.
+    """
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        with self._connection() as conn:
+            conn.execute(_SCHEMA)
+
+        self.purge()
+
+    def _connection(self):
+        """
+        Returns:
+            obj: :class:`sqlite3.Connection` of current thread and process.
+        """
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            import sqlite3
+
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+
+            self._local.conn = conn
+            self._local.pid = pid
+
+        return self._local.conn
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, kind, namespace, doc_id, max_age=None):
+        """
+        Args:
+            kind (str): :attr:`MARC_XML` or :attr:`MARC_OAI`.
+            namespace (str): Library or base of the document.
+            doc_id (str): ID of the document.
+            max_age (float, default None): Ignore the document, if it was
+                    stored more than `max_age` seconds ago.
+
+        Returns:
+            str: Document or None, if it is not cached or expired.
+        """
+        # documents expire `ttl` seconds after they are stored
+        now = time.time()
+        expires_after = now
+        if max_age is not None:
+            expires_after = max(now, now - max_age + self.ttl)
+
+        row = self._connection().execute(
+            "SELECT data FROM documents WHERE kind=? AND namespace=? AND "
+            "doc_id=? AND expires>?",
+            (kind, namespace, docKey(doc_id), expires_after)
+        ).fetchone()
+
+        self._count(row is not None)
+
+        if row is None:
+            return None
+
+        return zlib.decompress(str(row[0]))
+
+    def setMany(self, kind, namespace, documents):
+        """
+        Store `documents` in one transaction.
+
+        Args:
+            kind (str): :attr:`MARC_XML` or :attr:`MARC_OAI`.
+            namespace (str): Library or base of the documents.
+            documents (list): ``(doc_id, data)`` tuples.
+        """
+        import sqlite3
+
+        expires = time.time() + self.ttl
+
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        kind,
+                        namespace,
+                        docKey(doc_id),
+                        expires,
+                        sqlite3.Binary(zlib.compress(data)),
+                    )
+                    for doc_id, data in documents
+                ]
+            )
+
+    def set(self, kind, namespace, doc_id, data):
+        """
+        Store document `data`. See :meth:`get` for description of the
+        arguments.
+        """
+        self.setMany(kind, namespace, [(doc_id, data)])
+
+    def cached(self, kind, namespace, doc_id, fn, max_age=None):
+        """
+        Return cached document, or call `fn` and store its result. See
+        :meth:`get` for description of the arguments.
+
+        Exceptions raised by `fn` are not cached.
+        """
+        data = self.get(kind, namespace, doc_id, max_age=max_age)
+
+        if data is None:
+            data = fn()
+            self.set(kind, namespace, doc_id, data)
+
+        return data
+
+    def invalidate(self, kind, namespace, doc_id):
+        """
+        Remove the document from cache.
+
+        Returns:
+            bool: True if there was such document.
+        """
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM documents WHERE kind=? AND namespace=? AND "
+                "doc_id=?",
+                (kind, namespace, docKey(doc_id))
+            )
+
+        return cursor.rowcount > 0
+
+    def purge(self):
+        """
+        Remove expired documents.
+
+        Returns:
+            int: Number of removed documents.
+        """
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM documents WHERE expires<=?",
+                (time.time(),)
+            )
+
+        return cursor.rowcount
+
+    def clear(self):
+        """
+        Remove all documents.
+        """
+        with self._connection() as conn:
+            conn.execute("DELETE FROM documents")
+
+    def stats(self):
+        """
+        Returns:
+            dict: Number of stored documents and hit/miss counters of this \
+                  process.
+        """
+        size = self._connection().execute(
+            "SELECT COUNT(*) FROM documents"
+        ).fetchone()[0]
+
+        with self._lock:
+            return {
+                "size": size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def getDocumentCache():
+    """
+    Returns:
+        obj: :class:`DocumentCache` shared by the whole process, or None if \
+             the cache is disabled. It is created from :mod:`aleph.settings` \
+             at first call, if not set by :func:`setDocumentCache`.
+    """
+    global _CACHE
+
+    if _CACHE is None and settings.ALEPH_DOCUMENT_CACHE_PATH:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = DocumentCache(
+                    settings.ALEPH_DOCUMENT_CACHE_PATH,
+                    ttl=settings.ALEPH_DOCUMENT_CACHE_TTL,
+                )
+
+    return _CACHE
+
+
+def setDocumentCache(cache):
+    """
+    Replace shared cache by `cache`.
+
+    Args:
+        cache (obj): :class:`DocumentCache` instance. ``None`` resets the
+              cache to the one defined by :mod:`aleph.settings`.
+
+    Returns:
+        obj: Previously used cache (or None).
+    """
+    global _CACHE
+
+    with _CACHE_LOCK:
+        old_cache, _CACHE = _CACHE, cache
+
+    return old_cache
+
+
+def cached(kind, namespace, doc_id, fn, max_age=None):
+    """
+    Read document thru the shared cache, see :meth:`DocumentCache.cached`.
+
+    `fn` is just called, if the cache is disabled.
+    """
+    doc_cache = getDocumentCache()
+
+    if doc_cache is None:
+        return fn()
+
+    return doc_cache.cached(kind, namespace, doc_id, fn, max_age=max_age)
@@ -26,10 +26,8 @@ Note:
     highly depend on number of people, which will use this project.
 """
 # Imports =====================================================================
-import isbn_validator
-from httpkie import Downloader
-
 import settings
+import ratelimit
 from datastructures import Author
 from datastructures import FormatEnum
 from datastructures import EPublication
@@ -217,6 +215,8 @@ class PostData(object):
         if not raw_isbn and accept_blank:
             return raw_isbn
 
+        import isbn_validator
+
         if not isbn_validator.is_valid_isbn(raw_isbn):
             raise InvalidISBNException(
                 raw_isbn + " has invalid ISBN checksum!"
@@ -328,8 +328,11 @@ def _sendPostDict(post_dict):
     Returns:
         str: Reponse from webform.
     """
+    from httpkie import Downloader  # imported at first use
+
     downer = Downloader()
     downer.headers["Referer"] = settings.EDEPOSIT_EXPORT_REFERER
+    ratelimit.getLimiter().acquire()
     data = downer.download(settings.ALEPH_EXPORT_URL, post=post_dict)
     rheaders = downer.response_headers
 
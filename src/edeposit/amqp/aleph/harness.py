@@ -0,0 +1,330 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Pre-forking harness for the daemons processing requests by
+:func:`aleph.reactToAMQPMessage`.
+
+:class:`Harness` does all the expensive work only once, in the parent
+process:
+
+1. :func:`warmUp` imports the parsers and other dependencies, which are
+   imported lazily, downloads the list of bases and the hot documents to the
+   :mod:`aleph.cache`.
+2. :attr:`aleph.settings.ALEPH_HARNESS_WORKERS` workers are forked. They share
+   the imported modules and the warm cache with the parent copy-on-write, so
+   they are ready immediately.
+3. Requests are passed to the workers thru the queue and the results are sent
+   back thru another queue as :class:`Response` messages.
+
+Example::
+
+    from aleph import CountRequest, ISBNQuery
+    from aleph.harness import Harness
+
+    harness = Harness(workers=4, hot_documents=["000000001"])
+    harness.start()
+
+    message_id = harness.submit(CountRequest(ISBNQuery("80-251-0225-4")))
+    response = harness.getResponse(timeout=60)  # Response(message_id, ..)
+
+    harness.stop()
+
+Records are converted from MARC XML in the workers, regardless of
+:attr:`aleph.settings.ALEPH_CONVERT_WORKERS`.
+
+Queues are objects with ``.put(item)`` and ``.get(timeout=None)`` methods.
+Workers use :class:`multiprocessing.Queue`. With 0 workers, the requests are
+processed by one thread of the current process thru :class:`Queue.Queue`,
+which is used as stand-in in tests.
+
+Forked workers share one rate limit (see :mod:`aleph.ratelimit`). If the
+limiter is in-memory :class:`.TokenBucket`, it is replaced by
+:class:`.FileTokenBucket` in temporary file until the harness is stopped.
+
+Answers dropped from the cache by :class:`.ExportRequest` (see
+:func:`aleph.cache.invalidateISBN`) in one worker are dropped also by the
+other workers, before they process their next request.
+"""
+# Imports =====================================================================
+import os
+import Queue
+import tempfile
+import itertools
+import threading
+from collections import namedtuple
+
+import aleph
+import cache
+import parsers
+import settings
+import ratelimit
+from convert import _compact
+from datastructures import ErrorResult
+
+
+# Functions & objects =========================================================
+class Response(namedtuple("Response", ["message_id", "result", "last"])):
+    """
+    Message sent by the worker back to the :class:`Harness`.
+
+    Attributes:
+        message_id (int): ID of the request returned by
+                   :meth:`Harness.submit`.
+        result (obj): Result class, message sent by the request thru
+               `send_back`, or :class:`.ErrorResult`, if the request failed.
+        last (bool): True for the last message of the request.
+    """
+    pass
+
+
+def warmUp(hot_documents=(), bases=True):
+    """
+    Import and download everything, what is needed by the workers.
+
+    Args:
+        hot_documents (list): IDs of the documents (or :class:`.DocumentQuery`
+                      objects), which are downloaded to the cache.
+        bases (bool, default True): Download the list of bases (see
+              :func:`aleph.aleph.getListOfBases`).
+    """
+    from . import DocumentQuery
+
+    # dependencies imported at first use
+    import httpkie
+    import isbn_validator
+    import remove_hairs
+    from xml.etree import cElementTree
+    parsers.getMARCXMLRecord()
+
+    if bases:
+        aleph.getListOfBases()
+
+    for document in hot_documents:
+        query = document
+        if not isinstance(query, DocumentQuery):
+            query = DocumentQuery(document)
+
+        try:
+            query.getSearchResult()
+        except aleph.DocumentNotFoundException:
+            pass
+
+
+def _invalidate(invalidations):
+    """
+    Drop cached answers for all ISBNs waiting in `invalidations` queue.
+    """
+    while True:
+        try:
+            ISBN = invalidations.get_nowait()
+        except Queue.Empty:
+            return
+
+        cache.invalidateISBN(ISBN)
+
+
+def serve(requests, responses, invalidations=None, peers=()):
+    """
+    Process requests from `requests` queue until ``None`` is received.
+
+    Args:
+        requests (queue): ``(message_id, request)`` tuples.
+        responses (queue): :class:`Response` for each message sent back by
+                  the request, followed by the Result class.
+        invalidations (queue, default None): ISBNs exported by the other
+                      workers. Cached answers for them are dropped before
+                      each request.
+        peers (list, default ()): `invalidations` queues of the other
+              workers, where the ISBNs exported by this worker are sent.
+    """
+    from . import reactToAMQPMessage
+    from . import _exportedISBNs
+
+    while True:
+        message = requests.get()
+        if message is None:
+            return
+
+        if invalidations is not None:
+            _invalidate(invalidations)
+
+        message_id, request = message
+
+        def send_back(result):
+            responses.put(Response(message_id, _compact(result), False))
+
+        try:
+            result = reactToAMQPMessage(request, send_back)
+        except Exception as e:
+            result = ErrorResult(e.__class__.__name__, str(e))
+
+        for ISBN in _exportedISBNs(request):
+            for peer in peers:
+                peer.put(ISBN)
+
+        responses.put(Response(message_id, _compact(result), True))
+
+
+def _serveForked(requests, responses, invalidations, peers):
+    """
+    :func:`serve` in the forked worker.
+
+    Workers are daemonic processes, which can't start the pool of
+    :mod:`aleph.convert`, so the records are converted in the worker itself.
+    Workers already run in parallel anyway.
+    """
+    settings.ALEPH_CONVERT_WORKERS = 0
+
+    serve(requests, responses, invalidations, peers)
+
+
+class Harness(object):
+    """
+    Pool of pre-forked workers processing the requests.
+
+    Args:
+        workers (int, default settings.ALEPH_HARNESS_WORKERS): Number of
+                forked processes. 0 processes the requests in thread of
+                current process.
+        hot_documents (list, default ()): See :func:`warmUp`.
+        bases (bool, default True): See :func:`warmUp`.
+
+    Attributes:
+        requests (queue): Queue of the ``(message_id, request)`` tuples.
+        responses (queue): Queue of the :class:`Response` messages.
+    """
+    def __init__(self, workers=None, hot_documents=(), bases=True):
+        self.workers = workers
+        if workers is None:
+            self.workers = settings.ALEPH_HARNESS_WORKERS
+
+        self.hot_documents = hot_documents
+        self.bases = bases
+
+        self.requests = None
+        self.responses = None
+
+        self._ids = itertools.count(1)
+        self._ids_lock = threading.Lock()
+        self._workers = []
+
+        self._limiter_path = None
+        self._old_limiter = None
+
+    def start(self):
+        """
+        Warm up the current process and start the workers.
+        """
+        warmUp(self.hot_documents, self.bases)
+
+        if self.workers <= 0:
+            self.requests = Queue.Queue()
+            self.responses = Queue.Queue()
+
+            worker = threading.Thread(
+                target=serve,
+                args=(self.requests, self.responses)
+            )
+            worker.daemon = True
+            worker.start()
+
+            self._workers = [worker]
+            return
+
+        import multiprocessing
+
+        self._shareLimiter()
+
+        self.requests = multiprocessing.Queue()
+        self.responses = multiprocessing.Queue()
+
+        invalidations = [
+            multiprocessing.Queue()
+            for _ in range(self.workers)
+        ]
+
+        for queue in invalidations:
+            peers = [peer for peer in invalidations if peer is not queue]
+
+            worker = multiprocessing.Process(
+                target=_serveForked,
+                args=(self.requests, self.responses, queue, peers)
+            )
+            worker.daemon = True
+            worker.start()
+
+            self._workers.append(worker)
+
+    def _shareLimiter(self):
+        """
+        Replace in-memory :class:`.TokenBucket` by :class:`.FileTokenBucket`
+        with the same rate, so the forked workers don't have their own copies
+        of the bucket. Other limiters are kept.
+        """
+        limiter = ratelimit.getLimiter()
+        if type(limiter) is not ratelimit.TokenBucket:
+            return
+
+        fd, self._limiter_path = tempfile.mkstemp(prefix="aleph_ratelimit_")
+        os.close(fd)
+
+        self._old_limiter = ratelimit.setLimiter(
+            ratelimit.FileTokenBucket(
+                self._limiter_path,
+                rate=limiter.rate,
+                burst=limiter.burst
+            )
+        )
+
+    def submit(self, request):
+        """
+        Pass `request` to the workers.
+
+        Args:
+            request (Request class): Any request accepted by
+                    :func:`aleph.reactToAMQPMessage`.
+
+        Returns:
+            int: ID of the request used in the :class:`Response` messages.
+        """
+        with self._ids_lock:
+            message_id = next(self._ids)
+
+        self.requests.put((message_id, request))
+
+        return message_id
+
+    def getResponse(self, timeout=None):
+        """
+        Args:
+            timeout (float, default None): How long to wait in seconds.
+
+        Returns:
+            obj: Next :class:`Response` sent by the workers.
+
+        Raises:
+            Queue.Empty: If there is no response in `timeout`.
+        """
+        return self.responses.get(timeout=timeout)
+
+    def stop(self):
+        """
+        Let the workers finish requests already submitted and wait for them.
+        """
+        for _ in self._workers:
+            self.requests.put(None)
+
+        for worker in self._workers:
+            worker.join()
+
+        self._workers = []
+
+        if self._limiter_path:
+            ratelimit.setLimiter(self._old_limiter)
+            os.remove(self._limiter_path)
+
+            self._limiter_path = None
+            self._old_limiter = None
@@ -0,0 +1,448 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Metrics of the calls to Aleph's X-Services.
+
+When :attr:`aleph.settings.ALEPH_METRICS` is set, each call made by
+:mod:`aleph.aleph` is recorded to the :class:`Registry` returned by
+:func:`getRegistry`:
+
+- histogram of the latency for each ``op`` (``find``, ``present``,
+  ``ill_get_set``, ``ill_get_doc``, ``find_doc``, ..),
+- number of bytes received for each ``op``,
+- number of errors by ``op`` and name of the exception class.
+
+For each request processed by :func:`aleph.reactToAMQPMessage` is recorded
+histogram of the fan-out (number of X-Service calls made by the request) and
+number of failed requests by name of the exception class. Calls made by
+requests in :class:`.BatchRequest` are counted also for the batch.
+
+Registry can be exported to dict by :meth:`Registry.snapshot`, or to
+Prometheus text format by :meth:`Registry.toPrometheus`.
+
+When the metrics are disabled (default), only the setting is checked.
+"""
+# Imports =====================================================================
+import re
+import sys
+import time
+import bisect
+import threading
+
+import settings
+
+
+# Variables ===================================================================
+#: Upper bounds of the buckets of the latency histogram (seconds).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+                   30)
+
+#: Upper bounds of the buckets of the fan-out histogram (number of calls).
+FAN_OUT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_OP_RE = re.compile(r"[?&]op=([a-zA-Z_-]+)")
+
+_REGISTRY = None
+_REGISTRY_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
+# Functions & objects =========================================================
+class Histogram(object):
+    """
+    Histogram with fixed buckets.
+
+    Args:
+        buckets (tuple): Upper bounds of the buckets. Bucket for values over
+                the last bound is added automatically.
+    """
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """
+        Returns:
+            list: ``(upper_bound, count)`` for each bucket, count including \
+                  the lower buckets. Last bound is ``float("inf")``.
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: ``{"count": .., "sum": .., "buckets": [(bound, count)]}``.
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": self.cumulative(),
+        }
+
+
+class Registry(object):
+    """
+    Thread-safe storage of the metrics.
+
+    Args:
+        latency_buckets (tuple, default LATENCY_BUCKETS): Buckets of the
+                        latency histograms.
+        fan_out_buckets (tuple, default FAN_OUT_BUCKETS): Buckets of the
+                        fan-out histograms.
+    """
+    def __init__(self, latency_buckets=LATENCY_BUCKETS,
+                 fan_out_buckets=FAN_OUT_BUCKETS):
+        self.latency_buckets = latency_buckets
+        self.fan_out_buckets = fan_out_buckets
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all recorded values.
+        """
+        with self._lock:
+            self.latency = {}
+            self.bytes = {}
+            self.errors = {}
+            self.fan_out = {}
+            self.request_errors = {}
+
+    def observeCall(self, op, seconds, size=0, exception=None):
+        """
+        Record one call to X-Services.
+
+        Args:
+            op (str): Value of the ``op`` parameter of the call.
+            seconds (float): How long the call took.
+            size (int, default 0): Size of the response in bytes.
+            exception (str, default None): Name of the exception class, if
+                      the call failed.
+        """
+        with self._lock:
+            if op not in self.latency:
+                self.latency[op] = Histogram(self.latency_buckets)
+
+            self.latency[op].observe(seconds)
+            self.bytes[op] = self.bytes.get(op, 0) + size
+
+            if exception:
+                key = (op, exception)
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def observeRequest(self, request, calls, exception=None):
+        """
+        Record request processed by :func:`aleph.reactToAMQPMessage`.
+
+        Args:
+            request (str): Name of the request class.
+            calls (int): Number of calls to X-Services made by the request.
+            exception (str, default None): Name of the exception class, if
+                      the request failed.
+        """
+        with self._lock:
+            if request not in self.fan_out:
+                self.fan_out[request] = Histogram(self.fan_out_buckets)
+
+            self.fan_out[request].observe(calls)
+
+            if exception:
+                key = (request, exception)
+                self.request_errors[key] = self.request_errors.get(key, 0) + 1
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: All metrics as plain python structures.
+        """
+        def nested(counters):
+            result = {}
+            for (first, second), count in counters.iteritems():
+                result.setdefault(first, {})[second] = count
+
+            return result
+
+        with self._lock:
+            return {
+                "latency": dict(
+                    (op, histogram.snapshot())
+                    for op, histogram in self.latency.iteritems()
+                ),
+                "bytes": dict(self.bytes),
+                "errors": nested(self.errors),
+                "fan_out": dict(
+                    (request, histogram.snapshot())
+                    for request, histogram in self.fan_out.iteritems()
+                ),
+                "request_errors": nested(self.request_errors),
+            }
+
+    def toPrometheus(self):
+        """
+        Returns:
+            str: All metrics in Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def header(name, kind, description):
+            lines.append("# HELP %s %s" % (name, description))
+            lines.append("# TYPE %s %s" % (name, kind))
+
+        def histogram(name, label, histograms):
+            for value, data in sorted(histograms.iteritems()):
+                for bound, count in data["buckets"]:
+                    lines.append('%s_bucket{%s="%s",le="%s"} %d' % (
+                        name, label, value, _formatBound(bound), count
+                    ))
+
+                lines.append(
+                    '%s_sum{%s="%s"} %r' % (name, label, value, data["sum"])
+                )
+                lines.append(
+                    '%s_count{%s="%s"} %d' % (name, label, value,
+                                              data["count"])
+                )
+
+        def errors(name, label, counters):
+            for value, exceptions in sorted(counters.iteritems()):
+                for exception, count in sorted(exceptions.iteritems()):
+                    lines.append('%s{%s="%s",exception="%s"} %d' % (
+                        name, label, value, exception, count
+                    ))
+
+        header(
+            "aleph_xservice_call_seconds",
+            "histogram",
+            "Latency of the calls to Aleph X-Services."
+        )
+        histogram("aleph_xservice_call_seconds", "op", snapshot["latency"])
+
+        header(
+            "aleph_xservice_response_bytes_total",
+            "counter",
+            "Bytes received from Aleph X-Services."
+        )
+        for op, size in sorted(snapshot["bytes"].iteritems()):
+            lines.append(
+                'aleph_xservice_response_bytes_total{op="%s"} %d' % (op, size)
+            )
+
+        header(
+            "aleph_xservice_errors_total",
+            "counter",
+            "Failed calls to Aleph X-Services."
+        )
+        errors("aleph_xservice_errors_total", "op", snapshot["errors"])
+
+        header(
+            "aleph_request_xservice_calls",
+            "histogram",
+            "Number of calls to Aleph X-Services made by one request."
+        )
+        histogram(
+            "aleph_request_xservice_calls",
+            "request",
+            snapshot["fan_out"]
+        )
+
+        header(
+            "aleph_request_errors_total",
+            "counter",
+            "Failed requests."
+        )
+        errors(
+            "aleph_request_errors_total",
+            "request",
+            snapshot["request_errors"]
+        )
+
+        return "\n".join(lines) + "\n"
+
+
+def _formatBound(bound):
+    if bound == float("inf"):
+        return "+Inf"
+
+    return repr(float(bound))
+
+
+class _CallCounter(object):
+    """
+    Number of X-Service calls made by one request.
+    """
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def add(self, calls):
+        with self._lock:
+            self.calls += calls
+
+
+def isEnabled():
+    """
+    Returns:
+        bool: True, if :attr:`aleph.settings.ALEPH_METRICS` is set.
+    """
+    return settings.ALEPH_METRICS
+
+
+def getOp(url):
+    """
+    Returns:
+        str: Value of the ``op`` parameter from `url`, or ``other``.
+    """
+    match = _OP_RE.search(url)
+    if not match:
+        return "other"
+
+    return match.group(1)
+
+
+def measureCall(url, fn):
+    """
+    Call `fn` with `url` and record the call to the registry.
+
+    Args:
+        url (str): URL of the X-Service.
+        fn (fn reference): Function downloading the `url`.
+
+    Returns:
+        str: Result of `fn`.
+    """
+    start = time.time()
+    try:
+        data = fn(url)
+    except Exception:
+        exc_info = sys.exc_info()
+        _recordCall(url, start, exception=exc_info[0].__name__)
+
+        raise exc_info[0], exc_info[1], exc_info[2]
+
+    _recordCall(url, start, size=len(data))
+
+    return data
+
+
+def _recordCall(url, start, size=0, exception=None):
+    getRegistry().observeCall(
+        getOp(url),
+        time.time() - start,
+        size=size,
+        exception=exception
+    )
+
+    counter = getattr(_LOCAL, "counter", None)
+    if counter is not None:
+        counter.add(1)
+
+
+def measureRequest(request, fn):
+    """
+    Call `fn` and record the number of X-Service calls made by it.
+
+    Calls are also counted for the request, which is processed by the
+    current thread (or :func:`bindRequest`-ed to it), so the calls made by
+    requests in :class:`.BatchRequest` are added to the batch.
+
+    Args:
+        request (str): Name of the request class.
+        fn (fn reference): Function processing the request.
+
+    Returns:
+        obj: Result of `fn`.
+    """
+    parent = getattr(_LOCAL, "counter", None)
+    counter = _LOCAL.counter = _CallCounter()
+
+    exception = None
+    try:
+        return fn()
+    except Exception as e:
+        exception = e.__class__.__name__
+        raise
+    finally:
+        _LOCAL.counter = parent
+        if parent is not None:
+            parent.add(counter.calls)
+
+        getRegistry().observeRequest(request, counter.calls, exception)
+
+
+def bindRequest(fn):
+    """
+    Count the calls made by `fn` for the request processed by current thread,
+    even when `fn` is called from other thread.
+
+    Args:
+        fn (fn reference): Function, which will be called in other thread.
+
+    Returns:
+        fn reference: `fn`, or its wrapper, if there is some request measured \
+                      by :func:`measureRequest`.
+    """
+    counter = getattr(_LOCAL, "counter", None)
+    if counter is None:
+        return fn
+
+    def bound(*args, **kwargs):
+        old, _LOCAL.counter = getattr(_LOCAL, "counter", None), counter
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _LOCAL.counter = old
+
+    return bound
+
+
+def getRegistry():
+    """
+    Returns:
+        obj: :class:`Registry` shared by the whole process. It is created at \
+             first call, if not set by :func:`setRegistry`.
+    """
+    global _REGISTRY
+
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                _REGISTRY = Registry()
+
+    return _REGISTRY
+
+
+def setRegistry(registry):
+    """
+    Replace shared registry by `registry`.
+
+    Args:
+        registry (obj): :class:`Registry` instance. ``None`` resets the
+                 registry to new empty one.
+
+    Returns:
+        obj: Previously used registry (or None).
+    """
+    global _REGISTRY
+
+    with _REGISTRY_LOCK:
+        old_registry, _REGISTRY = _REGISTRY, registry
+
+    return old_registry
@@ -0,0 +1,87 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Helpers for running blocking calls (downloads from Aleph) in parallel, with
+bounded number of threads.
+"""
+# Imports =====================================================================
+import sys
+import Queue
+import threading
+
+import metrics
+
+
+# Functions & objects =========================================================
+def parallelMap(fn, items, workers, catch=()):
+    """
+    Call `fn` for each item from `items` using at most `workers` threads.
+
+    Args:
+        fn (fn reference): Function taking one argument.
+        items (iterable): Arguments for `fn`.
+        workers (int): Maximal number of threads. 1 or less means, that `fn`
+                is called sequentially in current thread.
+        catch (tuple, default ()): Exception classes, which are returned in
+              place of the result instead of aborting the whole batch.
+
+    Returns:
+        list: Results in the same order as `items`.
+
+    Raises:
+        Exception: First exception raised by `fn`, which is not in `catch`.
+            Items not yet processed in that moment are skipped.
+    """
+    items = list(items)
+    results = [None] * len(items)
+
+    def call(index):
+        try:
+            results[index] = fn(items[index])
+        except catch as e:
+            results[index] = e
+
+    if workers <= 1 or len(items) <= 1:
+        for index in range(len(items)):
+            call(index)
+
+        return results
+
+    fn = metrics.bindRequest(fn)  # calls are counted for current request
+
+    indexes = Queue.Queue()
+    for index in range(len(items)):
+        indexes.put(index)
+
+    errors = []
+
+    def worker():
+        while not errors:
+            try:
+                index = indexes.get_nowait()
+            except Queue.Empty:
+                return
+
+            try:
+                call(index)
+            except Exception:
+                errors.append(sys.exc_info())
+
+    threads = [
+        threading.Thread(target=worker)
+        for _ in range(min(workers, len(items)))
+    ]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0][0], errors[0][1], errors[0][2]
+
+    return results
@@ -0,0 +1,45 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Lazy access to the parsers of the MARC XML.
+
+:mod:`dhtmlparser` and :mod:`marcxml_parser` take big part of the time needed
+to import this package, but they are not needed until the first record is
+parsed. Modules of this package get them from functions defined here, which
+import the parsers at first call.
+"""
+# Functions & objects =========================================================
+def getDhtmlparser():
+    """
+    Returns:
+        module: :mod:`dhtmlparser` set up for parsing XML.
+    """
+    import dhtmlparser
+    dhtmlparser.NONPAIR_TAGS = []  # used for parsing XML - see documentation
+
+    return dhtmlparser
+
+
+def getMARCXMLRecord():
+    """
+    Returns:
+        class: :class:`marcxml_parser.MARCXMLRecord`.
+    """
+    getDhtmlparser()
+
+    from marcxml_parser import MARCXMLRecord
+
+    return MARCXMLRecord
+
+
+def parseString(xml):
+    """
+    Parse `xml` to DOM by :func:`dhtmlparser.parseString`.
+
+    Returns:
+        obj: :class:`dhtmlparser.HTMLElement` tree.
+    """
+    return getDhtmlparser().parseString(xml)
@@ -0,0 +1,218 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Rate limiting of the requests sent to Aleph.
+
+Aleph is restricted by license to 150 requests per second. All requests sent
+by :mod:`aleph.aleph` and :mod:`aleph.export` are passed thru limiter returned
+by :func:`getLimiter`, which is token bucket shared by all threads of the
+process.
+
+If :attr:`aleph.settings.ALEPH_RATE_LIMIT_FILE` is set, state of the bucket is
+stored in this file and shared by all processes using the same path.
+
+Rate and burst are configured by :attr:`aleph.settings.ALEPH_RATE_LIMIT` and
+:attr:`aleph.settings.ALEPH_RATE_BURST`.
+"""
+# Imports =====================================================================
+import os
+import time
+import fcntl
+import threading
+
+import settings
+
+
+# Variables ===================================================================
+_LIMITER = None
+_LIMITER_LOCK = threading.Lock()
+
+
+# Functions & objects =========================================================
+class TokenBucket(object):
+    """
+    Thread-safe token bucket.
+
+    Each request takes one token. Tokens are refilled by `rate` tokens per
+    second, up to `burst` tokens. Requests, which come when the bucket is
+    empty, are delayed.
+
+    Args:
+        rate (float): Tokens per second. 0 or less disables the limiting.
+        burst (int): Maximal number of tokens in the bucket.
+
+    Attributes:
+        requests (int): Number of acquired tokens.
+        delayed (int): Number of requests, which had to wait.
+        total_wait (float): Time in seconds spent by waiting.
+        max_wait (float): Longest wait in seconds.
+    """
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(max(burst, 1))
+
+        self._tokens = self.burst
+        self._timestamp = time.time()
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, tokens, timestamp, now):
+        """
+        Returns:
+            float: Number of tokens in the bucket at time `now`.
+        """
+        return min(self.burst, tokens + (now - timestamp) * self.rate)
+
+    def _reserve(self, now):
+        """
+        Take one token from the bucket.
+
+        Number of tokens may go below zero - that means, that the token was
+        reserved in future and the caller has to wait until it is refilled.
+
+        Returns:
+            float: How long in seconds has the caller to wait.
+        """
+        self._tokens = self._refill(self._tokens, self._timestamp, now) - 1
+        self._timestamp = now
+
+        if self._tokens >= 0:
+            return 0.0
+
+        return -self._tokens / self.rate
+
+    def acquire(self):
+        """
+        Take one token from the bucket, wait if there is none.
+
+        Returns:
+            float: How long in seconds was the caller delayed.
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            wait = self._reserve(time.time())
+
+            self.requests += 1
+            if wait > 0:
+                self.delayed += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+    def stats(self):
+        """
+        Returns:
+            dict: Wait-time metrics of the limiter.
+        """
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "requests": self.requests,
+                "delayed": self.delayed,
+                "total_wait": self.total_wait,
+                "max_wait": self.max_wait,
+            }
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket, which stores its state in file `path`, so it can be shared
+    by multiple processes.
+
+    Access to the file is serialized by :func:`fcntl.flock`. Metrics are
+    tracked for each process separately.
+
+    Args:
+        path (str): Path to the file with the state of the bucket.
+        rate (float): Tokens per second. 0 or less disables the limiting.
+        burst (int): Maximal number of tokens in the bucket.
+    """
+    def __init__(self, path, rate, burst):
+        super(FileTokenBucket, self).__init__(rate, burst)
+        self.path = path
+
+    def _reserve(self, now):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+
+            state = os.read(fd, 64).split()
+            if len(state) == 2:
+                self._tokens, self._timestamp = map(float, state)
+            else:
+                self._tokens, self._timestamp = self.burst, now
+
+            wait = super(FileTokenBucket, self)._reserve(now)
+
+            state = "%r %r" % (self._tokens, self._timestamp)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, state)
+        finally:
+            os.close(fd)  # closing the file also releases the lock
+
+        return wait
+
+
+def _limiterFromSettings():
+    if settings.ALEPH_RATE_LIMIT_FILE:
+        return FileTokenBucket(
+            settings.ALEPH_RATE_LIMIT_FILE,
+            rate=settings.ALEPH_RATE_LIMIT,
+            burst=settings.ALEPH_RATE_BURST,
+        )
+
+    return TokenBucket(
+        rate=settings.ALEPH_RATE_LIMIT,
+        burst=settings.ALEPH_RATE_BURST,
+    )
+
+
+def getLimiter():
+    """
+    Returns:
+        obj: Limiter shared by all requests sent to Aleph. It is created \
+             from :mod:`aleph.settings` at first call, if not set by \
+             :func:`setLimiter`.
+    """
+    global _LIMITER
+
+    if _LIMITER is None:
+        with _LIMITER_LOCK:
+            if _LIMITER is None:
+                _LIMITER = _limiterFromSettings()
+
+    return _LIMITER
+
+
+def setLimiter(limiter):
+    """
+    Replace shared limiter by `limiter`.
+
+    Args:
+        limiter (obj): Object with ``.acquire()`` method. ``None`` resets the
+                limiter to the one defined by :mod:`aleph.settings`.
+
+    Returns:
+        obj: Previously used limiter (or None).
+    """
+    global _LIMITER
+
+    with _LIMITER_LOCK:
+        old_limiter, _LIMITER = _LIMITER, limiter
+
+    return old_limiter
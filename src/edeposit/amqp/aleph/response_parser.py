@@ -0,0 +1,223 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Parsers of the control responses from Aleph's X-Services.
+
+Functions in :mod:`aleph.aleph` usually need just few tags from the response
+(``<find>``, ``<ill-get-set>``, ``<error>``, ``<login>``), so there is no
+need to build full DOM of the (possibly huge) response.
+
+Default backend (``etree``) parses the response incrementally by
+:func:`xml.etree.cElementTree.iterparse` and throws away all elements, which
+are not needed. ``dhtmlparser`` backend builds full DOM, but it is able to
+parse also broken XML, so it is used as fallback, when the response is not
+well-formed.
+
+Backend is selected by :attr:`aleph.settings.ALEPH_XML_BACKEND`. Other
+backends can be added to :attr:`BACKENDS`.
+"""
+# Imports =====================================================================
+from collections import namedtuple
+from StringIO import StringIO
+
+import parsers
+import settings
+
+
+# Functions & objects =========================================================
+class Element(namedtuple("Element", ["content", "fields"])):
+    """
+    Element found in the response.
+
+    Attributes:
+        content (str): Textual content of the element.
+        fields (dict): Content of the child elements converted by
+               :func:`toDict`.
+    """
+    pass
+
+
+def tryConvertToInt(s):
+    """
+    Try convert value from `s` to int.
+
+    Returns:
+        int(s): If the value was successfully converted, or `s` when conversion
+                failed.
+    """
+    try:
+        return int(s)
+    except ValueError:
+        return s
+
+
+def toDict(pairs):
+    """
+    Convert ``(keyword, content)`` pairs of non-nested XML to
+    :py:class:`dict`.
+
+    Args:
+        pairs (list): ``(keyword, content)`` tuples.
+
+    Returns:
+        dict: with python data
+    """
+    result = {}
+    for keyword, content in pairs:
+        keyword = keyword.strip()
+        value = tryConvertToInt(content.strip())
+
+        # if there are multiple tags with same keyword, add values into
+        # array, instead of rewriting existing value at given keyword
+        if keyword in result:                  # if it is already there ..
+            if isinstance(result[keyword], list):  # and it is list ..
+                result[keyword].append(value)          # add it to list
+            else:                                  # or make it array
+                result[keyword] = [result[keyword], value]
+        else:                                  # if it is not in result, add it
+            result[keyword] = value
+
+    return result
+
+
+def _text(element):
+    text = "".join(element.itertext())
+
+    if isinstance(text, unicode):
+        return text.encode("utf-8")
+
+    return text
+
+
+def _localName(tag):
+    """
+    Returns:
+        str: `tag` without the ``{namespace}`` prefix.
+    """
+    return tag.rsplit("}", 1)[-1]
+
+
+def _etreeBackend(xml, tags):
+    """
+    Parse `xml` incrementally and return ``(content, pairs)`` for each
+    element from `tags`.
+
+    Elements outside of `tags` are thrown away as soon as they are parsed.
+    Namespaces of the elements are ignored.
+    """
+    from xml.etree import cElementTree
+
+    elements = dict((tag, []) for tag in tags)
+    open_tags = []
+    inside_tag = 0
+
+    events = cElementTree.iterparse(StringIO(xml), events=("start", "end"))
+    for event, element in events:
+        if event == "start":
+            open_tags.append(element)
+            if _localName(element.tag) in elements:
+                inside_tag += 1
+            continue
+
+        open_tags.pop()
+
+        tag = _localName(element.tag)
+        if tag in elements:
+            inside_tag -= 1
+            elements[tag].append((
+                _text(element),
+                [(_localName(child.tag), _text(child)) for child in element]
+            ))
+        elif inside_tag:
+            continue
+
+        # throw away the element and its subtree
+        element.clear()
+        if open_tags:
+            open_tags[-1].remove(element)
+
+    return elements
+
+
+def _dhtmlparserBackend(xml, tags):
+    """
+    Parse `xml` to DOM and return ``(content, pairs)`` for each element from
+    `tags`.
+    """
+    dom = parsers.parseString(xml)
+
+    return dict(
+        (
+            tag,
+            [
+                (
+                    element.getContent(),
+                    [
+                        (child.getTagName(), child.getContent())
+                        for child in element.childs
+                        if child.isOpeningTag()
+                    ]
+                )
+                for element in dom.find(tag)
+            ]
+        )
+        for tag in tags
+    )
+
+
+#: Available backends. Each backend is function, which takes `xml` and list
+#: of `tags` and returns dict, where each tag is mapped to list of
+#: ``(content, [(child_tag, child_content), ..])`` tuples.
+BACKENDS = {
+    "etree": _etreeBackend,
+    "dhtmlparser": _dhtmlparserBackend,
+}
+
+
+def findElementsMany(xml, tags, backend=None):
+    """
+    Find all elements from `tags` in `xml` by one pass thru `xml`.
+
+    Args:
+        xml (str): Response from Aleph.
+        tags (list): Names of the tags.
+        backend (str, default settings.ALEPH_XML_BACKEND): Name of the
+                backend from :attr:`BACKENDS`.
+
+    Returns:
+        dict: ``{tag: [Element, ..]}`` with :class:`Element` for each tag \
+              found in `xml`.
+    """
+    backend = backend or settings.ALEPH_XML_BACKEND
+
+    try:
+        elements = BACKENDS[backend](xml, tags)
+    except SyntaxError:  # not well-formed XML
+        elements = _dhtmlparserBackend(xml, tags)
+
+    return dict(
+        (
+            tag,
+            [Element(content, toDict(pairs)) for content, pairs in found]
+        )
+        for tag, found in elements.iteritems()
+    )
+
+
+def findElements(xml, tag, backend=None):
+    """
+    Find all `tag` elements in `xml`.
+
+    Args:
+        xml (str): Response from Aleph.
+        tag (str): Name of the tag.
+        backend (str, default settings.ALEPH_XML_BACKEND): Name of the
+                backend from :attr:`BACKENDS`.
+
+    Returns:
+        list: :class:`Element` for each `tag` found in `xml`.
+    """
+    return findElementsMany(xml, [tag], backend)[tag]
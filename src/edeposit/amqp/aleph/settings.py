@@ -19,7 +19,6 @@ Example of the configuration file (``$HOME/edeposit/aleph.json``)::
 Attributes
 ----------
 """
-import json
 import os
 import os.path
 
@@ -37,6 +36,114 @@ DEFAULT_LIBRARY = "CZE01"
 #: URL used to read from Aleph. See Aleph's X-service module.
 ALEPH_URL = "http://aleph.nkp.cz"
 
+#: How many idle keep-alive connections are kept for each host. See
+#: :mod:`aleph.transport`.
+ALEPH_POOL_SIZE = 4
+
+#: Timeout in seconds for requests to Aleph.
+ALEPH_TIMEOUT = 30
+
+#: How many documents may be downloaded at the same time by
+#: :func:`aleph.aleph.downloadMARCXMLMany` and
+#: :func:`aleph.aleph.downloadMARCOAIMany`.
+ALEPH_DOWNLOAD_WORKERS = 4
+
+#: Parser used for control responses from Aleph (``etree`` or
+#: ``dhtmlparser``). See :mod:`aleph.response_parser`.
+ALEPH_XML_BACKEND = "etree"
+
+#: Return :class:`.LazyAlephRecord` instead of :class:`.AlephRecord` from
+#: searches, so the records are parsed only when it is needed.
+ALEPH_LAZY_RECORDS = False
+
+#: Number of threads processing requests from :mod:`aleph.aio`.
+ALEPH_ASYNC_WORKERS = 16
+
+#: Number of processes converting MARC XML to :class:`.AlephRecord`. 0
+#: converts the records in the current process. See :mod:`aleph.convert`.
+ALEPH_CONVERT_WORKERS = 0
+
+#: How many records are sent to the worker process at once, when
+#: :attr:`ALEPH_CONVERT_WORKERS` is set.
+ALEPH_CONVERT_CHUNK_SIZE = 16
+
+#: Number of processes forked by :class:`aleph.harness.Harness`. 0 processes
+#: the requests by thread of the current process.
+ALEPH_HARNESS_WORKERS = 4
+
+#: Record latency, size and errors of the calls to Aleph's X-Services and the
+#: number of calls made by each request. See :mod:`aleph.metrics`.
+ALEPH_METRICS = False
+
+#: Maximal length of the URL of the ``op=find`` request with many ISBNs sent
+#: by :func:`aleph.aleph.getISBNCountMany`.
+ALEPH_MAX_URL_LENGTH = 2000
+
+#: How many requests from one :class:`.BatchRequest` are processed at the
+#: same time.
+ALEPH_BATCH_WORKERS = 4
+
+#: Maximal number of requests per second sent to Aleph (Aleph is restricted
+#: to 150 requests per second by license). 0 disables the limit. See
+#: :mod:`aleph.ratelimit`.
+ALEPH_RATE_LIMIT = 150
+
+#: How many requests may be sent at once, before the rate limit is applied.
+ALEPH_RATE_BURST = 10
+
+#: Path to the file used to share the rate limit between processes. Limit is
+#: shared only by threads of one process if blank.
+ALEPH_RATE_LIMIT_FILE = ""
+
+#: Maximal number of results kept in the in-memory cache of the queries. 0
+#: disables the cache. See :mod:`aleph.cache`.
+ALEPH_CACHE_SIZE = 1024
+
+#: How long in seconds are cached results of the :class:`.CountRequest`.
+ALEPH_CACHE_COUNT_TTL = 60
+
+#: How long in seconds are remembered sets created in Aleph by the queries,
+#: so the :class:`.CountRequest` and following :class:`.SearchRequest` for
+#: the same query use the same set.
+ALEPH_CACHE_SET_TTL = 60
+
+#: How long in seconds are cached results of the :class:`.SearchRequest`.
+ALEPH_CACHE_SEARCH_TTL = 300
+
+#: Age in seconds, after which are cached results of the
+#: :class:`.SearchRequest` refreshed in background. They are still returned
+#: until :attr:`ALEPH_CACHE_SEARCH_TTL`.
+ALEPH_CACHE_SEARCH_SOFT_TTL = 60
+
+#: How long in seconds are cached documents returned by
+#: :class:`.DocumentQuery`.
+ALEPH_CACHE_DOCUMENT_TTL = 3600
+
+#: Age in seconds, after which are cached documents returned by
+#: :class:`.DocumentQuery` refreshed in background. They are still returned
+#: until :attr:`ALEPH_CACHE_DOCUMENT_TTL`.
+ALEPH_CACHE_DOCUMENT_SOFT_TTL = 600
+
+#: How long in seconds is cached result of
+#: :func:`aleph.aleph.getListOfBases`.
+ALEPH_CACHE_BASES_TTL = 3600
+
+#: Number of threads refreshing stale results in the cache.
+ALEPH_CACHE_REFRESH_WORKERS = 2
+
+#: How long in seconds are remembered negative answers from Aleph (empty
+#: sets and missing documents). 0 disables the caching of negative answers.
+ALEPH_NEGATIVE_CACHE_TTL = 30
+
+#: Path to the sqlite database used to cache MARC documents downloaded from
+#: Aleph. Database is shared by all processes using the same path. Blank
+#: disables the cache. See :mod:`aleph.document_cache`.
+ALEPH_DOCUMENT_CACHE_PATH = ""
+
+#: How long in seconds are kept documents in the
+#: :attr:`ALEPH_DOCUMENT_CACHE_PATH`.
+ALEPH_DOCUMENT_CACHE_TTL = 86400
+
 #: Signature used when the module is writing to the Aleph
 EDEPOSIT_EXPORT_SIGNATURE = "edeposit"
 
@@ -49,7 +156,7 @@ ALEPH_EXPORT_URL = "http://aleph.nkp.cz/aleph-cgi/e-deposit"
 
 
 #= user configuration reader ==================================================
-_ALLOWED = [unicode, str, int, float]
+_ALLOWED = [unicode, str, int, float, bool]
 
 _SETTINGS_PATH = "/edeposit/aleph.json"
 """
@@ -90,7 +197,7 @@ def substitute_globals(config_dict):
     Note:
         `config_dict` have to be dictionary, or it is ignored. Also all
         variables, that are not already in globals, or are not types defined in
-        :attr:`_ALLOWED` (str, int, float) or starts with ``_`` are silently
+        :attr:`_ALLOWED` (str, int, float, bool) or starts with ``_`` are silently
         ignored.
     """
     constants = get_all_constants()
@@ -103,11 +210,23 @@ def substitute_globals(config_dict):
             globals()[key] = config_dict[key]
 
 
+def read_config_file(path):
+    """
+    Read JSON from `path` and set global variables by
+    :func:`substitute_globals`.
+
+    Args:
+        path (str): Path to the configuration file.
+    """
+    import json  # imported only when there is some configuration
+
+    with open(path) as f:
+        substitute_globals(json.loads(f.read()))
+
+
 # try to read data from configuration paths ($HOME/_SETTINGS_PATH,
 # /etc/_SETTINGS_PATH)
 if "HOME" in os.environ and os.path.exists(os.environ["HOME"] + _SETTINGS_PATH):
-    with open(os.environ["HOME"] + _SETTINGS_PATH) as f:
-        substitute_globals(json.loads(f.read()))
+    read_config_file(os.environ["HOME"] + _SETTINGS_PATH)
 elif os.path.exists("/etc" + _SETTINGS_PATH):
-    with open("/etc" + _SETTINGS_PATH) as f:
-        substitute_globals(json.loads(f.read()))
+    read_config_file("/etc" + _SETTINGS_PATH)
@@ -0,0 +1,146 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Coalescing of identical requests, which are processed at the same time.
+
+When many threads ask the same query (for example the same
+:class:`.CountRequest` from :func:`aleph.reactToAMQPMessage` or
+:mod:`aleph.aio`), only the first one sends the request to Aleph. Others
+wait for it and get the same result, or the same exception.
+
+Queries from :mod:`aleph` are coalesced by the group returned by
+:func:`getGroup`. Number of saved calls is returned by
+:meth:`SingleFlight.stats`.
+"""
+# Imports =====================================================================
+import sys
+import threading
+
+
+# Variables ===================================================================
+_GROUP = None
+_GROUP_LOCK = threading.Lock()
+
+
+# Functions & objects =========================================================
+class _Call(object):
+    """
+    Call in progress, shared by all threads waiting for its result.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc_info = None
+
+
+class SingleFlight(object):
+    """
+    Group of calls, where only one call with the same key runs at a time.
+
+    Attributes:
+        calls (int): Number of calls, which were really made.
+        saved (int): Number of calls, which were served by another call in
+              progress.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.saved = 0
+
+    def do(self, key, fn):
+        """
+        Call `fn`, or wait for the call with the same `key`, which is already
+        in progress.
+
+        Args:
+            key (hashable): Identification of the call.
+            fn (fn reference): Function without arguments.
+
+        Returns:
+            obj: Result of `fn`.
+
+        Raises:
+            Exception: Exception raised by `fn`.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.saved += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+
+            if call.exc_info:
+                raise call.exc_info[0], call.exc_info[1], call.exc_info[2]
+
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception:
+            call.exc_info = sys.exc_info()
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.done.set()
+
+        return call.result
+
+    def stats(self):
+        """
+        Returns:
+            dict: Number of made and saved calls.
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "saved": self.saved,
+                "in_flight": len(self._calls),
+            }
+
+
+def getGroup():
+    """
+    Returns:
+        obj: :class:`SingleFlight` shared by all queries.
+    """
+    global _GROUP
+
+    if _GROUP is None:
+        with _GROUP_LOCK:
+            if _GROUP is None:
+                _GROUP = SingleFlight()
+
+    return _GROUP
+
+
+def setGroup(group):
+    """
+    Replace shared group by `group`.
+
+    Args:
+        group (obj): :class:`SingleFlight` instance. ``None`` resets the
+              group.
+
+    Returns:
+        obj: Previously used group (or None).
+    """
+    global _GROUP
+
+    with _GROUP_LOCK:
+        old_group, _GROUP = _GROUP, group
+
+    return old_group
@@ -0,0 +1,292 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+HTTP transport used by :mod:`aleph.aleph` to talk with Aleph's X-Services.
+
+Each call to the X-Services used to create new :class:`httpkie.Downloader`
+object, so each request paid for new TCP handshake. This module keeps pool of
+persistent (keep-alive) connections for each host, which is shared by all
+threads of the process.
+
+Transport used by :mod:`aleph.aleph` can be replaced by :func:`setTransport`.
+Any object with ``.download(url)`` method returning the body of the response
+as string can be used (for example :class:`httpkie.Downloader` instance or
+local stand-in for tests and benchmarks).
+
+Size of the pool and timeouts are configured by
+:attr:`aleph.settings.ALEPH_POOL_SIZE` and
+:attr:`aleph.settings.ALEPH_TIMEOUT`.
+"""
+# Imports =====================================================================
+import os
+import socket
+import httplib
+import urllib2
+import urlparse
+import threading
+from StringIO import StringIO
+
+import settings
+
+
+# Variables ===================================================================
+#: Headers sent with each request.
+HEADERS = {
+    "User-Agent": "Mozilla/4.0 (compatible; MSIE 7.0; Windows NT 6.0)",
+    "Accept": "text/xml,application/xml,application/xhtml+xml,text/html;"
+              "q=0.9,text/plain",
+    "Accept-Language": "cs,en-us;q=0.7,en;q=0.3",
+    "Accept-Charset": "utf-8",
+    "Connection": "keep-alive",
+}
+
+#: How many redirects will be followed before giving up.
+MAX_REDIRECTS = 5
+
+_TRANSPORT = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+# Functions & objects =========================================================
+class ConnectionPool(object):
+    """
+    Pool of persistent HTTP connections to one host.
+
+    Connections inherited from the parent process after fork are not reused,
+    so the processes never share one socket.
+
+    Args:
+        scheme (str): ``http`` or ``https``.
+        host (str): Hostname.
+        port (int): Port. ``None`` for default port of the `scheme`.
+        size (int): How many idle connections are kept in the pool.
+        timeout (float): Socket timeout in seconds.
+    """
+    def __init__(self, scheme, host, port=None, size=4, timeout=30):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+
+        self._idle = []
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """
+        Returns:
+            obj: New connection to the host, which is not part of the pool \
+                 until it is :meth:`release`-d.
+        """
+        conn_class = httplib.HTTPConnection
+        if self.scheme == "https":
+            conn_class = httplib.HTTPSConnection
+
+        return conn_class(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self):
+        """
+        Returns:
+            tuple: ``(connection, reused)``, where `reused` is True, if the \
+                   connection was taken from the pool.
+        """
+        with self._lock:
+            if self._pid != os.getpid():  # connections of the parent process
+                self._idle = []
+                self._pid = os.getpid()
+
+            if self._idle:
+                return self._idle.pop(), True
+
+        return self.connect(), False
+
+    def release(self, conn):
+        """
+        Put `conn` back to the pool, or close it, if the pool is full.
+        """
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+
+        conn.close()
+
+    def close(self):
+        """
+        Close all idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for conn in idle:
+            conn.close()
+
+
+class HTTPTransport(object):
+    """
+    Thread-safe transport with persistent connection pool for each host.
+
+    Args:
+        pool_size (int, default settings.ALEPH_POOL_SIZE): How many idle
+                  connections are kept for each host.
+        timeout (float, default settings.ALEPH_TIMEOUT): Socket timeout in
+                seconds.
+        headers (dict, default HEADERS): Headers sent with each request.
+    """
+    def __init__(self, pool_size=None, timeout=None, headers=None):
+        self.pool_size = pool_size or settings.ALEPH_POOL_SIZE
+        self.timeout = timeout or settings.ALEPH_TIMEOUT
+        self.headers = headers if headers is not None else HEADERS.copy()
+
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _getPool(self, scheme, netloc):
+        key = (scheme, netloc)
+
+        with self._lock:
+            if key not in self._pools:
+                parsed = urlparse.urlsplit(scheme + "://" + netloc)
+                self._pools[key] = ConnectionPool(
+                    scheme=scheme,
+                    host=parsed.hostname,
+                    port=parsed.port,
+                    size=self.pool_size,
+                    timeout=self.timeout,
+                )
+
+            return self._pools[key]
+
+    def _send(self, conn, path):
+        conn.request("GET", path, headers=self.headers)
+        resp = conn.getresponse()
+
+        return resp, resp.read()
+
+    def _request(self, pool, path):
+        """
+        Send GET request for `path` thru connection from `pool`.
+
+        Connection taken from the pool may be already closed by the server, so
+        request is repeated once with fresh connection in that case.
+        """
+        conn, reused = pool.acquire()
+        try:
+            resp, data = self._send(conn, path)
+        except (httplib.HTTPException, socket.error):
+            conn.close()
+            if not reused:
+                raise
+
+            conn = pool.connect()
+            try:
+                resp, data = self._send(conn, path)
+            except:
+                conn.close()
+                raise
+
+        if resp.will_close:
+            conn.close()
+        else:
+            pool.release(conn)
+
+        return resp, data
+
+    def download(self, url):
+        """
+        Download `url` and return the body of the response.
+
+        Args:
+            url (str): Absolute URL. ``http://`` is added if not present.
+
+        Returns:
+            str: Body of the response.
+
+        Raises:
+            urllib2.HTTPError: If the server returns status code >= 400.
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            if "://" not in url:
+                url = "http://" + url
+
+            parsed = urlparse.urlsplit(url)
+            path = parsed.path or "/"
+            if parsed.query:
+                path += "?" + parsed.query
+
+            pool = self._getPool(parsed.scheme, parsed.netloc)
+            resp, data = self._request(pool, path)
+
+            if resp.status in (301, 302, 303, 307) and \
+               resp.getheader("location"):
+                url = urlparse.urljoin(url, resp.getheader("location"))
+                continue
+
+            if resp.status >= 400:
+                raise urllib2.HTTPError(
+                    url,
+                    resp.status,
+                    resp.reason,
+                    resp.msg,
+                    StringIO(data)
+                )
+
+            return data
+
+        raise urllib2.HTTPError(
+            url,
+            resp.status,
+            "Too many redirects.",
+            resp.msg,
+            StringIO(data)
+        )
+
+    def close(self):
+        """
+        Close all idle connections in all pools.
+        """
+        with self._lock:
+            pools = self._pools.values()
+
+        for pool in pools:
+            pool.close()
+
+
+def getTransport():
+    """
+    Returns:
+        obj: Transport shared by all functions in :mod:`aleph.aleph`. \
+             :class:`HTTPTransport` is created at first call, if not set by \
+             :func:`setTransport`.
+    """
+    global _TRANSPORT
+
+    if _TRANSPORT is None:
+        with _TRANSPORT_LOCK:
+            if _TRANSPORT is None:
+                _TRANSPORT = HTTPTransport()
+
+    return _TRANSPORT
+
+
+def setTransport(transport):
+    """
+    Replace shared transport by `transport`.
+
+    Args:
+        transport (obj): Object with ``.download(url)`` method. ``None`` resets
+                  the transport to default :class:`HTTPTransport`.
+
+    Returns:
+        obj: Previously used transport (or None).
+    """
+    global _TRANSPORT
+
+    with _TRANSPORT_LOCK:
+        old_transport, _TRANSPORT = _TRANSPORT, transport
+
+    return old_transport
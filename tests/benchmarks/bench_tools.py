@@ -0,0 +1,104 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Helpers shared by the benchmarks.
+"""
+# Imports =====================================================================
+import os
+import os.path
+import time
+import resource
+
+
+# Functions ===================================================================
+EXAMPLES_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "unit",
+    "examples"
+)
+
+
+def read_examples():
+    """
+    Returns:
+        list: Content of all MARC records from ``tests/unit/examples``.
+    """
+    return [
+        open(os.path.join(EXAMPLES_PATH, fn)).read()
+        for fn in sorted(os.listdir(EXAMPLES_PATH))
+        if fn.endswith(".xml")
+    ]
+
+
+def _peak_rss():
+    """
+    Returns:
+        int: Peak resident set size of current process in kB.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except IOError:
+        pass
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except IOError:
+        pass
+
+
+def measure(fn, *args):
+    """
+    Run `fn` with `args` in forked process and measure its time and memory.
+
+    Returns:
+        tuple: ``(seconds, peak_kb)``, where `peak_kb` is the growth of the \
+               peak memory caused by `fn`.
+    """
+    read_fd, write_fd = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            _reset_peak_rss()
+            before = _peak_rss()
+            start = time.time()
+
+            fn(*args)
+
+            duration = time.time() - start
+            os.write(write_fd, "%r %d" % (duration, _peak_rss() - before))
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    data = os.read(read_fd, 128)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    duration, peak = data.split()
+    return float(duration), int(peak)
+
+
+def timeit(fn, repeat=1):
+    """
+    Returns:
+        float: Time in seconds taken by `repeat` calls of `fn`.
+    """
+    start = time.time()
+    for _ in range(repeat):
+        fn()
+
+    return time.time() - start
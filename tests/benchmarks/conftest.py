@@ -0,0 +1,19 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import pytest
+
+from aleph import cache
+
+
+# Fixtures ====================================================================
+@pytest.fixture(autouse=True)
+def no_cache(request):
+    """
+    Benchmarks measure the work, not the :mod:`aleph.cache`.
+    """
+    old = cache.setCache(cache.LRUCache(0))
+    request.addfinalizer(lambda: cache.setCache(old))
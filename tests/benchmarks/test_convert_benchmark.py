@@ -0,0 +1,91 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Throughput of :func:`aleph.convert.convertRecords` for growing number of
+worker processes.
+
+Number of converted records is set by ``ALEPH_BENCH_RECORDS`` environment
+variable (comma separated, default ``1000``), for example::
+
+    ALEPH_BENCH_RECORDS=1000,10000 py.test -s tests/benchmarks
+"""
+# Imports =====================================================================
+import os
+import multiprocessing
+
+import pytest
+
+from aleph import convert
+from aleph import settings
+
+from bench_tools import timeit
+from bench_tools import read_examples
+
+
+# Fixtures ====================================================================
+SIZES = [
+    int(size)
+    for size in os.environ.get("ALEPH_BENCH_RECORDS", "1000").split(",")
+]
+
+
+def workers_counts():
+    counts = [0, 1, 2, 4, 8]
+
+    return [
+        count
+        for count in counts
+        if count <= multiprocessing.cpu_count()
+    ]
+
+
+def corpus(size):
+    examples = [
+        '<?xml version = "1.0" encoding = "UTF-8"?>\n<present>\n' +
+        "<doc_number>%09d</doc_number>\n" % cnt +
+        example.replace("<?xml", "<!--").replace("?>", "-->") +
+        "\n</present>\n"
+        for cnt, example in enumerate(read_examples())
+    ]
+
+    return (examples * (size / len(examples) + 1))[:size]
+
+
+# Tests =======================================================================
+@pytest.mark.parametrize("size", SIZES)
+def test_scaling(size, monkeypatch):
+    xmls = corpus(size)
+
+    print "\n%d records (%d CPUs):" % (size, multiprocessing.cpu_count())
+
+    results = {}
+    for workers in workers_counts():
+        monkeypatch.setattr(settings, "ALEPH_CONVERT_WORKERS", workers)
+        convert.closePool()
+
+        if workers:  # don't measure start of the workers
+            convert.convertRecords(xmls[:2], "nkc", settings.DEFAULT_LIBRARY)
+
+        duration = timeit(
+            lambda: convert.convertRecords(
+                xmls,
+                "nkc",
+                settings.DEFAULT_LIBRARY
+            )
+        )
+        results[workers] = duration
+
+        print "  %d workers: %.2fs, %.0f records/s" % (
+            workers,
+            duration,
+            size / duration
+        )
+
+    convert.closePool()
+
+    # workers can't be faster than current process on single core
+    if multiprocessing.cpu_count() >= 2:
+        assert results[2] < results[0]
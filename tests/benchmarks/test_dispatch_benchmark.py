@@ -0,0 +1,82 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+from collections import namedtuple
+
+import pytest
+
+import aleph
+
+from bench_tools import timeit
+
+
+# Variables ===================================================================
+MESSAGES = 100000
+
+
+# Fixtures ====================================================================
+class NoopRequest(namedtuple("NoopRequest", ["query"])):
+    pass
+
+
+def noop_handler(req, send_back):
+    return req.query
+
+
+@pytest.fixture
+def noop_request(monkeypatch):
+    monkeypatch.setattr(aleph, "_HANDLERS", dict(aleph._HANDLERS))
+    monkeypatch.setattr(aleph, "REQUEST_TYPES", list(aleph.REQUEST_TYPES))
+
+    aleph.register_handler(NoopRequest, noop_handler)
+
+    return NoopRequest(aleph.ISBNQuery("80-251-0225-4"))
+
+
+def chain_dispatch(req, send_back):
+    """
+    Dispatch as it was done by the chain of :func:`aleph._iiOfAny` calls.
+    """
+    _iiOfAny = aleph._iiOfAny
+
+    if not _iiOfAny(req, aleph.REQUEST_TYPES):
+        raise ValueError("Unknown type of request")
+
+    if _iiOfAny(req, aleph.CountRequest) and \
+       _iiOfAny(req.query, aleph.QUERY_TYPES):
+        return req.query
+    elif _iiOfAny(req, aleph.SearchRequest) and \
+            _iiOfAny(req.query, aleph.QUERY_TYPES):
+        return req.query
+    elif _iiOfAny(req, aleph.ISBNValidationRequest):
+        return req.query
+    elif _iiOfAny(req, aleph.ExportRequest):
+        return req.query
+    elif _iiOfAny(req, aleph.ISBNCountManyRequest):
+        return req.query
+    elif _iiOfAny(req, aleph.BatchRequest):
+        return req.query
+
+    return noop_handler(req, send_back)  # last in the chain
+
+
+# Tests =======================================================================
+def test_dispatch(noop_request):
+    assert aleph.reactToAMQPMessage(noop_request, None) == \
+        chain_dispatch(noop_request, None)
+
+    table = timeit(lambda: aleph.reactToAMQPMessage(noop_request, None),
+                   MESSAGES)
+    chain = timeit(lambda: chain_dispatch(noop_request, None), MESSAGES)
+
+    print "\n%d messages: dispatch table %.2fus/msg, _iiOfAny chain " \
+        "%.2fus/msg" % (
+            MESSAGES,
+            table / MESSAGES * 1e6,
+            chain / MESSAGES * 1e6,
+        )
+
+    assert table < chain
@@ -0,0 +1,85 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import os
+import sys
+import time
+import os.path
+import subprocess
+
+import aleph
+from aleph import harness
+
+from bench_tools import read_examples
+
+
+# Fixtures ====================================================================
+REPEAT = 5
+
+COLD_WORKER = """
+import aleph
+from aleph.datastructures import AlephRecord
+
+aleph.reactToAMQPMessage(aleph.ISBNValidationRequest("80-251-0225-4"), None)
+AlephRecord.from_xml("nkc", "NKC01", open(%r).read())
+"""
+
+
+def warm_worker_latency(example_path):
+    """
+    Returns:
+        float: Time from the start of the worker to its first response.
+    """
+    harness.warmUp(bases=False)
+    with open(example_path) as f:
+        aleph.AlephRecord.from_xml("nkc", "NKC01", f.read())
+
+    start = time.time()
+
+    harness_obj = harness.Harness(workers=1, bases=False)
+    harness_obj.start()
+    harness_obj.submit(aleph.ISBNValidationRequest("80-251-0225-4"))
+    harness_obj.getResponse(timeout=60)
+
+    latency = time.time() - start
+    harness_obj.stop()
+
+    return latency
+
+
+def cold_worker_latency(example_path):
+    """
+    Returns:
+        float: Time needed by new interpreter to import :mod:`aleph` and
+               process the request.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(aleph.__file__))
+
+    start = time.time()
+    subprocess.check_call(
+        [sys.executable, "-c", COLD_WORKER % example_path],
+        env=env
+    )
+
+    return time.time() - start
+
+
+# Tests =======================================================================
+def test_spin_up(tmpdir):
+    example_path = str(tmpdir.join("example.xml"))
+    with open(example_path, "w") as f:
+        f.write(read_examples()[0])
+
+    warm = min(warm_worker_latency(example_path) for _ in range(REPEAT))
+    cold = min(cold_worker_latency(example_path) for _ in range(REPEAT))
+
+    print "\nfirst response: pre-forked %.1fms, cold start %.1fms" % (
+        warm * 1000,
+        cold * 1000
+    )
+
+    assert warm < cold
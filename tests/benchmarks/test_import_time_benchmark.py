@@ -0,0 +1,59 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import os
+import sys
+import os.path
+import subprocess
+
+import aleph
+
+
+# Fixtures ====================================================================
+REPEAT = 10
+
+EAGER_IMPORTS = (
+    "import dhtmlparser, httpkie, marcxml_parser, isbn_validator, "
+    "remove_hairs, sqlite3, multiprocessing.pool"
+)
+
+
+def cold_import_time(preload=""):
+    """
+    Returns:
+        float: Median time in seconds of ``import aleph`` in new interpreter,
+               after `preload` statement is run.
+    """
+    script = "\n".join([
+        "import time",
+        "start = time.time()",
+        preload,
+        "import aleph",
+        "print time.time() - start",
+    ])
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(aleph.__file__))
+
+    times = sorted(
+        float(subprocess.check_output([sys.executable, "-c", script], env=env))
+        for _ in range(REPEAT)
+    )
+
+    return times[len(times) / 2]
+
+
+# Tests =======================================================================
+def test_cold_import():
+    lazy = cold_import_time()
+    eager = cold_import_time(EAGER_IMPORTS)
+
+    print "\ncold import: lazy %.1fms, with eager dependencies %.1fms" % (
+        lazy * 1000,
+        eager * 1000
+    )
+
+    assert lazy < eager
@@ -0,0 +1,63 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import pytest
+
+from aleph import aleph
+from aleph import metrics
+from aleph import settings
+from aleph import transport
+from aleph import ratelimit
+
+from bench_tools import timeit
+
+
+# Fixtures ====================================================================
+CALLS = 20000
+URL = "http://aleph.nkp.cz/X?op=find_doc&doc_num=000000001&base=nkc"
+
+
+class EchoTransport(object):
+    def download(self, url):
+        return url
+
+
+@pytest.fixture
+def echo(request):
+    old_transport = transport.setTransport(EchoTransport())
+    old_limiter = ratelimit.setLimiter(ratelimit.TokenBucket(0, 1))
+    old_registry = metrics.setRegistry(metrics.Registry())
+
+    def restore():
+        transport.setTransport(old_transport)
+        ratelimit.setLimiter(old_limiter)
+        metrics.setRegistry(old_registry)
+
+    request.addfinalizer(restore)
+
+
+def download_all():
+    for _ in xrange(CALLS):
+        aleph._download(URL)
+
+
+# Tests =======================================================================
+def test_overhead(echo, monkeypatch):
+    monkeypatch.setattr(settings, "ALEPH_METRICS", False)
+    disabled = timeit(download_all)
+
+    monkeypatch.setattr(settings, "ALEPH_METRICS", True)
+    enabled = timeit(download_all)
+
+    print "\n%d calls: metrics disabled %.2fus/call, enabled %.2fus/call" % (
+        CALLS,
+        disabled / CALLS * 1e6,
+        enabled / CALLS * 1e6
+    )
+
+    assert metrics.getRegistry().snapshot()["latency"]["find_doc"]["count"] \
+        == CALLS
+    assert disabled < enabled
@@ -0,0 +1,126 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import pstats
+import cProfile
+from StringIO import StringIO
+
+import pytest
+import dhtmlparser
+
+from aleph import settings
+from aleph import ISBNQuery
+from aleph import AlephRecord
+from aleph import doc_number
+
+from bench_tools import timeit
+from bench_tools import read_examples
+
+
+# Fixtures ====================================================================
+REPEAT = 4
+
+
+@pytest.fixture
+def corpus():
+    return [
+        '<?xml version = "1.0" encoding = "UTF-8"?>\n<present>\n' +
+        "<doc_number>%09d</doc_number>\n" % cnt +
+        example.replace("<?xml", "<!--").replace("?>", "-->") +
+        "\n</present>\n"
+        for cnt, example in enumerate(read_examples() * REPEAT)
+    ]
+
+
+@pytest.fixture
+def parse_counter(request, monkeypatch):
+    calls = []
+    parseString = dhtmlparser.parseString
+
+    def counting_parseString(*args, **kwargs):
+        calls.append(args[0])
+        return parseString(*args, **kwargs)
+
+    monkeypatch.setattr(dhtmlparser, "parseString", counting_parseString)
+
+    return calls
+
+
+def legacy_pipeline(corpus):
+    """
+    Pipeline, which parses the `xml` to find the doc number and then again in
+    the AlephRecord.
+    """
+    return [
+        AlephRecord(
+            base="nkc",
+            library=settings.DEFAULT_LIBRARY,
+            docNumber=doc_number.getDocNumber(dhtmlparser.parseString(xml)),
+            xml=xml
+        )
+        for xml in corpus
+    ]
+
+
+# Tests =======================================================================
+def test_parsed_once(corpus, parse_counter, monkeypatch):
+    monkeypatch.setattr(ISBNQuery, "_getXML", lambda self: corpus)
+
+    profile = cProfile.Profile()
+    result = profile.runcall(ISBNQuery("80-251-0225-4").getSearchResult)
+
+    assert len(result.records) == len(corpus)
+    assert len(parse_counter) == len(corpus)
+    assert sorted(parse_counter) == sorted(corpus)
+
+    for cnt, record in enumerate(result.records):
+        assert record.docNumber == "%09d" % cnt
+        assert record.parsed_info
+        assert record.semantic_info
+
+    # records are the same as the ones created by the old pipeline
+    del parse_counter[:]
+    assert legacy_pipeline(corpus) == result.records
+    print "\nlegacy pipeline: %d parses of %d records" % (
+        len(parse_counter),
+        len(corpus)
+    )
+
+    stats = StringIO()
+    pstats.Stats(profile, stream=stats).sort_stats("cumulative").print_stats(8)
+    print stats.getvalue()
+
+
+def test_throughput(corpus, monkeypatch):
+    monkeypatch.setattr(ISBNQuery, "_getXML", lambda self: corpus)
+    query = ISBNQuery("80-251-0225-4")
+
+    single = timeit(query.getSearchResult)
+    legacy = timeit(lambda: legacy_pipeline(corpus))
+
+    print "\n%d records: single-parse %.3fs, legacy %.3fs" % (
+        len(corpus),
+        single,
+        legacy
+    )
+
+    assert single < legacy
+
+
+def test_lazy_records(corpus, parse_counter, monkeypatch):
+    monkeypatch.setattr(ISBNQuery, "_getXML", lambda self: corpus)
+    monkeypatch.setattr(settings, "ALEPH_LAZY_RECORDS", True)
+    query = ISBNQuery("80-251-0225-4")
+
+    lazy = timeit(query.getSearchResult)
+    assert len(parse_counter) == 0
+
+    monkeypatch.setattr(settings, "ALEPH_LAZY_RECORDS", False)
+    eager = timeit(query.getSearchResult)
+
+    print "\n%d records: lazy %.3fs, eager %.3fs" % (len(corpus), lazy, eager)
+
+    assert lazy < eager
@@ -0,0 +1,76 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import pytest
+
+from aleph import response_parser
+
+from bench_tools import measure
+from bench_tools import read_examples
+
+
+# Fixtures ====================================================================
+@pytest.fixture
+def big_set():
+    return (
+        '<?xml version = "1.0" encoding = "UTF-8"?>\n<ill-get-set>\n' +
+        "<set-library>NKC01</set-library>\n" +
+        "".join(
+            "<doc-number>%09d</doc-number>\n" % num
+            for num in range(5000)
+        ) +
+        "<session-id>SESSION</session-id>\n</ill-get-set>\n"
+    )
+
+
+@pytest.fixture
+def big_document():
+    records = "\n".join(
+        example.replace("<?xml", "<!--").replace("?>", "-->")
+        for example in read_examples()
+    )
+
+    return (
+        '<?xml version = "1.0" encoding = "UTF-8"?>\n<find-doc>\n' +
+        records * 10 +
+        "\n<session-id>SESSION</session-id>\n</find-doc>\n"
+    )
+
+
+def compare_backends(xml, tag):
+    results = {}
+    for backend in sorted(response_parser.BACKENDS):
+        duration, peak = measure(response_parser.findElements, xml, tag,
+                                 backend)
+        results[backend] = (duration, peak)
+
+        print "%-12s %-12s %8.3fs %8d kB" % (tag, backend, duration, peak)
+
+    return results
+
+
+# Tests =======================================================================
+def test_ill_get_set(big_set):
+    etree = response_parser.findElements(big_set, "ill-get-set", "etree")
+    dhtml = response_parser.findElements(big_set, "ill-get-set", "dhtmlparser")
+
+    assert etree[0].fields == dhtml[0].fields
+
+    results = compare_backends(big_set, "ill-get-set")
+
+    assert results["etree"][0] < results["dhtmlparser"][0]
+    assert results["etree"][1] <= results["dhtmlparser"][1]
+
+
+def test_error_in_document(big_document):
+    assert response_parser.findElements(big_document, "error", "etree") == []
+    assert response_parser.findElements(big_document, "error",
+                                        "dhtmlparser") == []
+
+    results = compare_backends(big_document, "error")
+
+    assert results["etree"][0] < results["dhtmlparser"][0]
+    assert results["etree"][1] <= results["dhtmlparser"][1]
@@ -0,0 +1,93 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import cPickle
+
+import pytest
+
+from aleph import aleph
+from aleph import AlephRecord
+from aleph import SearchResult
+from aleph.parsers import getMARCXMLRecord
+from aleph.datastructures import alephrecord
+
+from bench_tools import timeit
+from bench_tools import read_examples
+
+
+# Fixtures ====================================================================
+@pytest.fixture
+def search_result():
+    examples = read_examples()
+    examples = (examples * aleph.MAX_RECORDS)[:aleph.MAX_RECORDS]
+
+    return SearchResult([
+        AlephRecord("nkc", "NKC01", str(cnt), xml)
+        for cnt, xml in enumerate(examples)
+    ])
+
+
+@pytest.fixture
+def parse_counter(monkeypatch):
+    calls = []
+
+    class CountingMARCXMLRecord(getMARCXMLRecord()):
+        def __init__(self, *args, **kwargs):
+            calls.append(args)
+            super(CountingMARCXMLRecord, self).__init__(*args, **kwargs)
+
+    monkeypatch.setattr(alephrecord, "MARCXMLRecord", CountingMARCXMLRecord)
+
+    return calls
+
+
+def pickle_round_trip(search_result):
+    # protocol 1, because MARCSubrecord can't be pickled by protocol 2
+    return cPickle.loads(cPickle.dumps(search_result, 1))
+
+
+def dict_round_trip(search_result):
+    # this is how the structures are rebuilt by the AMQP serializers
+    return SearchResult([
+        AlephRecord(**record._asdict())
+        for record in search_result.records
+    ])
+
+
+def reparse_round_trip(search_result):
+    # cost of the round trip, if the parsed fields are not trusted
+    return SearchResult([
+        AlephRecord(
+            record.base,
+            record.library,
+            record.docNumber,
+            record.xml
+        )
+        for record in search_result.records
+    ])
+
+
+# Tests =======================================================================
+def test_round_trip(search_result, parse_counter):
+    assert pickle_round_trip(search_result) == search_result
+    assert dict_round_trip(search_result) == search_result
+    assert len(parse_counter) == 0
+
+    pickled = timeit(lambda: pickle_round_trip(search_result), 10) / 10
+    rebuilt = timeit(lambda: dict_round_trip(search_result), 10) / 10
+    reparsed = timeit(lambda: reparse_round_trip(search_result))
+
+    assert len(parse_counter) == aleph.MAX_RECORDS
+
+    print "\n%d records: pickle %.4fs, dict %.4fs, reparse %.4fs" % (
+        len(search_result.records),
+        pickled,
+        rebuilt,
+        reparsed,
+    )
+
+    assert pickled < reparsed
+    assert rebuilt < reparsed
@@ -0,0 +1,131 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import re
+
+import pytest
+
+from aleph import cache
+from aleph import settings
+from aleph import transport
+
+
+# Fixtures ====================================================================
+PRESENT_TEMPLATE = """<?xml version = "1.0" encoding = "UTF-8"?>
+<present>
+%s
+<session-id>SESSION</session-id>
+</present>
+"""
+
+RECORD_TEMPLATE = """<record>
+<record_header>
+<set_entry>%09d</set_entry>
+</record_header>
+<doc_number>%09d</doc_number>
+<metadata><oai_marc></oai_marc></metadata>
+</record>"""
+
+
+FIND_DOC_TEMPLATE = """<?xml version = "1.0" encoding = "UTF-8"?>
+<find-doc>
+%s
+<session-id>SESSION</session-id>
+</find-doc>
+"""
+
+BASE_LIST = """
+<a href="/F/?func=file&local_base=nkc">NKC</a>
+<a href="/F/?func=file&local_base=nkc">NKC</a>
+<a href="/F/?func=file&local_base=cze01">CZE</a>
+"""
+
+
+class FakeAleph(object):
+    """
+    Stand-in for the transport, which answers ``op=present``,
+    ``op=find_doc`` and base-list requests.
+
+    Documents with odd number are not found.
+    """
+    def __init__(self, ranges=True):
+        self.ranges = ranges
+        self.urls = []
+
+    def download(self, url):
+        self.urls.append(url)
+
+        if "base-list" in url:
+            return BASE_LIST
+
+        if "op=find_doc" in url:
+            doc_id = int(re.search("doc_num=([0-9]+)", url).group(1))
+
+            if doc_id % 2:
+                return FIND_DOC_TEMPLATE % (
+                    "<error>Error reading document</error>"
+                )
+
+            return FIND_DOC_TEMPLATE % (RECORD_TEMPLATE % (1, doc_id))
+
+        entry = re.search("set_entry=([0-9-]+)", url).group(1)
+        if "-" not in entry:
+            return PRESENT_TEMPLATE % (RECORD_TEMPLATE % (int(entry),
+                                                          int(entry)))
+
+        if not self.ranges:
+            return PRESENT_TEMPLATE % "<error>Bad set_entry</error>"
+
+        first, last = map(int, entry.split("-"))
+        return PRESENT_TEMPLATE % "\n".join(
+            RECORD_TEMPLATE % (num, num)
+            for num in range(first, last + 1)
+        )
+
+
+class OfflineTransport(object):
+    """
+    Stand-in for the transport, which fails on every request.
+    """
+    def download(self, url):
+        raise IOError("Aleph is offline.")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(request):
+    """
+    Each test starts with empty :mod:`aleph.cache`.
+    """
+    old = cache.setCache(cache.LRUCache(settings.ALEPH_CACHE_SIZE))
+    request.addfinalizer(lambda: cache.setCache(old))
+
+
+@pytest.fixture
+def use_transport(request):
+    """
+    Returns function, which sets the transport of :mod:`aleph.transport`
+    for the rest of the test.
+    """
+    def useTransport(fake):
+        old = transport.setTransport(fake)
+        request.addfinalizer(lambda: transport.setTransport(old))
+
+        return fake
+
+    return useTransport
+
+
+@pytest.fixture
+def fake_aleph(use_transport):
+    return use_transport(FakeAleph())
+
+
+@pytest.fixture
+def go_offline(use_transport):
+    """
+    Returns function, which makes every following request to Aleph fail.
+    """
+    return lambda: use_transport(OfflineTransport())
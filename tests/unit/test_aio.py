@@ -0,0 +1,89 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import os
+
+import pytest
+
+from aleph import aio
+from aleph import aleph
+from aleph import ISBNValidationResult
+from aleph import ISBNValidationRequest
+
+
+# Fixtures ====================================================================
+FIND_RESPONSE = """<?xml version = "1.0" encoding = "UTF-8"?>
+<find>
+<set_number>001234</set_number>
+<no_records>000000002</no_records>
+<no_entries>000000002</no_entries>
+<session-id>SESSION</session-id>
+</find>
+"""
+
+
+class FakeFind(object):
+    def download(self, url):
+        return FIND_RESPONSE
+
+
+@pytest.fixture
+def fake_find(use_transport):
+    return use_transport(FakeFind())
+
+
+# Tests =======================================================================
+def test_searchInAleph(fake_find):
+    results = []
+    pending = aio.searchInAleph("nkc", "test", False, "wrd",
+                                callback=results.append)
+
+    result = pending.get(timeout=10)
+
+    assert result["set_number"] == 1234
+    assert result["no_entries"] == 2
+    assert result == aleph.searchInAleph("nkc", "test", False, "wrd")
+    assert results == [result]
+
+
+def test_getISBNCount(fake_find):
+    pending = [aio.getISBNCount(str(i)) for i in range(10)]
+
+    assert [result.get(timeout=10) for result in pending] == [2] * 10
+
+
+def test_exception():
+    pending = aio.searchInAleph("nkc", "test", False, "xex")
+
+    with pytest.raises(aleph.InvalidAlephFieldException):
+        pending.get(timeout=10)
+
+
+def test_reactToAMQPMessage():
+    pending = aio.reactToAMQPMessage(
+        ISBNValidationRequest("80-251-0225-4"),
+        None
+    )
+
+    assert pending.get(timeout=10) == ISBNValidationResult(True)
+
+
+def test_pool_after_fork():
+    request = ISBNValidationRequest("80-251-0225-4")
+    assert aio.reactToAMQPMessage(request, None).get(10)
+
+    pid = os.fork()
+    if pid == 0:
+        # threads of the parent's pool don't exist in the child
+        code = 1
+        try:
+            result = aio.reactToAMQPMessage(request, None).get(10)
+            code = 0 if result == ISBNValidationResult(True) else 1
+        finally:
+            os._exit(code)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
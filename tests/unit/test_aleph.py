@@ -4,11 +4,24 @@
 # Interpreter version: python 2.7
 #
 # Imports =====================================================================
+import re
+import urllib
+
 import pytest
 
 from aleph import aleph
 
 
+# Fixtures ====================================================================
+def search_result(no_records):
+    return {
+        "set_number": 1234,
+        "no_records": no_records,
+        "no_entries": no_records,
+        "base": "nkc",
+    }
+
+
 # Tests =======================================================================
 def test_variables():
     assert "/" in aleph.SEARCH_URL_TEMPLATE
@@ -58,4 +71,242 @@ def test_tryConvertToInt():
     assert aleph._tryConvertToInt("1s") == "1s"
 
 
-# def test_alephResultToDict():
\ No newline at end of file
+def test_downloadRecords_batched(fake_aleph):
+    records = aleph.downloadRecords(search_result(45))
+
+    assert len(fake_aleph.urls) == 1
+    assert "set_entry=000000001-000000030" in fake_aleph.urls[0]
+    assert len(records) == aleph.MAX_RECORDS
+
+    for cnt, record in enumerate(records):
+        assert record.count("<record>") == 1
+        assert "<doc_number>%09d</doc_number>" % (cnt + 1) in record
+        assert record.startswith("<?xml")
+        assert "<session-id>SESSION</session-id>" in record
+
+
+def test_downloadRecords_batch_size(fake_aleph):
+    records = aleph.downloadRecords(search_result(12), from_doc=2,
+                                    batch_size=5)
+
+    assert len(fake_aleph.urls) == 3
+    assert fake_aleph.urls[-1].endswith("set_entry=12")
+    assert len(records) == 11
+
+
+def test_downloadRecords_single(fake_aleph):
+    records = aleph.downloadRecords(search_result(3), batch_size=1)
+
+    assert len(fake_aleph.urls) == 3
+    assert len(records) == 3
+
+
+def test_downloadRecords_fallback(fake_aleph):
+    fake_aleph.ranges = False
+
+    records = aleph.downloadRecords(search_result(3))
+
+    assert len(fake_aleph.urls) == 4
+    assert len(records) == 3
+
+
+def test_downloadRecords_workers(fake_aleph):
+    records = aleph.downloadRecords(search_result(10), batch_size=1,
+                                    workers=4)
+
+    assert len(fake_aleph.urls) == 10
+    for cnt, record in enumerate(records):
+        assert "<doc_number>%09d</doc_number>" % (cnt + 1) in record
+
+
+def test_downloadMARCOAIMany(fake_aleph):
+    doc_ids = [2, 3, aleph.DocumentID(4, "NKC01", "nkc")]
+
+    docs = aleph.downloadMARCOAIMany(doc_ids, workers=2)
+
+    assert len(docs) == 3
+    assert "<doc_number>000000002</doc_number>" in docs[0]
+    assert isinstance(docs[1], aleph.DocumentNotFoundException)
+    assert "<doc_number>000000004</doc_number>" in docs[2]
+
+
+def test_iterRecords(fake_aleph):
+    records = aleph.iterRecords(search_result(75), page_size=30)
+
+    assert not fake_aleph.urls  # nothing is downloaded until needed
+
+    assert "<doc_number>000000001</doc_number>" in next(records)
+    assert len(fake_aleph.urls) == 1
+
+    records = list(records)
+    assert len(records) == 74
+    assert len(fake_aleph.urls) == 3
+    assert fake_aleph.urls[-1].endswith("set_entry=000000061-000000075")
+    assert "<doc_number>000000075</doc_number>" in records[-1]
+
+
+def test_iterRecords_from_doc(fake_aleph):
+    records = list(
+        aleph.iterRecords(search_result(12), from_doc=3, page_size=5)
+    )
+
+    assert len(records) == 10
+    assert len(fake_aleph.urls) == 2
+    assert "<doc_number>000000003</doc_number>" in records[0]
+
+
+def test_iterRecords_empty_set(fake_aleph):
+    assert list(aleph.iterRecords({"no_entries": 0})) == []
+    assert not fake_aleph.urls
+
+
+def test_negative_cache_missing_document(fake_aleph, monkeypatch):
+    for _ in range(3):
+        with pytest.raises(aleph.DocumentNotFoundException):
+            aleph.downloadMARCOAI(3, "nkc")
+
+    assert len(fake_aleph.urls) == 1
+
+    assert aleph.invalidateMissingDocument("000000003", "nkc")
+    with pytest.raises(aleph.DocumentNotFoundException):
+        aleph.downloadMARCOAI(3, "nkc")
+
+    assert len(fake_aleph.urls) == 2
+
+    monkeypatch.setattr(aleph, "ALEPH_NEGATIVE_CACHE_TTL", 0)
+    assert not aleph.invalidateMissingDocument(5, "nkc")
+    for _ in range(2):
+        with pytest.raises(aleph.DocumentNotFoundException):
+            aleph.downloadMARCOAI(5, "nkc")
+
+    assert len(fake_aleph.urls) == 4
+
+
+def test_negative_cache_empty_set(monkeypatch):
+    responses = [
+        "<find><error>empty set</error></find>",
+        "<find><set_number>000001</set_number>"
+        "<no_records>1</no_records><no_entries>1</no_entries></find>",
+    ]
+    urls = []
+
+    def download(url):
+        urls.append(url)
+        return responses[len(urls) - 1]
+
+    monkeypatch.setattr(aleph, "_download", download)
+
+    for _ in range(3):
+        result = aleph.searchInAleph("nkc", "978-80-87899-15-1", False, "sbn")
+        assert result["no_entries"] == 0
+
+    assert len(urls) == 1
+
+    assert aleph.invalidateEmptySet("nkc", "978-80-87899-15-1", False, "sbn")
+    result = aleph.searchInAleph("nkc", "978-80-87899-15-1", False, "sbn")
+
+    assert result["no_entries"] == 1
+    assert len(urls) == 2
+
+
+OAI_ISBN_RECORD = """<record>
+<doc_number>%09d</doc_number>
+<metadata><oai_marc>
+<varfield id="020" i1=" " i2=" "><subfield label="a">%s (brož.)</subfield>
+</varfield>
+</oai_marc></metadata>
+</record>"""
+
+
+class FakeCatalogue(object):
+    """
+    Stand-in for the transport, which answers ``op=find`` with OR-queries of
+    ISBNs and ``op=present`` requests for the sets.
+    """
+    def __init__(self, catalogue):
+        self.catalogue = catalogue  # list of ISBNs of the records
+        self.sets = []
+        self.urls = []
+
+    def download(self, url):
+        self.urls.append(url)
+
+        if "op=find" in url:
+            request = urllib.unquote_plus(
+                re.search("request=([^&]+)", url).group(1)
+            )
+            # like Aleph, match also the other variant of the ISBN
+            isbns = set(
+                aleph._bulkISBNKey(isbn)
+                for isbn in re.findall("sbn=([0-9X-]+)", request)
+            )
+            found = [
+                isbn for isbn in self.catalogue
+                if aleph._bulkISBNKey(isbn) in isbns
+            ]
+            if not found:
+                return "<find><error>empty set</error></find>"
+
+            self.sets.append(found)
+            return (
+                "<find><set_number>%d</set_number>"
+                "<no_records>%d</no_records><no_entries>%d</no_entries></find>"
+            ) % (len(self.sets) - 1, len(found), len(found))
+
+        set_number = int(re.search("set_number=([0-9]+)", url).group(1))
+        entry = map(
+            int,
+            re.search("set_entry=([0-9-]+)", url).group(1).split("-")
+        )
+        first, last = entry[0], entry[-1]
+        return "<present>%s</present>" % "\n".join(
+            OAI_ISBN_RECORD % (num, self.sets[set_number][num - 1])
+            for num in range(first, last + 1)
+        )
+
+
+def test_getISBNCountMany(use_transport):
+    fake = FakeCatalogue([
+        "80-251-0225-4",
+        "978-80-87899-15-1",
+        "978-80-87899-15-1",
+    ])
+    use_transport(fake)
+
+    counts = aleph.getISBNCountMany([
+        "80-251-0225-4",
+        "9788025102251",  # ISBN-13 variant of the first one
+        "978-80-87899-15-1",
+        "80-7169-860-1",
+    ])
+
+    assert counts == {
+        "80-251-0225-4": 1,
+        "9788025102251": 1,
+        "978-80-87899-15-1": 2,
+        "80-7169-860-1": 0,
+    }
+    assert len(fake.urls) == 2  # one find, one present
+
+
+def test_getISBNCountMany_url_length(use_transport, monkeypatch):
+    monkeypatch.setattr(aleph, "ALEPH_MAX_URL_LENGTH", 100)
+
+    fake = FakeCatalogue(["80-251-0225-4"])
+    isbns = ["80-251-0225-4", "978-80-87899-15-1", "80-7169-860-1"]
+
+    use_transport(fake)
+    counts = aleph.getISBNCountMany(isbns)
+
+    find_urls = [url for url in fake.urls if "op=find" in url]
+
+    assert counts["80-251-0225-4"] == 1
+    assert len(find_urls) > 1
+    assert all(len(url) <= 100 for url in find_urls)
+
+    # variants of one ISBN are asked by one query, not counted twice
+    monkeypatch.setattr(aleph, "ALEPH_MAX_URL_LENGTH", 70)
+
+    counts = aleph.getISBNCountMany(["80-251-0225-4", "9788025102251"])
+
+    assert counts == {"80-251-0225-4": 1, "9788025102251": 1}
@@ -0,0 +1,135 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import copy
+import cPickle
+
+from aleph.datastructures import alephrecord
+from aleph.datastructures import AlephRecord
+from aleph.datastructures import LazyAlephRecord
+from aleph.datastructures import EPeriodical
+from aleph.datastructures import EPublication
+from aleph.datastructures import SemanticInfo
+from aleph.datastructures import EPeriodicalSemanticInfo
+
+from test_epublication import read_file
+from test_epublication import unix_example
+
+
+# Fixtures ====================================================================
+def present_response(xml, doc_number):
+    return (
+        '<?xml version = "1.0" encoding = "UTF-8"?>\n<present>\n' +
+        "<doc_number>%s</doc_number>\n" % doc_number +
+        xml +
+        "\n</present>\n"
+    )
+
+
+def forbid_parsing(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("Record shouldn't be parsed!")
+
+    monkeypatch.setattr(alephrecord, "MARCXMLRecord", fail)
+
+
+# Tests =======================================================================
+def test_AlephRecord(unix_example):
+    record = AlephRecord("nkc", "NKC01", "1", unix_example)
+
+    assert isinstance(record.parsed_info, EPublication)
+    assert isinstance(record.semantic_info, SemanticInfo)
+    assert record.xml == unix_example
+
+
+def test_AlephRecord_from_xml(unix_example):
+    xml = present_response(unix_example, "001492461")
+
+    record = AlephRecord.from_xml("nkc", "NKC01", xml)
+
+    assert record.docNumber == "001492461"
+    assert record.xml == xml
+    assert record == AlephRecord("nkc", "NKC01", "001492461", xml)
+
+
+def test_AlephRecord_from_xml_periodical():
+    record = AlephRecord.from_xml("nkc", "NKC01", read_file("echa.xml"))
+
+    assert record.docNumber == "-1"
+    assert isinstance(record.parsed_info, EPeriodical)
+    assert isinstance(record.semantic_info, EPeriodicalSemanticInfo)
+
+
+def test_AlephRecord_blank():
+    record = AlephRecord.from_xml("nkc", "NKC01", "  ")
+
+    assert record.parsed_info is None
+    assert record.semantic_info is None
+
+
+def test_LazyAlephRecord(unix_example):
+    xml = present_response(unix_example, "001492461")
+
+    record = LazyAlephRecord.from_xml("nkc", "NKC01", xml)
+    assert "_parsed_fields" not in record.__dict__
+
+    assert record.docNumber == "001492461"
+    assert record.xml == xml
+    assert record.base == "nkc"
+    assert "_parsed_fields" not in record.__dict__
+
+    eager = AlephRecord.from_xml("nkc", "NKC01", xml)
+
+    assert record.parsed_info == eager.parsed_info
+    assert record.semantic_info is record.semantic_info
+    assert "_parsed_fields" in record.__dict__
+
+    assert record == eager
+    assert eager == tuple(record)
+    assert record[4] == eager[4]
+    assert record[-1] == eager[-1]
+    assert record[:2] == ("nkc", "NKC01")
+    assert record._asdict() == eager._asdict()
+    assert repr(record).startswith("LazyAlephRecord(base='nkc'")
+
+    base, library, doc_number, xml, parsed_info, semantic_info = record
+    assert parsed_info == eager.parsed_info
+
+
+def test_LazyAlephRecord_given_fields(unix_example):
+    record = LazyAlephRecord("nkc", "NKC01", "1", unix_example, "P", "S")
+
+    assert record.parsed_info == "P"
+    assert record.semantic_info == "S"
+
+
+def test_AlephRecord_pickle(unix_example, monkeypatch):
+    record = AlephRecord("nkc", "NKC01", "1", unix_example)
+    lazy = LazyAlephRecord("nkc", "NKC01", "1", unix_example)
+
+    forbid_parsing(monkeypatch)
+
+    # MARCSubrecord from marcxml_parser can't be pickled by protocol 2
+    for protocol in [0, 1]:
+        unpickled = cPickle.loads(cPickle.dumps(record, protocol))
+
+        assert unpickled == record
+        assert type(unpickled) == AlephRecord
+
+        unpickled = cPickle.loads(cPickle.dumps(lazy, protocol))
+
+        assert type(unpickled) == LazyAlephRecord
+        assert "_parsed_fields" not in unpickled.__dict__
+
+    assert copy.copy(record) == record
+
+
+def test_AlephRecord_deserialize(unix_example, monkeypatch):
+    record = AlephRecord("nkc", "NKC01", "1", unix_example)
+
+    forbid_parsing(monkeypatch)
+
+    assert AlephRecord(**record._asdict()) == record
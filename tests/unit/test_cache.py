@@ -0,0 +1,239 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import time
+import threading
+
+from aleph import cache
+
+
+# Tests =======================================================================
+def test_normalize():
+    assert cache.normalize("  Eric  S.\tRaymond ") == "eric s. raymond"
+    assert cache.normalize(False) is False
+
+
+def test_get_set():
+    lru = cache.LRUCache(2)
+
+    assert lru.get("a") is None
+    lru.set("a", 1, ttl=60)
+
+    assert lru.get("a") == 1
+    assert lru.get("b", "default") == "default"
+    assert lru.stats()["hits"] == 1
+    assert lru.stats()["misses"] == 2
+
+
+def test_eviction():
+    lru = cache.LRUCache(2)
+
+    lru.set("a", 1, ttl=60)
+    lru.set("b", 2, ttl=60)
+    lru.get("a")  # "b" is now least recently used
+    lru.set("c", 3, ttl=60)
+
+    assert len(lru) == 2
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert lru.evictions == 1
+
+
+def test_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+
+    lru = cache.LRUCache(10)
+    lru.set("count", 1, ttl=60)
+    lru.set("doc", 2, ttl=3600)
+    lru.set("disabled", 3, ttl=0)
+
+    now[0] += 61
+
+    assert lru.get("count") is None
+    assert lru.get("doc") == 2
+    assert lru.get("disabled") is None
+    assert lru.expirations == 1
+
+
+def test_cached():
+    lru = cache.LRUCache(10)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 0
+
+    assert lru.cached("key", 60, compute) == 0
+    assert lru.cached("key", 60, compute) == 0
+    assert len(calls) == 1
+
+    assert lru.invalidate("key")
+    assert not lru.invalidate("key")
+    assert lru.cached("key", 60, compute) == 0
+    assert len(calls) == 2
+
+
+def test_disabled():
+    lru = cache.LRUCache(0)
+    lru.set("a", 1, ttl=60)
+
+    assert lru.get("a") is None
+    assert lru.cached("a", 60, lambda: 2) == 2
+    assert len(lru) == 0
+
+
+def test_threads():
+    lru = cache.LRUCache(50)
+
+    def worker(offset):
+        for i in range(1000):
+            lru.set((offset + i) % 100, i, ttl=60)
+            lru.get(i % 100)
+
+    threads = [
+        threading.Thread(target=worker, args=(offset,))
+        for offset in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = lru.stats()
+    assert stats["size"] == 50
+    assert stats["hits"] + stats["misses"] == 8000
+
+
+def test_setCache():
+    lru = cache.LRUCache(1)
+
+    old = cache.setCache(lru)
+    try:
+        assert cache.getCache() is lru
+    finally:
+        cache.setCache(old)
+
+
+def test_isbnKey():
+    variants = [
+        "80-251-0225-4",
+        "8025102254",
+        "978-80-251-0225-1",
+        "9788025102251",
+    ]
+
+    assert set(map(cache.isbnKey, variants)) == set(["9788025102251"])
+    assert cache.isbnKey("80-251-0225-5") is None  # bad checksum
+    assert cache.isbnKey("nkc") is None
+    assert cache.isbnKey(1) is None
+
+
+def test_invalidateISBN():
+    lru = cache.LRUCache(10)
+    lru.set(("count", "ISBNQuery", "80-251-0225-4", "nkc"), 1, ttl=60)
+    lru.set(("search", "ISBNQuery", "9788025102251", "nkc"), 2, ttl=60)
+    lru.set(("empty set", "nkc", "sbn", "978-80-251-0225-1", False), 3, 60)
+    lru.set(("count", "ISBNQuery", "978-80-87899-15-1", "nkc"), 4, ttl=60)
+
+    old = cache.setCache(lru)
+    try:
+        assert cache.invalidateISBN("8025102254") == 3
+        assert cache.invalidateISBN("bad isbn") == 0
+    finally:
+        cache.setCache(old)
+
+    assert len(lru) == 1
+    assert lru.get(("count", "ISBNQuery", "978-80-87899-15-1", "nkc")) == 4
+
+
+def test_stale_while_revalidate(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+
+    lru = cache.LRUCache(10)
+    values = iter(["first", "second", "third"])
+    refreshed = threading.Event()
+
+    def compute():
+        value = next(values)
+        if value == "second":
+            refreshed.set()
+
+        return value
+
+    assert lru.cached("key", 100, compute, soft_ttl=10) == "first"
+
+    now[0] += 20  # stale - old value is returned and refreshed in background
+    assert lru.cached("key", 100, compute, soft_ttl=10) == "first"
+    assert refreshed.wait(10)
+
+    for _ in range(100):  # value is stored after compute() returns
+        if lru.get("key") == "second":
+            break
+        time.sleep(0.01)
+
+    assert lru.get("key") == "second"
+    assert lru.stats()["stale_hits"] == 1
+    assert lru.stats()["refreshes"] == 1
+
+    now[0] += 200  # expired - value is computed synchronously
+    assert lru.cached("key", 100, compute, soft_ttl=10) == "third"
+
+
+def test_refresh_of_invalidated_item(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+
+    lru = cache.LRUCache(10)
+    lru.set("key", "old", 100, soft_ttl=10)
+    now[0] += 20
+
+    release = threading.Event()
+    done = threading.Event()
+
+    def compute():
+        release.wait(10)
+        done.set()
+        return "new"
+
+    assert lru.cached("key", 100, compute, soft_ttl=10) == "old"
+    lru.invalidate("key")
+    release.set()
+
+    assert done.wait(10)
+    time.sleep(0.05)
+    assert lru.get("key") is None
+
+
+def test_invalidation_during_computation():
+    lru = cache.LRUCache(10)
+
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def compute():
+        started.set()
+        release.wait(10)
+        return "computed before the invalidation"
+
+    thread = threading.Thread(
+        target=lambda: results.append(lru.cached("key", 60, compute))
+    )
+    thread.start()
+
+    assert started.wait(10)
+    assert lru.invalidateMatching(lambda key: key == "key") == 0
+    release.set()
+    thread.join(10)
+
+    assert results == ["computed before the invalidation"]
+    assert lru.get("key") is None
+
+    assert lru.cached("key", 60, lambda: "new") == "new"
+    assert lru.get("key") == "new"
@@ -0,0 +1,93 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import cPickle
+
+import pytest
+
+from aleph import convert
+from aleph import settings
+from aleph import ISBNQuery
+from aleph.datastructures import AlephRecord
+
+from test_epublication import read_file
+from test_alephrecord import present_response
+
+
+# Fixtures ====================================================================
+@pytest.fixture
+def xmls():
+    return [
+        present_response(read_file(fn), "%09d" % cnt)
+        for cnt, fn in enumerate([
+            "unix_example.xml",
+            "echa.xml",
+            "kviti.xml",
+            "periodical.xml",
+            "pasivni_domy.xml",
+        ])
+    ]
+
+
+@pytest.fixture
+def workers(request, monkeypatch):
+    monkeypatch.setattr(settings, "ALEPH_CONVERT_WORKERS", 2)
+    monkeypatch.setattr(settings, "ALEPH_CONVERT_CHUNK_SIZE", 2)
+    request.addfinalizer(convert.closePool)
+
+
+def parse_locally(xmls):
+    return [
+        AlephRecord.from_xml(
+            base="nkc",
+            library=settings.DEFAULT_LIBRARY,
+            xml=xml
+        )
+        for xml in xmls
+    ]
+
+
+def convert_all(xmls):
+    return convert.convertRecords(
+        xmls,
+        base="nkc",
+        library=settings.DEFAULT_LIBRARY
+    )
+
+
+# Tests =======================================================================
+def test_convertXML_is_picklable(xmls):
+    for xml in xmls:
+        converted = convert._convertXML(xml)
+
+        assert cPickle.loads(cPickle.dumps(converted, 2)) == converted
+
+
+def test_convertRecords(xmls, workers):
+    records = convert_all(xmls)
+
+    assert records == parse_locally(xmls)
+    assert [record.docNumber for record in records] == [
+        "%09d" % cnt for cnt in range(len(xmls))
+    ]
+
+
+def test_convertRecords_without_workers(xmls, monkeypatch):
+    monkeypatch.setattr(settings, "ALEPH_CONVERT_WORKERS", 0)
+    monkeypatch.setattr(convert, "_getPool", None)
+
+    records = convert_all(xmls)
+
+    assert records == parse_locally(xmls)
+
+
+def test_getSearchResult_uses_pool(xmls, workers, monkeypatch):
+    monkeypatch.setattr(ISBNQuery, "_getXML", lambda self: xmls)
+
+    result = ISBNQuery("80-251-0225-4").getSearchResult()
+
+    assert result.records == parse_locally(xmls)
+    assert convert._POOL is not None
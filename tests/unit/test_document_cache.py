@@ -0,0 +1,210 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import os
+import time
+import sqlite3
+import threading
+
+import pytest
+
+from aleph import aleph
+from aleph import cache
+from aleph import settings
+from aleph import document_cache
+from aleph import DocumentQuery
+from aleph.document_cache import MARC_OAI
+from aleph.document_cache import MARC_XML
+
+from test_aleph import search_result
+
+
+# Fixtures ====================================================================
+@pytest.fixture
+def db_path(tmpdir):
+    return str(tmpdir.join("documents.sqlite"))
+
+
+@pytest.fixture
+def doc_cache(request, db_path):
+    doc_cache = document_cache.DocumentCache(db_path, ttl=60)
+
+    old = document_cache.setDocumentCache(doc_cache)
+    request.addfinalizer(lambda: document_cache.setDocumentCache(old))
+
+    return doc_cache
+
+
+class FakeClock(object):
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now[0]
+
+
+# Tests =======================================================================
+def test_get_set(db_path):
+    doc_cache = document_cache.DocumentCache(db_path, ttl=60)
+    data = "<record>%s</record>" % ("x" * 10000)
+
+    assert doc_cache.get(MARC_XML, "NKC01", "000000012") is None
+
+    doc_cache.set(MARC_XML, "NKC01", "000000012", data)
+
+    assert doc_cache.get(MARC_XML, "NKC01", 12) == data
+    assert doc_cache.get(MARC_OAI, "NKC01", 12) is None
+    assert doc_cache.get(MARC_XML, "nkc", 12) is None
+    assert doc_cache.stats() == {"size": 1, "hits": 1, "misses": 3}
+
+    # documents are stored compressed
+    stored = sqlite3.connect(db_path).execute(
+        "SELECT data FROM documents"
+    ).fetchone()[0]
+    assert len(stored) < len(data) / 10
+
+
+def test_ttl(db_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(document_cache.time, "time", lambda: now[0])
+
+    doc_cache = document_cache.DocumentCache(db_path, ttl=60)
+    doc_cache.set(MARC_OAI, "nkc", 1, "doc")
+
+    now[0] += 61
+
+    assert doc_cache.get(MARC_OAI, "nkc", 1) is None
+    assert doc_cache.purge() == 1
+
+
+def test_purge_on_open(db_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(document_cache.time, "time", lambda: now[0])
+
+    doc_cache = document_cache.DocumentCache(db_path, ttl=60)
+    doc_cache.set(MARC_OAI, "nkc", 1, "expired")
+    now[0] += 30
+    doc_cache.set(MARC_OAI, "nkc", 2, "valid")
+    now[0] += 31
+
+    doc_cache = document_cache.DocumentCache(db_path, ttl=60)
+
+    assert doc_cache.stats()["size"] == 1
+    assert doc_cache.get(MARC_OAI, "nkc", 2) == "valid"
+
+
+def test_invalidate(db_path):
+    doc_cache = document_cache.DocumentCache(db_path, ttl=60)
+    doc_cache.set(MARC_OAI, "nkc", 1, "doc")
+
+    assert doc_cache.invalidate(MARC_OAI, "nkc", "0001")
+    assert not doc_cache.invalidate(MARC_OAI, "nkc", 1)
+    assert doc_cache.get(MARC_OAI, "nkc", 1) is None
+
+
+def test_shared_by_processes(db_path):
+    doc_cache = document_cache.DocumentCache(db_path, ttl=60)
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            doc_cache.set(MARC_OAI, "nkc", 1, "from child")
+        finally:
+            os._exit(0)
+
+    os.waitpid(pid, 0)
+
+    # "restarted" process opening the same database
+    doc_cache = document_cache.DocumentCache(db_path, ttl=60)
+    assert doc_cache.get(MARC_OAI, "nkc", 1) == "from child"
+
+
+def test_downloadMARCOAI(fake_aleph, doc_cache):
+    doc = aleph.downloadMARCOAI("000000002", "nkc")
+
+    assert aleph.downloadMARCOAI(2, "nkc") == doc
+    assert len(fake_aleph.urls) == 1
+
+    # missing documents are not stored in the document cache
+    for _ in range(2):
+        with pytest.raises(aleph.DocumentNotFoundException):
+            aleph.downloadMARCOAI(3, "nkc")
+
+        assert aleph.invalidateMissingDocument(3, "nkc")
+    assert len(fake_aleph.urls) == 3
+
+
+def test_downloadRecords(fake_aleph, doc_cache):
+    records = aleph.downloadRecords(search_result(5))
+
+    # records from the set are not stored, nor returned in place of the
+    # find_doc response
+    assert len(records) == 5
+    assert doc_cache.stats()["size"] == 0
+    assert len(fake_aleph.urls) == 1
+
+    doc = aleph.downloadMARCOAI(4, "nkc")
+    assert "<find-doc>" in doc
+    assert "<present>" not in doc
+    assert len(fake_aleph.urls) == 2
+
+
+def test_get_max_age(db_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(document_cache.time, "time", lambda: now[0])
+
+    doc_cache = document_cache.DocumentCache(db_path, ttl=60)
+    doc_cache.set(MARC_OAI, "nkc", 1, "doc")
+    now[0] += 20
+
+    assert doc_cache.get(MARC_OAI, "nkc", 1, max_age=30) == "doc"
+    assert doc_cache.get(MARC_OAI, "nkc", 1, max_age=10) is None
+    assert doc_cache.get(MARC_OAI, "nkc", 1, max_age=100) == "doc"
+
+
+def test_DocumentQuery_refresh(fake_aleph, doc_cache, monkeypatch):
+    monkeypatch.setattr(settings, "ALEPH_LAZY_RECORDS", True)
+    monkeypatch.setattr(settings, "ALEPH_CACHE_DOCUMENT_SOFT_TTL", 10)
+    monkeypatch.setattr(settings, "ALEPH_CACHE_DOCUMENT_TTL", 100)
+
+    # only the clock of the caches is moved, not the one of the rate limiter
+    now = [time.time()]
+    clock = FakeClock(now)
+    monkeypatch.setattr(cache, "time", clock)
+    monkeypatch.setattr(document_cache, "time", clock)
+
+    query = DocumentQuery("000000002")
+    query.getSearchResult()
+    query.getSearchResult()
+    assert len(fake_aleph.urls) == 1
+
+    # other process can use fresh document from the persistent cache
+    cache.getCache().clear()
+    query.getSearchResult()
+    assert len(fake_aleph.urls) == 1
+
+    # stale document is refreshed from Aleph, not from the persistent cache
+    now[0] += 20
+    query.getSearchResult()
+    for _ in range(100):
+        if len(fake_aleph.urls) == 2:
+            break
+        threading.Event().wait(0.01)
+    assert len(fake_aleph.urls) == 2
+
+    # and so is the expired one
+    now[0] += 200
+    query.getSearchResult()
+    assert len(fake_aleph.urls) == 3
+
+
+def test_disabled(fake_aleph):
+    assert document_cache.getDocumentCache() is None
+
+    aleph.downloadMARCOAI(2, "nkc")
+    aleph.downloadMARCOAI(2, "nkc")
+
+    assert len(fake_aleph.urls) == 2
@@ -0,0 +1,175 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import os.path
+import Queue
+
+import pytest
+
+import aleph
+from aleph import cache
+from aleph import export
+from aleph import harness
+from aleph import settings
+from aleph import ratelimit
+
+from test_convert import xmls
+
+
+# Fixtures ====================================================================
+@pytest.fixture
+def fake_aleph(fake_aleph, monkeypatch):
+    monkeypatch.setattr(settings, "ALEPH_LAZY_RECORDS", True)
+
+    return fake_aleph
+
+
+def collect(harness_obj, count):
+    responses = {}
+    for _ in range(count):
+        response = harness_obj.getResponse(timeout=30)
+        responses.setdefault(response.message_id, []).append(response)
+
+    return responses
+
+
+# Tests =======================================================================
+def test_warmUp(fake_aleph, go_offline):
+    harness.warmUp(["000000002", "000000003"])
+    assert len(fake_aleph.urls) == 3
+
+    go_offline()
+
+    assert sorted(aleph.aleph.getListOfBases()) == ["cze01", "nkc"]
+    assert aleph.DocumentQuery("000000002").getSearchResult().records
+
+
+def test_harness_in_process(fake_aleph):
+    harness_obj = harness.Harness(workers=0, bases=False)
+    harness_obj.start()
+
+    valid = harness_obj.submit(aleph.ISBNValidationRequest("80-251-0225-4"))
+    found = harness_obj.submit(
+        aleph.SearchRequest(aleph.DocumentQuery("000000002"), stream=True)
+    )
+    missing = harness_obj.submit(
+        aleph.SearchRequest(aleph.DocumentQuery("000000003"))
+    )
+
+    responses = collect(harness_obj, 5)
+    harness_obj.stop()
+
+    assert responses[valid] == [
+        harness.Response(valid, aleph.ISBNValidationResult(True), True)
+    ]
+
+    assert [response.last for response in responses[found]] == \
+        [False, False, True]
+    assert responses[found][0].result.records[0].docNumber == "000000002"
+    assert responses[found][-1].result == aleph.SearchSummary(1, 1)
+
+    assert responses[missing][0].result.exception == \
+        "DocumentNotFoundException"
+
+
+def test_harness_forked_workers(fake_aleph, go_offline):
+    harness.warmUp(["000000002"], bases=False)
+    go_offline()
+
+    harness_obj = harness.Harness(workers=2, bases=False)
+    harness_obj.start()
+
+    message_ids = [
+        harness_obj.submit(aleph.SearchRequest(aleph.DocumentQuery(doc_id)))
+        for doc_id in ["000000002", "000000004"]
+    ]
+
+    responses = collect(harness_obj, 2)
+    harness_obj.stop()
+
+    # hot document is served from the cache inherited from the parent
+    hot = responses[message_ids[0]][0].result
+    cached = aleph.DocumentQuery("000000002").getSearchResult()
+    assert hot.records[0].xml == cached.records[0].xml
+
+    # others have to be downloaded
+    cold = responses[message_ids[1]][0].result
+    assert cold == aleph.ErrorResult("IOError", "Aleph is offline.")
+
+
+def test_harness_forked_workers_convert(xmls, monkeypatch):
+    monkeypatch.setattr(settings, "ALEPH_LAZY_RECORDS", False)
+    monkeypatch.setattr(settings, "ALEPH_CONVERT_WORKERS", 2)
+    monkeypatch.setattr(aleph.ISBNQuery, "_getXML", lambda self: xmls)
+
+    harness_obj = harness.Harness(workers=1, bases=False)
+    harness_obj.start()
+
+    harness_obj.submit(aleph.SearchRequest(aleph.ISBNQuery("80-251-0225-4")))
+
+    response = harness_obj.getResponse(timeout=30)
+    harness_obj.stop()
+
+    assert not isinstance(response.result, aleph.ErrorResult), response
+    assert [record.docNumber for record in response.result.records] == [
+        "%09d" % cnt for cnt in range(len(xmls))
+    ]
+
+
+def test_harness_shares_rate_limit(fake_aleph, request):
+    limiter = ratelimit.TokenBucket(rate=1000, burst=5)
+    old = ratelimit.setLimiter(limiter)
+    request.addfinalizer(lambda: ratelimit.setLimiter(old))
+
+    harness_obj = harness.Harness(workers=1, bases=False)
+    harness_obj.start()
+
+    shared = ratelimit.getLimiter()
+    assert isinstance(shared, ratelimit.FileTokenBucket)
+    assert (shared.rate, shared.burst) == (1000, 5)
+
+    harness_obj.submit(aleph.SearchRequest(aleph.DocumentQuery("000000002")))
+    harness_obj.getResponse(timeout=30)
+
+    # worker took its token from the shared file
+    with open(shared.path) as f:
+        assert f.read()
+
+    harness_obj.stop()
+
+    assert ratelimit.getLimiter() is limiter
+    assert not os.path.exists(shared.path)
+
+
+def test_serve_broadcasts_invalidations(monkeypatch):
+    monkeypatch.setattr(export, "exportEPublication", lambda epub: None)
+
+    class EPublication(object):
+        ISBN = "978-80-251-0225-1"
+
+    for ISBN in ["80-251-0225-4", "978-80-87899-15-1", "80-7169-860-1"]:
+        cache.getCache().set(("count", ISBN), 1, ttl=60)
+
+    requests = Queue.Queue()
+    responses = Queue.Queue()
+    invalidations = Queue.Queue()
+    peer = Queue.Queue()
+
+    # ISBN exported by other worker
+    invalidations.put("9788087899151")
+
+    requests.put((1, aleph.ExportRequest(EPublication)))
+    requests.put(None)
+
+    harness.serve(requests, responses, invalidations, [peer])
+
+    assert responses.get_nowait().result == \
+        aleph.ExportResult("978-80-251-0225-1")
+    assert peer.get_nowait() == "978-80-251-0225-1"
+
+    assert cache.getCache().get(("count", "80-251-0225-4")) is None
+    assert cache.getCache().get(("count", "978-80-87899-15-1")) is None
+    assert cache.getCache().get(("count", "80-7169-860-1")) == 1
@@ -0,0 +1,92 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import os
+import sys
+import json
+import os.path
+import subprocess
+
+import aleph
+
+
+# Variables ===================================================================
+#: Modules, which are imported at first use, not by ``import aleph``.
+LAZY_MODULES = [
+    "dhtmlparser",
+    "httpkie",
+    "marcxml_parser",
+    "isbn_validator",
+    "remove_hairs",
+    "multiprocessing",
+    "sqlite3",
+    "xml.etree.cElementTree",
+]
+
+#: Maximal number of modules in :attr:`sys.modules` after ``import aleph``.
+#: It was 246 when all dependencies were imported eagerly.
+MODULES_BUDGET = 160
+
+
+# Functions ===================================================================
+def cold_import(code=""):
+    """
+    Import :mod:`aleph` in new interpreter and run `code` there.
+
+    Returns:
+        dict: ``{"seconds": .., "modules": [..]}`` after the `code` is run.
+    """
+    script = "\n".join([
+        "import sys, json, time",
+        "start = time.time()",
+        "import aleph",
+        "seconds = time.time() - start",
+        code,
+        "print json.dumps({'seconds': seconds, 'modules': list(sys.modules)})",
+    ])
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(aleph.__file__))
+
+    return json.loads(
+        subprocess.check_output([sys.executable, "-c", script], env=env)
+    )
+
+
+# Tests =======================================================================
+def test_heavy_modules_are_lazy():
+    result = cold_import()
+    modules = [name for name in result["modules"] if name in LAZY_MODULES]
+
+    assert modules == []
+    assert len(result["modules"]) <= MODULES_BUDGET, \
+        "Cold import of aleph loads too many modules."
+
+
+def test_parsers_are_imported_at_first_use():
+    result = cold_import(
+        "aleph.reactToAMQPMessage(\n"
+        "    aleph.ISBNValidationRequest('80-251-0225-4'), None\n"
+        ")\n"
+        "aleph.parsers.getMARCXMLRecord()"
+    )
+
+    assert "isbn_validator" in result["modules"]
+    assert "marcxml_parser" in result["modules"]
+    assert "dhtmlparser" in result["modules"]
+    assert "httpkie" not in result["modules"]
+
+
+def test_export_is_cheap_to_import():
+    result = cold_import(
+        "import types\n"
+        "assert isinstance(aleph.export, types.ModuleType)\n"
+        "from aleph import export\n"
+        "assert export is aleph.export"
+    )
+
+    assert "aleph.export" in result["modules"]
+    assert "httpkie" not in result["modules"]
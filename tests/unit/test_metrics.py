@@ -0,0 +1,125 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import pytest
+
+import aleph
+from aleph import metrics
+from aleph import settings
+
+from test_reactToAMQPMessage import fake_aleph
+
+
+# Fixtures ====================================================================
+@pytest.fixture
+def registry(request, monkeypatch):
+    monkeypatch.setattr(settings, "ALEPH_METRICS", True)
+
+    old = metrics.setRegistry(metrics.Registry())
+    request.addfinalizer(lambda: metrics.setRegistry(old))
+
+    return metrics.getRegistry()
+
+
+def search(request):
+    return aleph.reactToAMQPMessage(request, lambda result: None)
+
+
+# Tests =======================================================================
+def test_Histogram():
+    histogram = metrics.Histogram([1, 5])
+    for value in [0.5, 1, 3, 10]:
+        histogram.observe(value)
+
+    assert histogram.snapshot() == {
+        "count": 4,
+        "sum": 14.5,
+        "buckets": [(1, 2), (5, 3), (float("inf"), 4)],
+    }
+
+
+def test_getOp():
+    assert metrics.getOp("http://aleph/X?op=find&base=nkc") == "find"
+    assert metrics.getOp("http://aleph/X?base=nkc&op=ill_get_set") == \
+        "ill_get_set"
+    assert metrics.getOp("http://aleph/F/?func=file") == "other"
+
+
+def test_calls_and_fan_out(fake_aleph, registry):
+    search(aleph.SearchRequest(aleph.AuthorQuery("Raymond"), whole_set=True))
+
+    snapshot = registry.snapshot()
+
+    assert snapshot["latency"]["present"]["count"] == 3
+    assert snapshot["bytes"]["present"] > 0
+    assert snapshot["errors"] == {}
+    assert snapshot["fan_out"]["SearchRequest"]["count"] == 1
+    assert snapshot["fan_out"]["SearchRequest"]["sum"] == 3
+
+
+def test_errors(fake_aleph, registry, go_offline):
+    go_offline()
+
+    with pytest.raises(IOError):
+        search(aleph.SearchRequest(aleph.DocumentQuery(2)))
+
+    snapshot = registry.snapshot()
+
+    assert snapshot["errors"] == {"find_doc": {"IOError": 1}}
+    assert snapshot["request_errors"] == {"SearchRequest": {"IOError": 1}}
+    assert snapshot["fan_out"]["SearchRequest"]["sum"] == 1
+
+
+def test_batch_fan_out(fake_aleph, registry):
+    result = search(aleph.BatchRequest([
+        aleph.SearchRequest(aleph.DocumentQuery(2)),
+        aleph.SearchRequest(aleph.DocumentQuery(3)),
+        aleph.SearchRequest(aleph.DocumentQuery(4)),
+    ]))
+
+    assert result.results[1].exception == "DocumentNotFoundException"
+
+    snapshot = registry.snapshot()
+
+    assert snapshot["latency"]["find_doc"]["count"] == 3
+    assert snapshot["fan_out"]["SearchRequest"]["count"] == 3
+    assert snapshot["fan_out"]["BatchRequest"]["sum"] == 3
+    assert snapshot["request_errors"] == {
+        "SearchRequest": {"DocumentNotFoundException": 1}
+    }
+
+
+def test_toPrometheus(fake_aleph, registry):
+    search(aleph.SearchRequest(aleph.DocumentQuery(2)))
+
+    text = registry.toPrometheus()
+
+    assert "# TYPE aleph_xservice_call_seconds histogram" in text
+    assert 'aleph_xservice_call_seconds_bucket{op="find_doc",le="+Inf"} 1' \
+        in text
+    assert 'aleph_xservice_call_seconds_count{op="find_doc"} 1' in text
+    assert 'aleph_xservice_response_bytes_total{op="find_doc"} ' in text
+    assert 'aleph_request_xservice_calls_bucket{request="SearchRequest",' \
+        'le="1.0"} 1' in text
+    assert text.endswith("\n")
+
+
+def test_enabled_from_config(fake_aleph, registry, monkeypatch):
+    monkeypatch.setattr(settings, "ALEPH_METRICS", False)
+    settings.substitute_globals({"ALEPH_METRICS": True})
+
+    search(aleph.SearchRequest(aleph.DocumentQuery(2)))
+
+    assert registry.snapshot()["latency"]["find_doc"]["count"] == 1
+
+
+def test_disabled(fake_aleph, registry, monkeypatch):
+    monkeypatch.setattr(settings, "ALEPH_METRICS", False)
+
+    search(aleph.SearchRequest(aleph.DocumentQuery(2)))
+
+    assert registry.snapshot()["latency"] == {}
+    assert registry.snapshot()["fan_out"] == {}
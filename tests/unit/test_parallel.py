@@ -0,0 +1,70 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import time
+import threading
+
+import pytest
+
+from aleph.parallel import parallelMap
+
+
+# Tests =======================================================================
+def test_parallelMap_order():
+    def slow_square(x):
+        time.sleep((10 - x) * 0.001)
+        return x * x
+
+    assert parallelMap(slow_square, range(10), workers=4) == \
+        [x * x for x in range(10)]
+
+
+def test_parallelMap_sequential():
+    assert parallelMap(lambda x: x + 1, [1, 2, 3], workers=1) == [2, 3, 4]
+    assert parallelMap(lambda x: x + 1, [], workers=4) == []
+
+
+def test_parallelMap_bounded():
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def task(x):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+
+        time.sleep(0.01)
+
+        with lock:
+            running[0] -= 1
+
+    parallelMap(task, range(20), workers=3)
+
+    assert 1 < peak[0] <= 3
+
+
+def test_parallelMap_catch():
+    def fail_odd(x):
+        if x % 2:
+            raise KeyError(x)
+
+        return x
+
+    results = parallelMap(fail_odd, range(4), workers=2, catch=KeyError)
+
+    assert results[0] == 0
+    assert isinstance(results[1], KeyError)
+    assert results[2] == 2
+    assert isinstance(results[3], KeyError)
+
+
+def test_parallelMap_raises():
+    def fail(x):
+        raise ValueError(x)
+
+    with pytest.raises(ValueError):
+        parallelMap(fail, range(4), workers=2)
@@ -0,0 +1,68 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import time
+
+from aleph import ratelimit
+
+
+# Tests =======================================================================
+def test_TokenBucket_burst():
+    bucket = ratelimit.TokenBucket(rate=1, burst=5)
+
+    for _ in range(5):
+        assert bucket.acquire() == 0
+
+    stats = bucket.stats()
+    assert stats["requests"] == 5
+    assert stats["delayed"] == 0
+
+
+def test_TokenBucket_rate():
+    bucket = ratelimit.TokenBucket(rate=100, burst=1)
+
+    start = time.time()
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.time() - start >= 0.04
+
+    stats = bucket.stats()
+    assert stats["requests"] == 6
+    assert stats["delayed"] >= 4
+    assert stats["total_wait"] > 0
+    assert stats["max_wait"] <= stats["total_wait"]
+
+
+def test_TokenBucket_disabled():
+    bucket = ratelimit.TokenBucket(rate=0, burst=1)
+
+    for _ in range(100):
+        assert bucket.acquire() == 0
+
+
+def test_FileTokenBucket_shared(tmpdir):
+    path = str(tmpdir.join("bucket"))
+
+    first = ratelimit.FileTokenBucket(path, rate=1, burst=3)
+    second = ratelimit.FileTokenBucket(path, rate=1, burst=3)
+
+    assert first.acquire() == 0
+    assert first.acquire() == 0
+    assert second.acquire() == 0
+
+    # bucket is shared, so there is no token left for the second limiter
+    assert second._reserve(time.time()) > 0
+
+
+def test_setLimiter():
+    limiter = ratelimit.TokenBucket(rate=0, burst=1)
+
+    old = ratelimit.setLimiter(limiter)
+    try:
+        assert ratelimit.getLimiter() is limiter
+    finally:
+        ratelimit.setLimiter(old)
@@ -0,0 +1,340 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import threading
+from collections import namedtuple
+
+import pytest
+
+import aleph
+from aleph import aio
+from aleph import cache
+from aleph import export
+from aleph import singleflight
+from aleph import settings
+
+from test_aleph import search_result
+
+
+# Fixtures ====================================================================
+@pytest.fixture
+def fake_aleph(fake_aleph, request, monkeypatch):
+    old_cache = cache.setCache(cache.LRUCache(10))
+    request.addfinalizer(lambda: cache.setCache(old_cache))
+
+    def searchInAleph(base, phrase, considerSimilar, field):
+        fake_aleph.searches.append((base, phrase, field))
+        return search_result(75)
+
+    fake_aleph.searches = []
+    monkeypatch.setattr(settings, "ALEPH_LAZY_RECORDS", True)
+    monkeypatch.setattr(aleph.aleph, "searchInAleph", searchInAleph)
+
+    return fake_aleph
+
+
+# Tests =======================================================================
+def test_SearchRequest_default():
+    request = aleph.SearchRequest(aleph.AuthorQuery("Raymond"))
+
+    assert request.whole_set is False
+
+
+def test_SearchRequest(fake_aleph):
+    result = aleph.reactToAMQPMessage(
+        aleph.SearchRequest(aleph.AuthorQuery("Raymond")),
+        None
+    )
+
+    assert len(result.records) == aleph.aleph.MAX_RECORDS
+
+
+def test_SearchRequest_whole_set(fake_aleph):
+    result = aleph.reactToAMQPMessage(
+        aleph.SearchRequest(aleph.AuthorQuery("Raymond"), whole_set=True),
+        None
+    )
+
+    assert len(result.records) == 75
+    assert len(fake_aleph.urls) == 3
+    assert [record.docNumber for record in result.records] == \
+        ["%09d" % num for num in range(1, 76)]
+
+
+def test_SearchRequest_stream(fake_aleph):
+    sent = []
+    summary = aleph.reactToAMQPMessage(
+        aleph.SearchRequest(aleph.AuthorQuery("Raymond"), stream=True),
+        sent.append
+    )
+
+    assert summary == aleph.SearchSummary(30, 75)
+    assert [type(msg) for msg in sent] == [
+        aleph.SearchResultChunk,
+        aleph.SearchProgress,
+    ]
+    assert len(sent[0].records) == 30
+    assert sent[1] == aleph.SearchProgress(30, 30)
+
+
+def test_SearchRequest_stream_whole_set(fake_aleph):
+    sent = []
+    progress = []
+
+    def send_back(msg):
+        sent.append(msg)
+
+        # pages are sent as soon as they are downloaded
+        if isinstance(msg, aleph.SearchProgress):
+            progress.append((msg.fetched, len(fake_aleph.urls)))
+
+    summary = aleph.reactToAMQPMessage(
+        aleph.SearchRequest(
+            aleph.AuthorQuery("Raymond"),
+            whole_set=True,
+            stream=True
+        ),
+        send_back
+    )
+
+    assert summary == aleph.SearchSummary(75, 75)
+    assert progress == [(30, 1), (60, 2), (75, 3)]
+    assert sent[-1] == aleph.SearchProgress(75, 75)
+
+    records = sum(
+        [msg.records for msg in sent
+         if isinstance(msg, aleph.SearchResultChunk)],
+        []
+    )
+    assert [record.docNumber for record in records] == \
+        ["%09d" % num for num in range(1, 76)]
+
+
+def test_CountRequest_cache(fake_aleph):
+    for author in ["Raymond", "  raymond", "Raymond"]:
+        result = aleph.reactToAMQPMessage(
+            aleph.CountRequest(aleph.AuthorQuery(author)),
+            None
+        )
+        assert result == aleph.CountResult(75)
+
+    assert len(fake_aleph.searches) == 1
+
+    aleph.reactToAMQPMessage(
+        aleph.CountRequest(aleph.AuthorQuery("Raymond", base="other")),
+        None
+    )
+    assert len(fake_aleph.searches) == 2
+
+
+def test_SearchRequest_cache(fake_aleph):
+    request = aleph.SearchRequest(aleph.ISBNQuery("80-251-0225-4"))
+
+    result = aleph.reactToAMQPMessage(request, None)
+    assert aleph.reactToAMQPMessage(request, None) == result
+
+    assert len(fake_aleph.urls) == 1
+    assert cache.getCache().stats()["hits"] == 1
+
+
+def test_DocumentQuery_cache(fake_aleph):
+    request = aleph.SearchRequest(aleph.DocumentQuery(2))
+
+    result = aleph.reactToAMQPMessage(request, None)
+    assert aleph.reactToAMQPMessage(request, None) == result
+    assert len(fake_aleph.urls) == 1
+
+    # missing documents are remembered for shorter time
+    for _ in range(2):
+        with pytest.raises(aleph.aleph.DocumentNotFoundException):
+            aleph.reactToAMQPMessage(
+                aleph.SearchRequest(aleph.DocumentQuery(3)),
+                None
+            )
+    assert len(fake_aleph.urls) == 2
+
+
+def test_ExportRequest_invalidates_cache(fake_aleph, monkeypatch):
+    monkeypatch.setattr(export, "exportEPublication", lambda epub: None)
+
+    request = aleph.CountRequest(aleph.ISBNQuery("80-251-0225-4"))
+    aleph.reactToAMQPMessage(request, None)
+    aleph.reactToAMQPMessage(request, None)
+    assert len(fake_aleph.searches) == 1
+
+    class EPublication(object):
+        ISBN = ["978-80-251-0225-1"]
+
+    result = aleph.reactToAMQPMessage(aleph.ExportRequest(EPublication), None)
+    assert result == aleph.ExportResult(["978-80-251-0225-1"])
+
+    aleph.reactToAMQPMessage(request, None)
+    assert len(fake_aleph.searches) == 2
+
+
+def test_CountRequest_coalescing(fake_aleph, monkeypatch):
+    group = singleflight.SingleFlight()
+    monkeypatch.setattr(singleflight, "_GROUP", group)
+    monkeypatch.setattr(settings, "ALEPH_CACHE_COUNT_TTL", 0)
+
+    release = threading.Event()
+
+    def searchInAleph(base, phrase, considerSimilar, field):
+        release.wait(10)
+        fake_aleph.searches.append(phrase)
+        return search_result(75)
+
+    monkeypatch.setattr(aleph.aleph, "searchInAleph", searchInAleph)
+
+    request = aleph.CountRequest(aleph.ISBNQuery("80-251-0225-4"))
+    pending = [aio.reactToAMQPMessage(request, None) for _ in range(5)]
+
+    while group.stats()["saved"] < 4:
+        threading.Event().wait(0.01)
+    release.set()
+
+    assert [result.get(10) for result in pending] == \
+        [aleph.CountResult(75)] * 5
+    assert fake_aleph.searches == ["80-251-0225-4"]
+    assert group.stats()["saved"] == 4
+
+
+def test_set_reuse(fake_aleph):
+    query = aleph.AuthorQuery("Raymond")
+
+    aleph.reactToAMQPMessage(aleph.CountRequest(query), None)
+    aleph.reactToAMQPMessage(aleph.SearchRequest(query), None)
+    aleph.reactToAMQPMessage(aleph.SearchRequest(query, whole_set=True), None)
+
+    assert fake_aleph.searches == [("nkc", "Raymond", "wau")]
+
+
+def test_set_reuse_expired(fake_aleph, monkeypatch):
+    monkeypatch.setattr(settings, "ALEPH_CACHE_SET_TTL", 0)
+    query = aleph.AuthorQuery("Raymond")
+
+    aleph.reactToAMQPMessage(aleph.CountRequest(query), None)
+    aleph.reactToAMQPMessage(aleph.SearchRequest(query), None)
+
+    assert len(fake_aleph.searches) == 2
+
+
+def test_BatchRequest(fake_aleph):
+    result = aleph.reactToAMQPMessage(
+        aleph.BatchRequest([
+            aleph.CountRequest(aleph.AuthorQuery("Raymond")),
+            aleph.SearchRequest(aleph.DocumentQuery(3)),
+            aleph.ISBNValidationRequest("80-251-0225-4"),
+            aleph.CountRequest(aleph.AuthorQuery("Raymond")),
+            aleph.CountRequest(aleph.ISBNQuery("Raymond")),
+            aleph.BatchRequest([]),
+        ]),
+        None
+    )
+
+    assert result.results[0] == aleph.CountResult(75)
+    assert result.results[1].exception == "DocumentNotFoundException"
+    assert result.results[2] == aleph.ISBNValidationResult(True)
+    assert result.results[3] == aleph.CountResult(75)
+    assert result.results[4] == aleph.CountResult(75)
+    assert result.results[5] == aleph.ErrorResult(
+        "ValueError",
+        "BatchRequest can't be nested!"
+    )
+
+    # duplicate requests are processed only once
+    assert sorted(fake_aleph.searches) == [
+        ("nkc", "Raymond", "sbn"),
+        ("nkc", "Raymond", "wau"),
+    ]
+
+
+def test_ISBNCountManyRequest(monkeypatch):
+    monkeypatch.setattr(
+        aleph.aleph,
+        "getISBNCountMany",
+        lambda ISBNs, base: dict((isbn, len(isbn)) for isbn in ISBNs)
+    )
+
+    result = aleph.reactToAMQPMessage(
+        aleph.ISBNCountManyRequest(["80-251-0225-4", "1"]),
+        None
+    )
+
+    assert result == aleph.ISBNCountManyResult({"80-251-0225-4": 13, "1": 1})
+
+
+def test_unknown_request():
+    with pytest.raises(ValueError):
+        aleph.reactToAMQPMessage(aleph.ISBNQuery("80-251-0225-4"), None)
+
+    with pytest.raises(ValueError):
+        aleph.reactToAMQPMessage(aleph.CountRequest("not a query"), None)
+
+
+def test_register_handler(monkeypatch):
+    monkeypatch.setattr(aleph, "_HANDLERS", dict(aleph._HANDLERS))
+    monkeypatch.setattr(aleph, "REQUEST_TYPES", list(aleph.REQUEST_TYPES))
+
+    class PingRequest(namedtuple("PingRequest", ["message"])):
+        pass
+
+    aleph.register_handler(
+        PingRequest,
+        lambda req, send_back: send_back(req.message) or "pong"
+    )
+    sent = []
+
+    assert aleph.reactToAMQPMessage(PingRequest("ping"), sent.append) == "pong"
+    assert sent == ["ping"]
+    assert PingRequest in aleph.REQUEST_TYPES
+
+    # requests are matched by the name of the class
+    class OtherPingRequest(namedtuple("PingRequest", ["message"])):
+        pass
+
+    OtherPingRequest.__name__ = "PingRequest"
+    assert aleph.reactToAMQPMessage(OtherPingRequest("x"), sent.append) == \
+        "pong"
+
+
+def test_ExportRequest_during_count(fake_aleph, monkeypatch):
+    group = singleflight.SingleFlight()
+    monkeypatch.setattr(singleflight, "_GROUP", group)
+    monkeypatch.setattr(export, "exportEPublication", lambda epub: None)
+
+    release = threading.Event()
+
+    def searchInAleph(base, phrase, considerSimilar, field):
+        fake_aleph.searches.append(phrase)
+        if len(fake_aleph.searches) == 1:
+            release.wait(10)
+            return search_result(0)  # answer from before the export
+
+        return search_result(1)
+
+    monkeypatch.setattr(aleph.aleph, "searchInAleph", searchInAleph)
+
+    class EPublication(object):
+        ISBN = ["978-80-251-0225-1"]
+
+    request = aleph.CountRequest(aleph.ISBNQuery("978-80-251-0225-1"))
+    before = aio.reactToAMQPMessage(request, None)
+
+    while not fake_aleph.searches:
+        threading.Event().wait(0.01)
+
+    aleph.reactToAMQPMessage(aleph.ExportRequest(EPublication), None)
+
+    # request started after the export doesn't wait for the one before it
+    after = aio.reactToAMQPMessage(request, None)
+    assert after.get(10) == aleph.CountResult(1)
+
+    release.set()
+    assert before.get(10) == aleph.CountResult(0)
+
+    assert aleph.reactToAMQPMessage(request, None) == aleph.CountResult(1)
+    assert len(fake_aleph.searches) == 2
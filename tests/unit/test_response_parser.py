@@ -0,0 +1,129 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import pytest
+
+from aleph import response_parser
+
+
+# Fixtures ====================================================================
+FIND_RESPONSE = """<?xml version = "1.0" encoding = "UTF-8"?>
+<find>
+<set_number>036520</set_number>
+<no_records>000000002</no_records>
+<no_entries>000000002</no_entries>
+<session-id>YLI54HBQJESUTS678YYUNKEU4BNAUJDKA914GMF39J6K89VSCB</session-id>
+</find>
+"""
+
+SET_RESPONSE = """<?xml version = "1.0" encoding = "UTF-8"?>
+<ill-get-set>
+<set-library>NKC01</set-library>
+<doc-number>000000001</doc-number>
+<doc-number>000000002</doc-number>
+<doc-number>000000003</doc-number>
+</ill-get-set>
+"""
+
+ERROR_RESPONSE = """<?xml version = "1.0" encoding = "UTF-8"?>
+<find-doc>
+<error>Error reading document - ěščř</error>
+<session-id>SESSION</session-id>
+</find-doc>
+"""
+
+NAMESPACED_RESPONSE = """<?xml version = "1.0" encoding = "UTF-8"?>
+<ill-get-doc xmlns="http://www.loc.gov/MARC21/slim">
+<error>Document not found</error>
+</ill-get-doc>
+"""
+
+DOC_RESPONSE = """<?xml version = "1.0" encoding = "UTF-8"?>
+<ill-get-doc>
+<login><error>Bad library</error></login>
+<record>..</record>
+</ill-get-doc>
+"""
+
+
+@pytest.fixture(params=sorted(response_parser.BACKENDS.keys()))
+def backend(request):
+    return request.param
+
+
+# Tests =======================================================================
+def test_toDict():
+    assert response_parser.toDict([
+        ("a", " 1 "),
+        ("b", "x"),
+        ("b", "002"),
+        ("b", "y"),
+    ]) == {"a": 1, "b": ["x", 2, "y"]}
+
+
+def test_findElements_find(backend):
+    find = response_parser.findElements(FIND_RESPONSE, "find", backend)
+
+    assert len(find) == 1
+    assert find[0].fields == {
+        "set_number": 36520,
+        "no_records": 2,
+        "no_entries": 2,
+        "session-id": "YLI54HBQJESUTS678YYUNKEU4BNAUJDKA914GMF39J6K89VSCB",
+    }
+
+
+def test_findElements_set(backend):
+    sets = response_parser.findElements(SET_RESPONSE, "ill-get-set", backend)
+
+    assert len(sets) == 1
+    assert sets[0].fields["set-library"] == "NKC01"
+    assert sets[0].fields["doc-number"] == [1, 2, 3]
+
+
+def test_findElements_content(backend):
+    error = response_parser.findElements(ERROR_RESPONSE, "error", backend)
+
+    assert len(error) == 1
+    assert error[0].content == "Error reading document - ěščř"
+    assert isinstance(error[0].content, str)
+
+
+def test_findElements_missing(backend):
+    assert response_parser.findElements(FIND_RESPONSE, "error", backend) == []
+
+
+def test_findElements_namespace(backend):
+    error = response_parser.findElements(NAMESPACED_RESPONSE, "error", backend)
+    doc = response_parser.findElements(
+        NAMESPACED_RESPONSE,
+        "ill-get-doc",
+        backend
+    )
+
+    assert [element.content for element in error] == ["Document not found"]
+    assert doc[0].fields == {"error": "Document not found"}
+
+
+def test_findElementsMany(backend):
+    elements = response_parser.findElementsMany(
+        DOC_RESPONSE,
+        ["login", "ill-get-doc", "find"],
+        backend
+    )
+
+    assert sorted(elements) == ["find", "ill-get-doc", "login"]
+    assert elements["login"][0].fields == {"error": "Bad library"}
+    assert len(elements["ill-get-doc"]) == 1
+    assert elements["find"] == []
+
+
+def test_findElements_fallback():
+    broken = "<html><find><set_number>1</set_number>&nbsp;</find>"
+
+    find = response_parser.findElements(broken, "find", "etree")
+
+    assert find[0].fields["set_number"] == 1
@@ -0,0 +1,50 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import json
+
+import pytest
+
+from aleph import settings
+
+
+# Fixtures ====================================================================
+@pytest.fixture
+def restore_settings(request):
+    old = dict(
+        (key, getattr(settings, key))
+        for key in settings.get_all_constants()
+    )
+
+    def restore():
+        for key, value in old.items():
+            setattr(settings, key, value)
+
+    request.addfinalizer(restore)
+
+
+# Tests =======================================================================
+def test_substitute_globals(restore_settings):
+    settings.substitute_globals({
+        "ALEPH_URL": "http://localhost",
+        "ALEPH_TIMEOUT": 10,
+        "ALEPH_UNKNOWN": 1,
+        "_ALLOWED": [],
+    })
+
+    assert settings.ALEPH_URL == "http://localhost"
+    assert settings.ALEPH_TIMEOUT == 10
+    assert not hasattr(settings, "ALEPH_UNKNOWN")
+    assert bool in settings._ALLOWED
+
+
+def test_substitute_globals_bool(restore_settings):
+    settings.substitute_globals(json.loads(
+        '{"ALEPH_LAZY_RECORDS": true, "ALEPH_METRICS": true}'
+    ))
+
+    assert settings.ALEPH_LAZY_RECORDS is True
+    assert settings.ALEPH_METRICS is True
@@ -0,0 +1,92 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import threading
+
+import pytest
+
+from aleph import singleflight
+
+
+# Functions & objects =========================================================
+def run_concurrently(group, key, fn, count):
+    """
+    Call ``group.do(key, fn)`` from `count` threads, while `fn` is blocked.
+    """
+    results = []
+
+    def worker():
+        try:
+            results.append(group.do(key, fn))
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+
+    return threads, results
+
+
+def wait_for_waiters(group, count):
+    while group.stats()["saved"] < count:
+        threading.Event().wait(0.01)
+
+
+# Tests =======================================================================
+def test_do():
+    group = singleflight.SingleFlight()
+
+    assert group.do("key", lambda: 1) == 1
+    assert group.do("key", lambda: 2) == 2
+    assert group.stats() == {"calls": 2, "saved": 0, "in_flight": 0}
+
+
+def test_coalescing():
+    group = singleflight.SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(10)
+        return "result"
+
+    threads, results = run_concurrently(group, "key", fn, 10)
+    wait_for_waiters(group, 9)
+    release.set()
+
+    for thread in threads:
+        thread.join()
+
+    assert results == ["result"] * 10
+    assert len(calls) == 1
+    assert group.stats() == {"calls": 1, "saved": 9, "in_flight": 0}
+
+
+def test_exception():
+    group = singleflight.SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait(10)
+        raise ValueError("shared")
+
+    threads, results = run_concurrently(group, "key", fn, 5)
+    wait_for_waiters(group, 4)
+    release.set()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 5
+    assert all(isinstance(result, ValueError) for result in results)
+
+    # next call is not affected by the failed one
+    assert group.do("key", lambda: "ok") == "ok"
+
+    with pytest.raises(KeyError):
+        group.do("key", lambda: {}["missing"])
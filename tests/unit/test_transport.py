@@ -0,0 +1,126 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+# Imports =====================================================================
+import socket
+import urllib2
+import threading
+import BaseHTTPServer
+
+import pytest
+
+from aleph import aleph
+from aleph import transport
+
+
+# Fixtures ====================================================================
+class KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.clients.add(self.client_address)
+
+        if self.path.startswith("/redirect"):
+            self.send_response(302)
+            self.send_header("Location", "/X?op=redirected")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.path.startswith("/missing"):
+            code, body = 404, "not found"
+        else:
+            code, body = 200, "<path>%s</path>" % self.path
+
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(request):
+    httpd = BaseHTTPServer.HTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    httpd.clients = set()
+
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    request.addfinalizer(httpd.shutdown)
+
+    return httpd
+
+
+def server_url(server):
+    return "http://127.0.0.1:%d" % server.server_address[1]
+
+
+class ClosedConnection(object):
+    """
+    Pooled connection, which was already closed by the server.
+    """
+    def request(self, *args, **kwargs):
+        raise socket.error("Connection reset by peer.")
+
+    def close(self):
+        pass
+
+
+# Tests =======================================================================
+def test_connection_reuse(server):
+    trans = transport.HTTPTransport(pool_size=2, timeout=5)
+
+    for cnt in range(5):
+        data = trans.download(server_url(server) + "/X?op=find&i=%d" % cnt)
+        assert data == "<path>/X?op=find&i=%d</path>" % cnt
+
+    trans.close()
+
+    assert len(server.clients) == 1
+
+
+def test_stale_connection(server):
+    trans = transport.HTTPTransport(timeout=5)
+
+    url = server_url(server)
+    pool = trans._getPool("http", url.split("://")[1])
+    pool.release(ClosedConnection())
+
+    assert trans.download(url + "/X?op=find") == "<path>/X?op=find</path>"
+    assert len(server.clients) == 1
+
+    trans.close()
+
+
+def test_redirect(server):
+    trans = transport.HTTPTransport(timeout=5)
+
+    assert trans.download(server_url(server) + "/redirect") == \
+        "<path>/X?op=redirected</path>"
+
+
+def test_http_error(server):
+    trans = transport.HTTPTransport(timeout=5)
+
+    with pytest.raises(urllib2.HTTPError):
+        trans.download(server_url(server) + "/missing")
+
+
+def test_setTransport():
+    class FakeTransport(object):
+        def download(self, url):
+            return url
+
+    old = transport.setTransport(FakeTransport())
+    try:
+        assert aleph._download("http://aleph/X") == "http://aleph/X"
+    finally:
+        transport.setTransport(old)
+
+    assert transport.getTransport() is not None